@@ -11,8 +11,13 @@ import os
 import pkgutil
 
 from pyvino_utils import __version__, __vino_version__
+from pyvino_utils.input_handler.frame_ring import SharedFrameRing
 from pyvino_utils.input_handler.input_feeder import InputFeeder
+from pyvino_utils.input_handler.large_image_feeder import LargeImageFeeder
 from pyvino_utils.opencv_utils import cv_utils
+from pyvino_utils.output_handler.results_sink import ResultsSink
+from pyvino_utils.telemetry.metrics import REGISTRY, MetricsRegistry
+from pyvino_utils.telemetry.tracing import TRACER
 try:
     from pyvino_utils.models import detection, openvino_base, pose_estimations, recognition
 except ModuleNotFoundError:
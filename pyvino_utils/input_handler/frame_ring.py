@@ -0,0 +1,252 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+from loguru import logger
+
+__all__ = ["SharedFrameRing", "FrameRef"]
+
+# Sequence number and reader count of each slot, padded to a cache line.
+_HEADER_FIELDS = 2
+_ALIGNMENT = 64
+
+
+class FrameRef:
+    """A frame published to the ring, `frame` is a view of its shared slot."""
+
+    __slots__ = ("slot", "seq", "meta", "frame")
+
+    def __init__(self, slot, seq, meta, frame):
+        self.slot = slot
+        self.seq = seq
+        self.meta = meta
+        self.frame = frame
+
+    def __repr__(self):
+        return f"FrameRef(slot={self.slot}, seq={self.seq}, meta={self.meta!r})"
+
+
+class SharedFrameRing:
+    def __init__(self, shape, slots=8, dtype="uint8", ctx=None):
+        """
+        This class can be used to share frames between processes without copying or
+        pickling them, e.g. a capture process, N inference processes and a writer.
+
+        Frames are written into a fixed number of slots of a shared memory block,
+        only small (slot, sequence number, metadata) messages go through the queues.
+        A slot is reused once all of its readers released it.
+
+        The ring is created in the parent process and passed to the child
+        processes as an argument, they attach to the same shared memory.
+
+        Parameters
+        ----------
+        shape: tuple
+            Shape of every frame, e.g. (1080, 1920, 3).
+        slots: int
+            Number of frames in flight, `put` blocks while all slots are in use.
+        dtype: str
+            Pixel data type.
+        ctx: multiprocessing.context.BaseContext
+            Context the queues and lock are created with, defaults to the default
+            start method's.
+
+        Example
+        -------
+        ```
+            ring = SharedFrameRing(shape=(1080, 1920, 3), slots=16)
+            # Capture process, single producer
+            ring.feed(input_feed.next_frame(progress=False), consumers=4)
+            # Each of the 4 inference processes
+            for ref in ring:
+                results = model.predict(ref.frame)
+                ring.release(ref)
+            ring.close()
+            ring.unlink()  # in the parent once all processes are done
+        ```
+        """
+        ctx = ctx or mp.get_context()
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.slots = slots
+        self._frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self._header_bytes = -(-slots * _HEADER_FIELDS * 8 // _ALIGNMENT) * _ALIGNMENT
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=self._header_bytes + slots * self._frame_bytes
+        )
+        self._owner = True
+        self._lock = ctx.Lock()
+        self._free = ctx.Queue()
+        self._ready = ctx.Queue()
+        self._next_seq = 0
+        self._attach()
+        self._header[:] = -1
+        self._header[:, 1] = 0
+        for slot in range(slots):
+            self._free.put(slot)
+        logger.info(
+            f"Shared {slots} frame slots of {self.shape} in {self._shm.name} "
+            f"({self._shm.size / 1024.0 ** 2:.1f} MB)"
+        )
+
+    def _attach(self):
+        self._header = np.ndarray(
+            (self.slots, _HEADER_FIELDS), dtype=np.int64, buffer=self._shm.buf
+        )
+        self._frames = np.ndarray(
+            (self.slots, *self.shape),
+            dtype=self.dtype,
+            buffer=self._shm.buf,
+            offset=self._header_bytes,
+        )
+
+    def __getstate__(self):
+        state = {
+            key: value
+            for key, value in self.__dict__.items()
+            if key not in ("_shm", "_header", "_frames")
+        }
+        state["_name"] = self._shm.name
+        state["_owner"] = False
+        return state
+
+    def __setstate__(self, state):
+        name = state.pop("_name")
+        self.__dict__.update(state)
+        # Child processes share the resource tracker of their parent, which only
+        # unlinks the block if the creator did not.
+        self._shm = shared_memory.SharedMemory(name=name)
+        self._attach()
+
+    def __iter__(self):
+        """Yield the published frames until the producer is done."""
+        while True:
+            ref = self.get()
+            if ref is None:
+                return
+            yield ref
+
+    def acquire(self, timeout=None):
+        """Get a free slot to write the next frame into.
+
+        Returns
+        -------
+        slot: int
+        frame: np.ndarray
+            Writable view of the slot, e.g. for `cv2.VideoCapture.read(image=frame)`
+            to decode straight into shared memory.
+        """
+        slot = self._free.get(timeout=timeout)
+        return slot, self._frames[slot]
+
+    def publish(self, slot, meta=None, readers=1):
+        """Hand a written slot to the consumers.
+
+        Parameters
+        ----------
+        slot: int
+            Slot from `acquire`.
+        meta: object
+            Small picklable metadata sent along, e.g. a capture timestamp.
+        readers: int
+            Number of `release` calls before the slot is reused, e.g. 2 when an
+            inference process and a writer process both read the frame.
+
+        Returns
+        -------
+        seq: int
+            Sequence number of the frame.
+        """
+        seq = self._next_seq
+        self._next_seq += 1
+        with self._lock:
+            self._header[slot] = (seq, readers)
+        self._ready.put((slot, seq, meta))
+        return seq
+
+    def put(self, frame, meta=None, readers=1, timeout=None):
+        """Copy `frame` into a free slot and publish it, see `publish`."""
+        slot, view = self.acquire(timeout)
+        np.copyto(view, frame)
+        return self.publish(slot, meta, readers)
+
+    def feed(self, frames, consumers=1, readers=1):
+        """Publish every frame of an iterable, e.g. `InputFeeder.next_frame`, then
+        tell the `consumers` that there are no more frames.
+
+        Returns
+        -------
+        count: int
+            Number of published frames.
+        """
+        count = 0
+        for frame in frames:
+            self.put(frame, readers=readers)
+            count += 1
+        self.finish(consumers)
+        return count
+
+    def finish(self, consumers=1):
+        """Make `get` return None in each of the `consumers`."""
+        for _ in range(consumers):
+            self._ready.put(None)
+
+    def get(self, timeout=None):
+        """Get the next published frame, None once the producer finished.
+
+        Each frame goes to a single consumer, pass on the returned reference to
+        other processes, e.g. a writer, with `(ref.slot, ref.seq)` and `view`.
+
+        Raises
+        ------
+        queue.Empty
+            When no frame was published within `timeout` seconds.
+        """
+        message = self._ready.get(timeout=timeout)
+        if message is None:
+            return None
+        slot, seq, meta = message
+        return FrameRef(slot, seq, meta, self.view(slot, seq))
+
+    def view(self, slot, seq):
+        """Get the frame `seq` of `slot` without copying it.
+
+        Raises
+        ------
+        LookupError
+            When the slot was already reused for a newer frame.
+        """
+        if self._header[slot, 0] != seq:
+            raise LookupError(f"Frame {seq} in slot {slot} was overwritten.")
+        return self._frames[slot]
+
+    def release(self, ref, seq=None):
+        """Release a `FrameRef` or a (slot, seq), the slot is reused once all of its
+        readers released it."""
+        slot, seq = (ref.slot, ref.seq) if isinstance(ref, FrameRef) else (ref, seq)
+        with self._lock:
+            if self._header[slot, 0] != seq:
+                raise LookupError(f"Frame {seq} in slot {slot} was overwritten.")
+            self._header[slot, 1] -= 1
+            done = self._header[slot, 1] <= 0
+        if done:
+            self._free.put(slot)
+
+    @property
+    def in_flight(self):
+        """Number of published frames not yet released by all of their readers."""
+        return int(np.count_nonzero(self._header[:, 1] > 0))
+
+    def close(self):
+        """Detach this process from the shared memory."""
+        self._header = self._frames = None
+        try:
+            self._shm.close()
+        except BufferError:
+            logger.warning("Frame views are still in use, the mapping stays open.")
+
+    def unlink(self):
+        """Free the shared memory, call once in the creating process."""
+        if self._owner:
+            self._shm.unlink()
+            logger.info("============ CleanUp! ============")
@@ -1,5 +1,7 @@
+import asyncio
 import mimetypes
 import os
+import time
 
 import cv2
 from loguru import logger
@@ -7,6 +9,9 @@ from loguru import logger
 from tqdm import tqdm
 from vidstab.VidStab import VidStab
 
+from pyvino_utils.telemetry.metrics import REGISTRY, FeedMetrics
+from pyvino_utils.telemetry.tracing import TRACER
+
 __all__ = ["InputFeeder"]
 
 
@@ -15,7 +20,7 @@ class FormatNotSupported(Exception):
 
 
 class InputFeeder:
-    def __init__(self, input_feed=None, cam_input=0):
+    def __init__(self, input_feed=None, cam_input=0, metrics=REGISTRY):
         """
         This class can be used to feed input from an image, webcam, or video to your
         model.
@@ -27,6 +32,9 @@ class InputFeeder:
             Leave empty for cam input_type.
         cam_input: int
             WebCam input [Default: 0]
+        metrics: MetricsRegistry
+            Registry the decode time and FPS of the source are recorded in, None to
+            turn them off.
 
         Example
         -------
@@ -47,6 +55,14 @@ class InputFeeder:
             self._input_type = ""
         self._progress_bar = None
         self._video_stabilizer = VidStab()
+        self.metrics = (
+            FeedMetrics(metrics, os.path.basename(self.input_feed))
+            if metrics is not None
+            else None
+        )
+        # Index and `time.perf_counter_ns` capture time of the last frame read.
+        self.frame_id = -1
+        self.capture_ns = None
         self.load_feed(cam_input)
 
     def load_feed(self, cam_input):
@@ -155,31 +171,74 @@ class InputFeeder:
         )
         return out_video
 
+    def _captured(self, start_ns):
+        """Stamp a frame read since `start_ns`."""
+        self.frame_id += 1
+        self.capture_ns = time.perf_counter_ns()
+        if self.metrics is not None:
+            self.metrics.observe(start_ns, self.capture_ns)
+        TRACER.add(
+            "decode", start_ns, self.capture_ns, "input", {"frame_id": self.frame_id}
+        )
+
     def next_frame(
         self, quit_key="q", progress=True, smoothing_window=30, stabilize_video=False
     ):
-        """Returns the next image from either a video file or webcam."""
+        """Returns the next image from either a video file or webcam.
+
+        `frame_id` and `capture_ns` describe the frame last yielded, while tracing
+        its processing until the next frame is requested is recorded as a "frame"
+        span, see `pyvino_utils.telemetry.tracing`.
+        """
         while self.cap.isOpened():
             if progress:
                 self.progress_bar.update(1)
             flag = False
             for _ in range(1):
+                start = time.perf_counter_ns()
                 flag, frame = self.cap.read()
 
             if not flag:
                 break
+            self._captured(start)
             if stabilize_video:
                 # Pass frame to stabilizer even if frame is None
-                frame = self._video_stabilizer.stabilize_frame(
-                    input_frame=frame, smoothing_window=smoothing_window
-                )
-            yield frame
+                with TRACER.span("stabilize", "input"):
+                    frame = self._video_stabilizer.stabilize_frame(
+                        input_frame=frame, smoothing_window=smoothing_window
+                    )
+            with TRACER.frame(self.frame_id, self.capture_ns):
+                yield frame
 
             key = cv2.waitKey(1) & 0xFF
             # if `quit_key` was pressed, break from the loop
             if key == ord(quit_key):
                 break
 
+    async def next_frame_async(self, executor=None):
+        """Returns the next image from either a video file or webcam, without
+        blocking the event loop.
+
+        Frames are decoded in `executor`, the loop's default executor when not
+        given, so one event loop can drive several streams and models.
+
+        Example
+        -------
+        ```
+            async for frame in feed.next_frame_async():
+                results = await model.apredict(frame)
+        ```
+        """
+        loop = asyncio.get_running_loop()
+        while self.cap.isOpened():
+            start = time.perf_counter_ns()
+            flag, frame = await loop.run_in_executor(executor, self.cap.read)
+            if not flag:
+                break
+            self._captured(start)
+            with TRACER.frame(self.frame_id, self.capture_ns):
+                yield frame
+
     # TODO: Add context-manager to handle the closing
     def close(self):
         """Closes the VideoCapture."""
@@ -0,0 +1,198 @@
+import csv
+import mmap
+import os
+
+import numpy as np
+from loguru import logger
+
+from pyvino_utils.opencv_utils.cv_utils import get_tiles, to_uint8
+
+from .input_feeder import FormatNotSupported
+
+try:
+    import tifffile
+except ModuleNotFoundError:
+    tifffile = None
+
+__all__ = ["LargeImageFeeder"]
+
+
+class LargeImageFeeder:
+    def __init__(
+        self,
+        input_feed,
+        tile_size=(2048, 2048),
+        overlap=0.1,
+        raw_shape=None,
+        raw_dtype="uint8",
+    ):
+        """
+        This class can be used to feed images too large to be decoded into memory
+        to your model, tile by tile.
+
+        The image is memory-mapped and every tile is copied into a single reusable
+        buffer, pages that were read are released again so the resident memory stays
+        bounded by the tile size, no matter how big the image is.
+
+        Parameters
+        ----------
+        input_feed: str
+            Image file: uncompressed or tiled TIFF (needs `tifffile`), `.npy` or a
+            headerless raw file.
+        tile_size: tuple
+            (width, height) of the tiles.
+        overlap: float
+            Fraction of a tile shared with its neighbours, should be larger than the
+            objects of interest.
+        raw_shape: tuple
+            (height, width, channels) of a headerless raw file.
+        raw_dtype: str
+            Pixel data type of a headerless raw file.
+
+        Example
+        -------
+        ```
+            feed = LargeImageFeeder(input_feed='aerial.tif', tile_size=(4096, 4096))
+            feed.detect(person_detector, 'detections.csv')
+            feed.close()
+        ```
+        """
+        self.input_feed = input_feed
+        if not os.path.exists(os.path.abspath(input_feed)):
+            raise FileNotFoundError(f"{input_feed} does not exist.")
+        self.tile_size = tuple(tile_size)
+        self.overlap = overlap
+        self._tiff = None
+        self.cap = self.load_feed(raw_shape, raw_dtype)
+        self._tile_buffer = np.empty(
+            (*np.minimum(self.tile_size[::-1], self.cap.shape[:2]), *self.cap.shape[2:]),
+            dtype=self.cap.dtype,
+        )
+
+    def load_feed(self, raw_shape=None, raw_dtype="uint8"):
+        extension = os.path.splitext(self.input_feed)[1].lower()
+        if extension in (".tif", ".tiff"):
+            image = self._load_tiff()
+        elif extension == ".npy":
+            image = np.load(self.input_feed, mmap_mode="r")
+        elif raw_shape is not None:
+            image = np.memmap(self.input_feed, dtype=raw_dtype, mode="r", shape=raw_shape)
+        else:
+            msg = f"Source: {self.input_feed} not supported!"
+            logger.warning(msg)
+            raise FormatNotSupported(msg)
+        logger.info(f"Memory-mapped input source: {self.input_feed} {image.shape}")
+        return image
+
+    def _load_tiff(self):
+        if tifffile is None:
+            raise FormatNotSupported("TIFF sources need tifffile: pip install tifffile")
+        try:
+            return tifffile.memmap(self.input_feed, mode="r")
+        except ValueError:
+            # Compressed TIFFs cannot be mapped, decode them tile/strip-wise into a
+            # temporary file backed array instead of into memory.
+            logger.info(f"Decoding {self.input_feed} into a temporary memory-map.")
+            self._tiff = tifffile.TiffFile(self.input_feed)
+            return self._tiff.series[0].asarray(out="memmap")
+
+    @property
+    def source_width(self):
+        return self.cap.shape[1]
+
+    @property
+    def source_height(self):
+        return self.cap.shape[0]
+
+    @property
+    def frame_size(self):
+        return (self.source_height, self.source_width)
+
+    @property
+    def tiles(self):
+        """(T, 4) xmin, ymin, xmax and ymax of all tiles, row by row."""
+        return get_tiles(self.cap.shape, self.tile_size, self.overlap)
+
+    def _release_pages(self):
+        """Drop the already read pages of the mapping from the resident memory."""
+        mapping = getattr(self.cap, "_mmap", None) or getattr(
+            getattr(self.cap, "base", None), "_mmap", None
+        )
+        if isinstance(mapping, mmap.mmap) and hasattr(mmap, "MADV_DONTNEED"):
+            mapping.madvise(mmap.MADV_DONTNEED)
+
+    def next_tile(self):
+        """Returns the next tile and its (xmin, ymin, xmax, ymax) box in the image.
+
+        The tile is a reused buffer, copy it to keep it past the next iteration.
+        """
+        for xmin, ymin, xmax, ymax in self.tiles.tolist():
+            tile = self._tile_buffer[: ymax - ymin, : xmax - xmin]
+            np.copyto(tile, self.cap[ymin:ymax, xmin:xmax])
+            self._release_pages()
+            yield tile, (xmin, ymin, xmax, ymax)
+
+    def _owned_regions(self, tiles):
+        """Get the part of every tile nearer to it than to its neighbours.
+
+        A box belongs to the single tile whose region contains its centre, which
+        removes the duplicates of the overlaps without holding on to any results.
+        """
+        owned = np.empty(tiles.shape, dtype=np.float64)
+        for axis, size in enumerate(self.cap.shape[1::-1]):
+            starts = np.unique(tiles[:, axis])
+            ends = np.unique(tiles[:, axis + 2])
+            bounds = np.concatenate(([0], (starts[1:] + ends[:-1]) / 2, [size]))
+            idx = np.searchsorted(starts, tiles[:, axis])
+            owned[:, axis], owned[:, axis + 2] = bounds[idx], bounds[idx + 1]
+        return owned
+
+    def detect(self, model, output_file, **kwargs):
+        """Run a detection model over every tile and stream the boxes to a CSV file.
+
+        Parameters
+        ----------
+        model: DetectionBase
+            e.g. `FaceDetection` or `PersonDetection`, tiles are split further with
+            `predict_tiled` when they are larger than the network input.
+        output_file: str
+            CSV file the boxes are written to in image coordinates.
+        kwargs:
+            Passed on to `predict_tiled`.
+
+        Returns
+        -------
+        count: int
+            Number of boxes written.
+        """
+        tiles = self.tiles
+        owned = self._owned_regions(tiles)
+        count = 0
+        with open(output_file, "w", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(("xmin", "ymin", "xmax", "ymax", "confidence", "label"))
+            for (tile, (xmin, ymin, _, _)), region in zip(self.next_tile(), owned):
+                # 16 bit and grey tiles become 8 bit BGR, as the models expect.
+                tile = to_uint8(tile)
+                results = model.predict_tiled(tile, **kwargs)
+                boxes = results["bbox_coord"] + (xmin, ymin, xmin, ymin)
+                centres = (boxes[:, :2] + boxes[:, 2:]) / 2
+                keep = np.all((centres >= region[:2]) & (centres < region[2:]), axis=1)
+                for box, confidence, label in zip(
+                    boxes[keep].tolist(),
+                    results["confidences"][keep].tolist(),
+                    results["labels"][keep].tolist(),
+                ):
+                    writer.writerow((*box, f"{confidence:.4f}", label))
+                count += int(keep.sum())
+                csv_file.flush()
+        logger.info(f"Wrote {count} detections to {output_file}")
+        return count
+
+    def close(self):
+        """Closes the memory-map."""
+        self._release_pages()
+        if self._tiff is not None:
+            self._tiff.close()
+        self.cap = None
+        logger.info("============ CleanUp! ============")
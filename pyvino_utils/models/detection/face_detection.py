@@ -1,9 +1,9 @@
 import cv2
 
-from ..openvino_base.base_model import Base
+from ..openvino_base.detection_base import DetectionBase
 
 
-class FaceDetection(Base):
+class FaceDetection(DetectionBase):
     """Class for the Face Detection Model."""
 
     def __init__(
@@ -28,26 +28,15 @@ class FaceDetection(Base):
 
     def preprocess_output(self, inference_results, image, show_bbox=False, **kwargs):
         """Draw bounding boxes onto the Face Detection frame."""
-        results = {}
-        if not (self._init_image_w and self._init_image_h):
+        if self.native_aspect:
+            # Sources of any resolution share the model.
+            height, width = image.shape[:2]
+        elif not (self._init_image_w and self._init_image_h):
             raise RuntimeError("Initial image width and height cannot be None.")
-        if len(inference_results) == 1:
-            inference_results = inference_results[0]
-
-        bbox_coord = []
-        for box in inference_results[0][0]:  # Output shape is 1x1xNx7
-            conf = box[2]
-            if conf >= self.threshold:
-                xmin = int(box[3] * self._init_image_w)
-                ymin = int(box[4] * self._init_image_h)
-                xmax = int(box[5] * self._init_image_w)
-                ymax = int(box[6] * self._init_image_h)
-                bbox_coord.append((xmin, ymin, xmax, ymax))
-                if show_bbox:
-                    self.draw_output(image, xmin, ymin, xmax, ymax, **kwargs)
-        results["image"] = image
-        results["bbox_coord"] = bbox_coord
-        return results
+        else:
+            width, height = self._init_image_w, self._init_image_h
+        detections = self.decode_detections(inference_results, width, height)
+        return self.make_detections(detections, image, show_bbox, **kwargs)
 
     @staticmethod
     def draw_output(
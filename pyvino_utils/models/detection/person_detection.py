@@ -1,10 +1,9 @@
-import cv2  # noqa: F401
-import numpy as np  # noqa: F401
+import cv2
 
-from ..openvino_base.base_model import Base
+from ..openvino_base.detection_base import DetectionBase
 
 
-class PersonDetection(Base):
+class PersonDetection(DetectionBase):
     """Class for the Person Detection Model."""
 
     def __init__(
@@ -28,8 +27,15 @@ class PersonDetection(Base):
         )
 
     def preprocess_output(self, inference_results, image, show_bbox=False, **kwargs):
-        raise NotImplementedError("Method not implemented!")
+        """Draw bounding boxes onto the Person Detection frame."""
+        height, width = image.shape[:2]
+        detections = self.decode_detections(inference_results, width, height)
+        return self.make_detections(detections, image, show_bbox, **kwargs)
 
     @staticmethod
-    def draw_output(coords, image, **kwargs):
-        raise NotImplementedError("Method not implemented!")
+    def draw_output(
+        image, xmin, ymin, xmax, ymax, bbox_color=(0, 255, 0), thickness=2, **kwargs
+    ):
+        cv2.rectangle(
+            image, (xmin, ymin), (xmax, ymax), color=bbox_color, thickness=thickness
+        )
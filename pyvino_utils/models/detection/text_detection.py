@@ -1,7 +1,8 @@
-import cv2  # noqa: F401
-import numpy as np  # noqa: F401
+import cv2
+import numpy as np
 
-from ..openvino_base.base_model import Base
+from ..openvino_base.base_model import Base, InvalidModel
+from ..openvino_base.results import TextRegions
 
 
 class TextDetection(Base):
@@ -27,9 +28,157 @@ class TextDetection(Base):
             **kwargs
         )
 
-    def preprocess_output(self, inference_results, image, show_bbox=False, **kwargs):
-        raise NotImplementedError("Method not implemented!")
+    def preprocess_output(
+        self,
+        inference_results,
+        image,
+        show_bbox=False,
+        pixel_threshold=0.8,
+        link_threshold=0.8,
+        min_area=300,
+        min_height=10,
+        **kwargs
+    ):
+        """
+        Decode the PixelLink outputs of the Text Detection model.
+
+        Example
+        -------
+        Model: text-detection-0004
+
+            Output layer names in Inference Engine format:
+
+            name: "model/link_logits_/add", shape: [1, 16, 192, 320] - Link logits,
+                (negative, positive) pairs for each of the 8 neighbours.
+            name: "model/segm_logits/add", shape: [1, 2, 192, 320] - Pixel logits,
+                (background, text).
+
+        Returns
+        -------
+        results: TextRegions
+            "rects" is a (N, 5) array of rotated (cx, cy, width, height, angle)
+            rectangles, "boxes" the (N, 4, 2) corners of those rectangles and
+            "bbox_coord" the (N, 4) axis-aligned (xmin, ymin, xmax, ymax) boxes.
+        """
+        outputs = {output.shape[1]: output[0] for output in inference_results}
+        if not {2, 16}.issubset(outputs):
+            msg = (
+                f"The model:{self.model_structure} does not contain expected output "
+                "shape as per the docs."
+            )
+            raise InvalidModel(msg)
+
+        labels = self.link_pixels(
+            outputs[2], outputs[16], pixel_threshold, link_threshold
+        )
+        rects, boxes, bbox_coord = self.get_text_regions(
+            labels, image.shape[:2], min_area, min_height
+        )
+        results = TextRegions(
+            rects=rects,
+            boxes=boxes,
+            bbox_coord=bbox_coord,
+            image=image,
+            keep_image=self.keep_images,
+        )
+        if show_bbox:
+            self.draw_output(results, image, **kwargs)
+        return results
 
     @staticmethod
-    def draw_output(coords, image, **kwargs):
-        raise NotImplementedError("Method not implemented!")
+    def link_pixels(segm_logits, link_logits, pixel_threshold=0.8, link_threshold=0.8):
+        """Group text pixels into instances following the positive links.
+
+        Pixels and the links between 4-neighbours are laid out on a (2H-1, 2W-1)
+        grid, so that `cv2.connectedComponentsWithStats` only joins linked pixels.
+
+        Returns
+        -------
+        labels: np.ndarray
+            (H, W) int32 instance labels, 0 is background.
+        """
+        # The softmax of a (negative, positive) pair is the sigmoid of the difference
+        pixels = 1 / (1 + np.exp(segm_logits[0] - segm_logits[1])) > pixel_threshold
+        links = 1 / (1 + np.exp(link_logits[0::2] - link_logits[1::2])) > link_threshold
+        # Neighbour order: top-left, top, top-right, left, right, bottom-left,
+        # bottom and bottom-right.
+        up, left, right, down = links[1], links[3], links[4], links[6]
+
+        height, width = pixels.shape
+        grid = np.zeros((2 * height - 1, 2 * width - 1), dtype=np.uint8)
+        grid[::2, ::2] = pixels
+        grid[::2, 1::2] = pixels[:, :-1] & pixels[:, 1:] & (right[:, :-1] | left[:, 1:])
+        grid[1::2, ::2] = pixels[:-1] & pixels[1:] & (down[:-1] | up[1:])
+        _, labels, _, _ = cv2.connectedComponentsWithStats(grid, connectivity=4)
+        return labels[::2, ::2]
+
+    @staticmethod
+    def get_text_regions(labels, image_shape, min_area=300, min_height=10):
+        """Fit rotated rectangles to all labelled text instances in one pass.
+
+        Parameters
+        ----------
+        labels: np.ndarray
+            (H, W) instance labels from `link_pixels`.
+        image_shape: tuple
+            (height, width) of the image the rectangles are scaled to.
+        min_area: int
+            Minimum instance area in image pixels.
+        min_height: int
+            Minimum rectangle height in image pixels.
+        """
+        scale = np.array(
+            [image_shape[1] / labels.shape[1], image_shape[0] / labels.shape[0]],
+            dtype=np.float32,
+        )
+        ys, xs = np.nonzero(labels)
+        instance_ids = labels[ys, xs]
+        counts = np.bincount(instance_ids)[1:]
+        # Sort the pixels by instance so that each instance is a contiguous slice.
+        order = np.argsort(instance_ids, kind="stable")
+        points = ((np.stack((xs[order], ys[order]), axis=1) + 0.5) * scale).astype(
+            np.float32
+        )
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        keep = np.flatnonzero(counts * scale.prod() >= min_area)
+
+        rects, boxes = [], []
+        for idx in keep:
+            rect = cv2.minAreaRect(points[offsets[idx] : offsets[idx + 1]])
+            if min(rect[1]) < min_height:
+                continue
+            rects.append((*rect[0], *rect[1], rect[2]))
+            boxes.append(cv2.boxPoints(rect))
+
+        rects = np.array(rects, dtype=np.float32).reshape(-1, 5)
+        boxes = np.array(boxes, dtype=np.float32).reshape(-1, 4, 2)
+        bbox_coord = np.concatenate(
+            (np.floor(boxes.min(axis=1)), np.ceil(boxes.max(axis=1))), axis=1
+        ).astype(np.int32)
+        bbox_coord[:, 0::2] = np.clip(bbox_coord[:, 0::2], 0, image_shape[1])
+        bbox_coord[:, 1::2] = np.clip(bbox_coord[:, 1::2], 0, image_shape[0])
+        return rects, boxes, bbox_coord
+
+    @staticmethod
+    def crop_text_regions(image, bbox_coord):
+        """Get the text regions of `image` as views, no pixels are copied.
+
+        The boxes are clipped to at least 1px, so that degenerate rectangles do
+        not give empty crops. The crops can be passed straight to `TextRecognition`.
+        """
+        return [
+            image[ymin:ymax, xmin:xmax]
+            for xmin, ymin, xmax, ymax in Base._clip_boxes(bbox_coord, image.shape)
+        ]
+
+    @staticmethod
+    def draw_output(results, image, color=(0, 255, 0), thickness=2, **kwargs):
+        """Draw every rotated text rectangle with a single `cv2.polylines` call."""
+        cv2.polylines(
+            image,
+            list(np.round(results["boxes"]).astype(np.int32)),
+            True,
+            color,
+            thickness,
+        )
+        return image
@@ -0,0 +1,425 @@
+"""Sweep the plugin streams and threads, the number of infer requests and the batch
+size of a model on this host and keep the best configurations in a profile that
+`Base` picks up, e.g.
+
+    python -m pyvino_utils.models.openvino_base.autotune models/face-detection-adas-0001
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import platform
+import time
+
+import cv2
+import numpy as np
+from loguru import logger
+
+from openvino.inference_engine import IECore
+
+from .faults import InvalidModel
+
+__all__ = ["AutoTuner", "load_profile", "profile_path", "select_config"]
+
+OBJECTIVES = ("latency", "throughput")
+
+
+def profile_path():
+    """Profile file of this host, in `PYVINO_PROFILE_DIR` or `~/.cache/pyvino_utils`."""
+    directory = os.environ.get(
+        "PYVINO_PROFILE_DIR",
+        os.path.join(os.path.expanduser("~"), ".cache", "pyvino_utils"),
+    )
+    return os.path.join(directory, f"profile-{platform.node() or 'localhost'}.json")
+
+
+def _profile_key(model_structure, device):
+    """Key the profile by a hash of the IR topology, so that IRs of one name in
+    other precision folders, e.g. FP16 and INT8, or other model folders are tuned
+    apart."""
+    with open(model_structure, "rb") as xml:
+        digest = hashlib.sha1(xml.read()).hexdigest()[:12]
+    return f"{os.path.basename(model_structure)}:{digest}@{device}"
+
+
+_profiles = {}
+
+
+def _read_profile(path):
+    """Read a profile once per modification, an unreadable one is ignored."""
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return {}
+    cached = _profiles.get(path)
+    if cached is None or cached[0] != mtime:
+        try:
+            with open(path) as profile:
+                entries = json.load(profile)
+            if not isinstance(entries, dict):
+                raise ValueError(f"Expected an object, got: {type(entries).__name__}")
+        except (OSError, ValueError) as err:
+            logger.warning(f"Ignoring the tuning profile: {path}, {err}")
+            entries = {}
+        cached = _profiles[path] = (mtime, entries)
+    return cached[1]
+
+
+def load_profile(model_structure, device="CPU", path=None):
+    """Get the tuning results of a model, None when it was not tuned on this host."""
+    return _read_profile(path or profile_path()).get(
+        _profile_key(model_structure, device)
+    )
+
+
+def select_config(entry, objective="latency", max_latency_ms=None):
+    """Pick a configuration from the Pareto front of a profile entry.
+
+    Parameters
+    ----------
+    entry: dict
+        See `load_profile`.
+    objective: str
+        "latency" for the lowest p99 latency, "throughput" for the most frames per
+        second.
+    max_latency_ms: float
+        Pick the highest throughput with a p99 latency below this bound instead,
+        falls back to the lowest latency.
+
+    Returns
+    -------
+    config: dict
+        "config" for the plugin, "num_requests" and "batch_size" plus the measured
+        "throughput", "p50_ms", "p90_ms" and "p99_ms".
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Objective: {objective!r} not in {OBJECTIVES}")
+    results = entry["results"]
+    if max_latency_ms is not None:
+        within = [result for result in results if result["p99_ms"] <= max_latency_ms]
+        if within:
+            return max(within, key=lambda result: result["throughput"])
+        objective = "latency"
+    if objective == "throughput":
+        return max(results, key=lambda result: result["throughput"])
+    return min(results, key=lambda result: result["p99_ms"])
+
+
+class AutoTuner:
+    def __init__(
+        self,
+        model_name,
+        device="CPU",
+        inputs=None,
+        duration=2.0,
+        streams=None,
+        threads=(0,),
+        num_requests=None,
+        batch_sizes=(1, 2, 4, 8),
+        extensions=None,
+    ):
+        """
+        This class can be used to find the plugin streams and threads, number of
+        in-flight infer requests and batch size that suit a model on this host.
+
+        Every combination is run for `duration` seconds with all of its requests
+        kept busy, the throughput and latency percentiles are measured with the
+        requests' completion callbacks. The configurations that are not beaten in
+        both throughput and p99 latency by another one are saved to the profile of
+        the host, `Base` loads the model with one of them, see `select_config`.
+
+        Parameters
+        ----------
+        model_name: str
+            Path of the model without extension, as for `Base`.
+        device: str
+            Device to tune, streams are only swept on "CPU" and "GPU".
+        inputs: str or np.ndarray
+            Recorded input, an image or video file or (N, H, W, 3) BGR frames,
+            random pixels are used when not given.
+        duration: float
+            Seconds each configuration is measured for.
+        streams: list
+            Numbers of streams, defaults to 1, 2, 4, ... up to the CPU count.
+        threads: list
+            Numbers of CPU threads, 0 lets the plugin decide.
+        num_requests: list
+            Numbers of in-flight requests, defaults to 1, the streams and twice
+            the streams.
+        batch_sizes: list
+            Batch sizes, the model has to support reshaping them.
+
+        Example
+        -------
+        ```
+            tuner = AutoTuner("models/face-detection-adas-0001", inputs="video.mp4")
+            tuner.save(tuner.run())
+            face_detector = FaceDetection(
+                "models/face-detection-adas-0001", objective="throughput"
+            )
+        ```
+        """
+        self.model_structure = f"{model_name}.xml"
+        self.model_weights = f"{model_name}.bin"
+        self.device = device
+        self.duration = duration
+        cpus = os.cpu_count() or 1
+        self.streams = streams or sorted(
+            {1 << idx for idx in range(cpus.bit_length()) if 1 << idx <= cpus} | {cpus}
+        )
+        self.threads = threads
+        self.num_requests = num_requests
+        self.batch_sizes = batch_sizes
+
+        self._ie_core = IECore()
+        if extensions:
+            self._ie_core.add_extension(extensions, device)
+        try:
+            self.network = self._ie_core.read_network(
+                model=self.model_structure, weights=self.model_weights
+            )
+        except Exception:
+            msg = (
+                "Could not Initialise the network. "
+                "Have you entered the correct model path?"
+            )
+            logger.exception(msg)
+            raise InvalidModel(msg)
+        self.input_name = next(iter(self.network.inputs))
+        self.input_shape = list(self.network.inputs[self.input_name].shape)
+        self.frames = self._load_inputs(inputs)
+
+    def _load_inputs(self, inputs):
+        """Preprocess the recorded input once into (N, C, H, W) tensors."""
+        _, channels, height, width = self.input_shape
+        if inputs is None:
+            rng = np.random.default_rng(0)
+            return rng.integers(0, 256, (8, channels, height, width)).astype(np.float32)
+        if isinstance(inputs, str):
+            frames = []
+            cap = cv2.VideoCapture(inputs)
+            while len(frames) < 64:
+                flag, frame = cap.read()
+                if not flag:
+                    break
+                frames.append(frame)
+            cap.release()
+            if not frames:
+                raise ValueError(f"Could not read any frame from: {inputs}")
+            inputs = frames
+        return np.stack(
+            [cv2.resize(frame, (width, height)).transpose((2, 0, 1)) for frame in inputs]
+        ).astype(np.float32)
+
+    def _plugin_configs(self):
+        if self.device not in ("CPU", "GPU"):
+            return [({}, None, None)]
+        configs = []
+        for streams, threads in itertools.product(self.streams, self.threads):
+            if self.device == "GPU" and threads:
+                continue
+            config = {f"{self.device}_THROUGHPUT_STREAMS": str(streams)}
+            if threads:
+                config["CPU_THREADS_NUM"] = str(threads)
+            configs.append((config, streams, threads))
+        return configs
+
+    def _load(self, config, batch_size, num_requests):
+        original_shapes = {
+            name: list(data.shape) for name, data in self.network.inputs.items()
+        }
+        self.network.reshape(
+            {name: [batch_size, *shape[1:]] for name, shape in original_shapes.items()}
+        )
+        try:
+            return self._ie_core.load_network(
+                network=self.network,
+                device_name=self.device,
+                config=config,
+                num_requests=num_requests,
+            )
+        finally:
+            self.network.reshape(original_shapes)
+
+    def _batches(self, batch_size, count):
+        frames = self.frames
+        if len(frames) < batch_size:
+            frames = np.resize(frames, (batch_size, *frames.shape[1:]))
+        batches = len(frames) // batch_size
+        return [
+            {self.input_name: frames[(idx % batches) * batch_size :][:batch_size]}
+            for idx in range(count)
+        ]
+
+    def measure(self, exec_network, num_requests, batch_size):
+        """Keep `num_requests` requests busy for `duration` seconds.
+
+        Returns
+        -------
+        stats: dict
+            "throughput" in frames per second and "p50_ms", "p90_ms" and "p99_ms"
+            latencies of the inferences.
+        """
+        requests = exec_network.requests[:num_requests]
+        inputs = self._batches(batch_size, num_requests)
+        starts = [0] * num_requests
+        ends = [0] * num_requests
+
+        def on_complete(status, idx):
+            ends[idx] = time.perf_counter_ns()
+
+        for idx, request in enumerate(requests):
+            request.set_completion_callback(on_complete, idx)
+        # The first inferences allocate memory and are not representative.
+        for idx, request in enumerate(requests):
+            request.infer(inputs[idx])
+
+        latencies = []
+        busy = [False] * num_requests
+        begin = time.perf_counter_ns()
+        deadline = begin + int(self.duration * 1e9)
+        step = 0
+        while True:
+            idx = step % num_requests
+            if busy[idx]:
+                requests[idx].wait(-1)
+                latencies.append(max(ends[idx], starts[idx]) - starts[idx])
+                busy[idx] = False
+            if time.perf_counter_ns() >= deadline:
+                break
+            starts[idx] = time.perf_counter_ns()
+            requests[idx].async_infer(inputs[idx])
+            busy[idx] = True
+            step += 1
+        for idx in np.flatnonzero(busy):
+            requests[idx].wait(-1)
+            latencies.append(max(ends[idx], starts[idx]) - starts[idx])
+        elapsed = (time.perf_counter_ns() - begin) / 1e9
+
+        latencies = np.asarray(latencies) / 1e6
+        p50, p90, p99 = np.percentile(latencies, (50, 90, 99))
+        return {
+            "throughput": len(latencies) * batch_size / elapsed,
+            "p50_ms": float(p50),
+            "p90_ms": float(p90),
+            "p99_ms": float(p99),
+        }
+
+    def run(self):
+        """Measure every configuration.
+
+        Returns
+        -------
+        results: list
+            One dict per configuration, see `select_config`.
+        """
+        results = []
+        for config, streams, threads in self._plugin_configs():
+            candidates = self.num_requests or sorted(
+                {1, streams or 1, 2 * (streams or 1)}
+            )
+            for batch_size in self.batch_sizes:
+                try:
+                    exec_network = self._load(config, batch_size, max(candidates))
+                except Exception as err:
+                    logger.warning(f"Skipping {config} with batch {batch_size}: {err}")
+                    continue
+                for num_requests in candidates:
+                    stats = self.measure(exec_network, num_requests, batch_size)
+                    result = {
+                        "config": config,
+                        "streams": streams,
+                        "threads": threads,
+                        "num_requests": num_requests,
+                        "batch_size": batch_size,
+                        **stats,
+                    }
+                    logger.info(
+                        f"streams={streams} threads={threads} requests={num_requests} "
+                        f"batch={batch_size}: {stats['throughput']:.1f} FPS, "
+                        f"p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms"
+                    )
+                    results.append(result)
+                del exec_network
+        return results
+
+    @staticmethod
+    def pareto(results):
+        """Keep the configurations no other one beats in both throughput and p99
+        latency, by decreasing throughput."""
+        front = []
+        for result in sorted(
+            results, key=lambda result: (-result["throughput"], result["p99_ms"])
+        ):
+            if not front or result["p99_ms"] < front[-1]["p99_ms"]:
+                front.append(result)
+        return front
+
+    def save(self, results, path=None):
+        """Store the Pareto front of `results` in the profile of the host.
+
+        Returns
+        -------
+        path: str
+            The profile file.
+        """
+        path = path or profile_path()
+        profile = dict(_read_profile(path))
+        profile[_profile_key(self.model_structure, self.device)] = {
+            "tuned_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "cpu_count": os.cpu_count(),
+            "processor": platform.processor(),
+            "results": self.pareto(results),
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Replace the file in one step, other processes may be reading it.
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as tmp:
+            json.dump(profile, tmp, indent=2)
+        os.replace(tmp_path, path)
+        logger.info(f"Saved the tuning profile of {self.model_structure} to {path}")
+        return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("model_name", help="Path of the model without extension.")
+    parser.add_argument("--device", default="CPU")
+    parser.add_argument(
+        "--input", help="Image or video to tune with, random if not given."
+    )
+    parser.add_argument("--duration", type=float, default=2.0)
+    parser.add_argument("--streams", type=int, nargs="+")
+    parser.add_argument("--threads", type=int, nargs="+", default=[0])
+    parser.add_argument("--num-requests", type=int, nargs="+")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--profile", help="Profile file, defaults to the host's.")
+    args = parser.parse_args(argv)
+
+    tuner = AutoTuner(
+        args.model_name,
+        device=args.device,
+        inputs=args.input,
+        duration=args.duration,
+        streams=args.streams,
+        threads=args.threads,
+        num_requests=args.num_requests,
+        batch_sizes=args.batch_sizes,
+    )
+    results = tuner.run()
+    if not results:
+        parser.exit(1, "No configuration could be loaded.\n")
+    path = tuner.save(results, args.profile)
+    for objective in OBJECTIVES:
+        best = select_config({"results": tuner.pareto(results)}, objective)
+        print(
+            f"Best {objective}: streams={best['streams']} threads={best['threads']} "
+            f"requests={best['num_requests']} batch={best['batch_size']} -> "
+            f"{best['throughput']:.1f} FPS, p99 {best['p99_ms']:.2f} ms"
+        )
+    print(f"Profile: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+import asyncio
+import functools
 import os
 import time
 from abc import ABC, abstractmethod, abstractstaticmethod
@@ -9,7 +11,23 @@ from loguru import logger
 
 from openvino.inference_engine import IECore, IENetwork, get_version
 
+from pyvino_utils.opencv_utils.cv_utils import (
+    FACE_REFERENCE_LANDMARKS,
+    similarity_transforms,
+    to_uint8,
+)
+from pyvino_utils.telemetry.metrics import REGISTRY, ModelMetrics
+from pyvino_utils.telemetry.tracing import TRACER
+
+from .autotune import load_profile, select_config
 from .faults import InvalidImageArray, InvalidModel
+from .quantization import precision_path
+from .results import PredictResult
+
+
+def _set_future_result(future, result):
+    if not future.done():
+        future.set_result(result)
 
 
 def openvino_version_check():
@@ -34,6 +52,9 @@ class Base(ABC):
         extensions=None,
         **kwargs,
     ):
+        # Load the IR of another precision, e.g. "INT8" after `quantize`.
+        if kwargs.get("precision"):
+            model_name = precision_path(model_name, kwargs["precision"])
         self.model_weights = f"{model_name}.bin"
         self.model_structure = f"{model_name}.xml"
         assert (
@@ -58,6 +79,39 @@ class Base(ABC):
         self._update_source_resolution(source_width, source_height, **kwargs)
         self.exec_network = None
         self.perf_stats = {}
+        # Streams, threads, requests and batch size tuned for this host, see
+        # `autotune.AutoTuner`, explicit arguments take precedence.
+        tuned = self._tuned_config(**kwargs)
+        self.config = {**tuned.get("config", {}), **kwargs.get("config", {})}
+        self.max_batch_size = kwargs.get("max_batch_size", 16)
+        # Batch size of the tuned configuration, e.g. for `InferenceServer` batches,
+        # `max_batch_size` only caps the batches of crops and images.
+        self.tuned_batch_size = tuned.get("batch_size")
+        self._exec_networks = {}
+        self._batch_buffers = {}
+        # Results reference their images weakly and drop the input tensors, unless
+        # asked to keep them.
+        self.keep_images = kwargs.get("keep_images", False)
+        self.keep_tensors = kwargs.get("keep_tensors", False)
+        # Number of infer requests, i.e. of concurrent `apredict` calls.
+        self.num_requests = kwargs.get("num_requests", tuned.get("num_requests", 1))
+        self._idle_requests = None
+        self._idle_requests_loop = None
+        # Latencies and counts go to the shared metrics registry, `metrics=None`
+        # turns them off.
+        self.name = Path(model_name).name
+        registry = kwargs.get("metrics", REGISTRY)
+        self.metrics = (
+            ModelMetrics(registry, self.name) if registry is not None else None
+        )
+        if self.metrics is not None:
+            self.metrics.model_size.set(os.stat(self.model_weights).st_size)
+        # Synthetic inferences run per infer request at load time, so that the slow
+        # first calls do not land on real frames.
+        self.warmup = kwargs.get("warmup", 0)
+        self._first_inference_time = None
+        self._warm_inference_time = None
+        self._ready = False
         self.load_model()
 
     def _update_source_resolution(self, source_width, source_height, **kwargs):
@@ -68,6 +122,33 @@ class Base(ABC):
             self._init_image_w = source_width
             self._init_image_h = source_height
 
+    def _tuned_config(
+        self, profile=True, objective="latency", max_latency_ms=None, **kwargs
+    ):
+        """Get the configuration of the host's tuning profile, see `select_config`.
+
+        `profile` can be False to ignore the profile or the path of another one.
+        """
+        if not profile:
+            return {}
+        entry = load_profile(
+            self.model_structure,
+            self._device,
+            path=profile if isinstance(profile, str) else None,
+        )
+        if entry is None:
+            return {}
+        tuned = dict(select_config(entry, objective, max_latency_ms))
+        if objective == "latency" and max_latency_ms is None:
+            # Latencies are per inference, which favours batches of 1, while batching
+            # requests still lowers the latency under load, so no batch size is tuned.
+            tuned.pop("batch_size")
+        logger.info(
+            f"Model: {self.model_structure} uses the tuned {objective} configuration: "
+            f"{tuned['config']}, {tuned['num_requests']} requests."
+        )
+        return tuned
+
     @property
     def model_size(self):
         """Get the size of model in Megabytes."""
@@ -102,7 +183,10 @@ class Base(ABC):
         if self.exec_network is None:
             start_time = time.time()
             self.exec_network = self._ie_core.load_network(
-                network=self.model, device_name=self._device
+                network=self.model,
+                device_name=self._device,
+                config=self.config,
+                num_requests=self.num_requests,
             )
             self._model_load_time = (time.time() - start_time) * 1000
             logger.info(
@@ -110,6 +194,69 @@ class Base(ABC):
                 f"{self._model_load_time:.3f} ms to load."
             )
             self._check_supported_layers()
+            if self.metrics is not None:
+                self.metrics.exec_networks.set(1 + len(self._exec_networks))
+            if self.warmup:
+                self.warm_up(self.warmup)
+            self._ready = True
+            if self.metrics is not None:
+                self.metrics.ready.set(1)
+
+    @property
+    def is_ready(self):
+        """Whether the model is loaded and warmed up, for readiness checks."""
+        return self._ready
+
+    def warm_up(self, iterations=3):
+        """Run synthetic inferences on every infer request of the model.
+
+        The first inferences allocate memory and fill the primitive caches of the
+        plugin, which makes them far slower than the following ones. The first and
+        the median of the following latencies are kept in `_first_inference_time`
+        and `_warm_inference_time`, in ms as `_model_load_time`.
+
+        Parameters
+        ----------
+        iterations: int
+            Number of inferences per infer request.
+        """
+        start_time = time.time()
+        latencies = self._warm_up_network(
+            self.exec_network,
+            {name: data.shape for name, data in self.model.inputs.items()},
+            iterations,
+        )
+        self._first_inference_time = latencies[0]
+        self._warm_inference_time = (
+            float(np.median(latencies[1:])) if len(latencies) > 1 else latencies[0]
+        )
+        if self.metrics is not None:
+            self.metrics.first_inference.set(self._first_inference_time / 1000)
+            self.metrics.warm_inference.set(self._warm_inference_time / 1000)
+        logger.info(
+            f"Model: {self.model_structure} took "
+            f"{(time.time() - start_time) * 1000:.3f} ms to warm up, first inference: "
+            f"{self._first_inference_time:.3f} ms, warm: "
+            f"{self._warm_inference_time:.3f} ms."
+        )
+
+    @staticmethod
+    def _warm_up_network(exec_network, shapes, iterations):
+        """Run `iterations` synthetic inferences of input `shapes` on every infer
+        request of `exec_network` and get their latencies in ms."""
+        rng = np.random.default_rng(0)
+        # Random pixels rather than zeros, which some kernels skip through.
+        inputs = {
+            name: rng.integers(0, 256, size=shape).astype(np.float32)
+            for name, shape in shapes.items()
+        }
+        latencies = []
+        for request in exec_network.requests:
+            for _ in range(iterations):
+                start = time.perf_counter_ns()
+                request.infer(inputs)
+                latencies.append((time.perf_counter_ns() - start) / 1e6)
+        return latencies
 
     def _check_supported_layers(self):
         """Check if layers are supported by the device."""
@@ -129,6 +276,360 @@ class Base(ABC):
                     "Check whether extensions are available to add to IECore."
                 )
 
+    def _get_exec_network(self, batch_size=1, height=None, width=None):
+        """Get an executable network reshaped to `batch_size`, loading it only once.
+
+        `height` and `width` optionally reshape the spatial dimensions of the main
+        input as well.
+
+        Note: The model has to support reshaping of the requested dimensions.
+        """
+        input_shape = [batch_size, *self.input_shape[1:]]
+        if height and width:
+            input_shape[2:] = height, width
+        if input_shape == list(self.input_shape):
+            return self.exec_network
+
+        key = tuple(input_shape)
+        if key not in self._exec_networks:
+            original_shapes = {
+                name: list(data.shape) for name, data in self.model.inputs.items()
+            }
+            new_shapes = {
+                name: [batch_size, *shape[1:]] for name, shape in original_shapes.items()
+            }
+            new_shapes[self.input_name] = input_shape
+            self.model.reshape(new_shapes)
+            try:
+                start_time = time.time()
+                self._exec_networks[key] = self._ie_core.load_network(
+                    network=self.model,
+                    device_name=self._device,
+                    config=self.config,
+                    num_requests=self.num_requests,
+                )
+            finally:
+                self.model.reshape(original_shapes)
+            if self.metrics is not None:
+                self.metrics.exec_networks.set(1 + len(self._exec_networks))
+            logger.info(
+                f"Model: {self.model_structure} took "
+                f"{(time.time() - start_time) * 1000:.3f} ms to load "
+                f"with input shape: {input_shape}."
+            )
+            # Reshaped networks start cold as well, warm them before their first
+            # real inference.
+            if self.warmup:
+                self._warm_up_network(self._exec_networks[key], new_shapes, self.warmup)
+        return self._exec_networks[key]
+
+    def _batch_size_for(self, count):
+        """Round `count` up to a power of two, capped at `max_batch_size`.
+
+        Bucketing the batch sizes keeps the number of reshaped networks small.
+        """
+        batch_size = 1
+        while batch_size < count:
+            batch_size *= 2
+        return min(batch_size, self.max_batch_size)
+
+    def _get_batch_buffers(self, batch_size):
+        """Get the preallocated (NHWC scratch, NCHW input) pair for `batch_size`."""
+        if batch_size not in self._batch_buffers:
+            _, channels, height, width = self.input_shape
+            self._batch_buffers[batch_size] = (
+                np.empty((batch_size, height, width, channels), dtype=np.uint8),
+                np.zeros((batch_size, channels, height, width), dtype=np.float32),
+            )
+        return self._batch_buffers[batch_size]
+
+    def _record_stages(self, start, preprocessed, inferred, frames=1):
+        """Record the stage durations of a call from its `time.perf_counter_ns`
+        marks in the metrics and the trace, postprocessing ends now."""
+        end = time.perf_counter_ns()
+        if self.metrics is not None:
+            self.metrics.observe(
+                (preprocessed - start) / 1e9,
+                (inferred - preprocessed) / 1e9,
+                (end - inferred) / 1e9,
+                frames,
+            )
+        if TRACER.enabled:
+            TRACER.add(f"{self.name}:preprocess", start, preprocessed, "model")
+            TRACER.add(f"{self.name}:infer", preprocessed, inferred, "model")
+            TRACER.add(f"{self.name}:postprocess", inferred, end, "model")
+
+    @staticmethod
+    def _check_slot(out, slot):
+        """OpenCV writes into `dst` only when its type matches, otherwise it returns
+        a new array, which is copied over so that the batch slot keeps no stale
+        pixels.
+
+        Float images would be truncated by the 8 bit slot, their rows are returned
+        to be written straight into the float input, see `_fill_batch`, the slot
+        only gets a clipped copy.
+        """
+        if out is slot:
+            return None
+        out = out.reshape(slot.shape)
+        if out.dtype == np.float32:
+            np.clip(out, 0, 255, out=slot, casting="unsafe")
+            return out
+        slot[...] = out
+        return None
+
+    @staticmethod
+    def _fill_batch(batch, hwc_batch, count, float_rows):
+        """Change the data layout of the first `count` rows from NHWC to NCHW in a
+        single copy, then write the `_check_slot` float rows over theirs."""
+        batch[:count] = hwc_batch[:count].transpose((0, 3, 1, 2))
+        for idx, row in float_rows.items():
+            batch[idx] = row.transpose((2, 0, 1))
+
+    @staticmethod
+    def _clip_boxes(boxes, image_shape):
+        """Clip (xmin, ymin, xmax, ymax) boxes so that each one is at least 1px."""
+        height, width = image_shape[:2]
+        boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+        boxes[:, :2] = np.clip(boxes[:, :2], 0, (width - 1, height - 1))
+        boxes[:, 2:] = np.clip(boxes[:, 2:], boxes[:, :2] + 1, (width, height))
+        return boxes
+
+    def preprocess_crops(self, image, boxes, batch_size=None):
+        """Resize the regions of interest of `image` into one batched input tensor.
+
+        Parameters
+        ----------
+        image: np.ndarray
+            BGR frame.
+        boxes: np.ndarray
+            (N, 4) array of clipped (xmin, ymin, xmax, ymax) boxes.
+        batch_size: int
+            Batch size of the returned tensor, must be >= N.
+
+        Returns
+        -------
+        batch: np.ndarray
+            (batch_size, C, H, W) input tensor, rows beyond N are left untouched.
+        crops: list
+            Views of `image` for each box, no pixels are copied.
+        """
+        batch_size = batch_size or len(boxes)
+        hwc_batch, batch = self._get_batch_buffers(batch_size)
+        height, width, channels = hwc_batch.shape[1:]
+        image = to_uint8(image, channels)
+        crops, float_rows = [], {}
+        for idx, (xmin, ymin, xmax, ymax) in enumerate(boxes):
+            crop = image[ymin:ymax, xmin:xmax]
+            slot = hwc_batch[idx]
+            row = self._check_slot(cv2.resize(crop, (width, height), dst=slot), slot)
+            if row is not None:
+                float_rows[idx] = row
+            crops.append(crop)
+        self._fill_batch(batch, hwc_batch, len(boxes), float_rows)
+        return batch, crops
+
+    def _infer_batch(self, batch, count, request_id=0):
+        """Run a blocking inference on a batched input and trim the padded rows."""
+        exec_network = self._get_exec_network(batch.shape[0])
+        if self.metrics is not None:
+            self.metrics.requests_in_use.inc()
+        try:
+            exec_network.start_async(
+                request_id=request_id, inputs={self.input_name: batch}
+            )
+            status = exec_network.requests[request_id].wait(-1)
+        finally:
+            if self.metrics is not None:
+                self.metrics.requests_in_use.dec()
+        if status != 0:
+            raise RuntimeError(f"Inference request failed with status: {status!r}")
+        return [
+            exec_network.requests[request_id].outputs[output_name][:count].copy()
+            for output_name in self.model.outputs
+        ]
+
+    def predict_crops(self, image, boxes, request_id=0, show_bbox=False, **kwargs):
+        """Run the model on every region of interest of `image` in batches.
+
+        Each batch costs a single inference instead of one per region.
+
+        Parameters
+        ----------
+        image: np.ndarray
+            BGR frame.
+        boxes: list
+            (xmin, ymin, xmax, ymax) boxes, e.g. `FaceDetection` "bbox_coord".
+
+        Returns
+        -------
+        results: list
+            Per box results in the same order as `boxes`.
+        """
+        if not isinstance(image, np.ndarray):
+            raise InvalidImageArray("Image not parsed correctly.")
+        boxes = self._clip_boxes(boxes, image.shape)
+        results = []
+        for start in range(0, len(boxes), self.max_batch_size):
+            chunk = boxes[start : start + self.max_batch_size]
+            chunk_start = time.perf_counter_ns()
+            batch, crops = self.preprocess_crops(
+                image, chunk, self._batch_size_for(len(chunk))
+            )
+            preprocessed = time.perf_counter_ns()
+            pred_result = self._infer_batch(batch, len(chunk), request_id)
+            inferred = time.perf_counter_ns()
+            results.extend(
+                self.preprocess_batch_output(
+                    pred_result, crops, show_bbox=show_bbox, **kwargs
+                )
+            )
+            self._record_stages(chunk_start, preprocessed, inferred, int(not start))
+        return results
+
+    def preprocess_images(self, images, batch_size=None):
+        """Resize whole frames into one batched input tensor, see `preprocess_crops`."""
+        batch_size = batch_size or len(images)
+        hwc_batch, batch = self._get_batch_buffers(batch_size)
+        height, width, channels = hwc_batch.shape[1:]
+        float_rows = {}
+        for idx, image in enumerate(images):
+            slot = hwc_batch[idx]
+            row = self._check_slot(
+                cv2.resize(to_uint8(image, channels), (width, height), dst=slot), slot
+            )
+            if row is not None:
+                float_rows[idx] = row
+        self._fill_batch(batch, hwc_batch, len(images), float_rows)
+        return batch
+
+    def predict_batch(self, images, request_id=0, show_bbox=False, **kwargs):
+        """Run the model on a list of frames, one inference per batch.
+
+        Returns
+        -------
+        results: list
+            Per frame results in the same order as `images`.
+        """
+        results = []
+        for start in range(0, len(images), self.max_batch_size):
+            chunk = images[start : start + self.max_batch_size]
+            chunk_start = time.perf_counter_ns()
+            batch = self.preprocess_images(chunk, self._batch_size_for(len(chunk)))
+            preprocessed = time.perf_counter_ns()
+            pred_result = self._infer_batch(batch, len(chunk), request_id)
+            inferred = time.perf_counter_ns()
+            results.extend(
+                self.preprocess_batch_output(
+                    pred_result, chunk, show_bbox=show_bbox, **kwargs
+                )
+            )
+            self._record_stages(chunk_start, preprocessed, inferred, len(chunk))
+        return results
+
+    def preprocess_aligned(self, image, landmarks, batch_size=None, reference=None):
+        """Warp the faces of `image` into one batched input tensor, aligned on their
+        landmarks.
+
+        A similarity transform onto `reference` is estimated for all faces at once
+        and each face is warped straight into the preallocated batch buffer.
+
+        Parameters
+        ----------
+        image: np.ndarray
+            BGR frame.
+        landmarks: np.ndarray
+            (N, K, 2) landmarks in frame pixels, see
+            `FacialLandmarks.to_frame_coords`.
+        batch_size: int
+            Batch size of the returned tensor, must be >= N.
+        reference: np.ndarray
+            (K, 2) landmark positions relative to the input size, defaults to
+            `FACE_REFERENCE_LANDMARKS`.
+
+        Returns
+        -------
+        batch: np.ndarray
+            (batch_size, C, H, W) input tensor, rows beyond N are left untouched.
+        aligned: np.ndarray
+            (N, H, W, C) 8 bit view of the aligned faces, overwritten by the next
+            batch, float faces are clipped in it.
+        """
+        batch_size = batch_size or len(landmarks)
+        hwc_batch, batch = self._get_batch_buffers(batch_size)
+        height, width, channels = hwc_batch.shape[1:]
+        image = to_uint8(image, channels)
+        reference = FACE_REFERENCE_LANDMARKS if reference is None else reference
+        matrices = similarity_transforms(landmarks, reference * (width, height))
+        float_rows = {}
+        for idx, matrix in enumerate(matrices):
+            slot = hwc_batch[idx]
+            out = cv2.warpAffine(
+                image, matrix, (width, height), dst=slot, borderMode=cv2.BORDER_REPLICATE
+            )
+            row = self._check_slot(out, slot)
+            if row is not None:
+                float_rows[idx] = row
+        self._fill_batch(batch, hwc_batch, len(matrices), float_rows)
+        return batch, hwc_batch[: len(matrices)]
+
+    def predict_aligned(
+        self, image, landmarks, request_id=0, show_bbox=False, reference=None, **kwargs
+    ):
+        """Run the model on every face of `image` aligned on its landmarks, in
+        batches.
+
+        Parameters
+        ----------
+        image: np.ndarray
+            BGR frame.
+        landmarks: np.ndarray
+            (N, K, 2) landmarks in frame pixels.
+
+        Returns
+        -------
+        results: list
+            Per face results in the same order as `landmarks`, with
+            `keep_images=True` their "image" is a view of the reused batch buffer.
+        """
+        if not isinstance(image, np.ndarray):
+            raise InvalidImageArray("Image not parsed correctly.")
+        results = []
+        for start in range(0, len(landmarks), self.max_batch_size):
+            chunk = landmarks[start : start + self.max_batch_size]
+            chunk_start = time.perf_counter_ns()
+            batch, aligned = self.preprocess_aligned(
+                image, chunk, self._batch_size_for(len(chunk)), reference
+            )
+            preprocessed = time.perf_counter_ns()
+            pred_result = self._infer_batch(batch, len(chunk), request_id)
+            inferred = time.perf_counter_ns()
+            results.extend(
+                self.preprocess_batch_output(
+                    pred_result, list(aligned), show_bbox=show_bbox, **kwargs
+                )
+            )
+            self._record_stages(chunk_start, preprocessed, inferred, int(not start))
+        return results
+
+    def preprocess_batch_output(
+        self, inference_results, images, show_bbox=False, **kwargs
+    ):
+        """Decode batched inference results into a list of per image results.
+
+        Subclasses should override this with a vectorised decoder, the default
+        decodes one row at a time with `preprocess_output`.
+        """
+        return [
+            self.preprocess_output(
+                [output[idx : idx + 1] for output in inference_results],
+                image,
+                show_bbox=show_bbox,
+                **kwargs,
+            )
+            for idx, image in enumerate(images)
+        ]
+
     def preprocess_input(self, image, height=None, width=None, **kwargs):
         """Helper function for processing frame"""
         if (height and width) is None:
@@ -140,7 +641,8 @@ class Base(ABC):
             return f
 
         gray_p_frame = None
-        p_frame = cv2.resize(image, (width, height))
+        frame = to_uint8(image, self.input_shape[1])
+        p_frame = cv2.resize(frame, (width, height)).reshape(height, width, -1)
         # Change data layout from HWC to CHW
         p_frame = transpose_image(p_frame)
 
@@ -151,35 +653,156 @@ class Base(ABC):
         return p_frame, gray_p_frame
 
     def predict(self, image, request_id=0, show_bbox=False, **kwargs):
+        """Run the model on `image`.
+
+        Returns
+        -------
+        results: PredictResult
+            "predict_end_time" in ms and the decoded "process_output", the
+            "processed_BGR_frame" and "processed_Gray_frame" input tensors are only
+            kept when the model was created with `keep_tensors=True`.
+        """
         if not isinstance(image, np.ndarray):
             raise InvalidImageArray("Image not parsed correctly.")
-        results = {}
+        start = time.perf_counter_ns()
         p_frame, gray_p_frame = self.preprocess_input(image, **kwargs)
-        results["processed_BGR_frame"] = p_frame
-        results["processed_Gray_frame"] = gray_p_frame
+        preprocessed = time.perf_counter_ns()
+        # Inputs preprocessed to another size run on a network reshaped to it.
+        exec_network = self._get_exec_network(len(p_frame), *p_frame.shape[2:])
 
-        predict_start_time = time.time()
-        self.exec_network.start_async(
-            request_id=request_id, inputs={self.input_name: p_frame}
-        )
-        status = self.exec_network.requests[request_id].wait(-1)
+        if self.metrics is not None:
+            self.metrics.requests_in_use.inc()
+        try:
+            exec_network.start_async(
+                request_id=request_id, inputs={self.input_name: p_frame}
+            )
+            status = exec_network.requests[request_id].wait(-1)
+        finally:
+            if self.metrics is not None:
+                self.metrics.requests_in_use.dec()
+        if status != 0 and self.metrics is not None:
+            self.metrics.dropped.inc()
         if status == 0:
             pred_result = []
             for output_name, data_ptr in self.model.outputs.items():
-                pred_result.append(
-                    self.exec_network.requests[request_id].outputs[output_name]
-                )
-            self.perf_stats[output_name] = self.exec_network.requests[
+                pred_result.append(exec_network.requests[request_id].outputs[output_name])
+            self.perf_stats[output_name] = exec_network.requests[
                 request_id
             ].get_perf_counts()
-            predict_end_time = float(time.time() - predict_start_time) * 1000
+            inferred = time.perf_counter_ns()
+            predict_end_time = (inferred - preprocessed) / 1e6
             process_output = self.preprocess_output(
                 pred_result, image, show_bbox=show_bbox, **kwargs
             )
-            results["predict_end_time"] = predict_end_time
-            results["process_output"] = process_output
+            self._record_stages(start, preprocessed, inferred)
+            results = PredictResult(
+                predict_end_time=predict_end_time, process_output=process_output
+            )
+            if self.keep_tensors:
+                results["processed_BGR_frame"] = p_frame
+                results["processed_Gray_frame"] = gray_p_frame
             return results
 
+    async def _acquire_request(self):
+        """Wait for an idle infer request of the main executable network."""
+        loop = asyncio.get_running_loop()
+        # Queues are bound to the loop they are first used on.
+        if self._idle_requests is None or self._idle_requests_loop is not loop:
+            self._idle_requests = asyncio.Queue()
+            self._idle_requests_loop = loop
+            for request_id in range(len(self.exec_network.requests)):
+                self._idle_requests.put_nowait(request_id)
+        return await self._idle_requests.get()
+
+    async def _ainfer(self, inputs, batch_size=1, height=None, width=None):
+        """Run one inference on an idle request without blocking the event loop.
+
+        Returns
+        -------
+        pred_result: list
+            Copies of the outputs, the request is reused once released.
+        """
+        loop = asyncio.get_running_loop()
+        request_id = await self._acquire_request()
+        if self.metrics is not None:
+            self.metrics.requests_in_use.inc()
+        try:
+            # Request ids are shared by the reshaped networks, each has
+            # `num_requests` requests.
+            exec_network = self._get_exec_network(batch_size, height, width)
+            request = exec_network.requests[request_id]
+            done = loop.create_future()
+
+            def on_complete(status, _):
+                # The callback stays set on the request, a later `predict` with
+                # it still runs it once this loop is gone.
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(_set_future_result, done, status)
+
+            request.set_completion_callback(on_complete)
+            request.async_infer(inputs)
+            status = await done
+            if status != 0:
+                if self.metrics is not None:
+                    self.metrics.dropped.inc()
+                raise RuntimeError(f"Inference request failed with status: {status!r}")
+            return [
+                request.outputs[output_name].copy() for output_name in self.model.outputs
+            ]
+        finally:
+            self._idle_requests.put_nowait(request_id)
+            if self.metrics is not None:
+                self.metrics.requests_in_use.dec()
+
+    async def apredict(self, image, show_bbox=False, executor=None, **kwargs):
+        """Run the model on `image` without blocking the event loop.
+
+        The inference is started asynchronously and its completion callback
+        resolves a future on the running loop, up to `num_requests` inferences of
+        the model run concurrently.
+
+        Parameters
+        ----------
+        image: np.ndarray
+            BGR frame.
+        executor: concurrent.futures.Executor
+            Runs `preprocess_output` off the event loop when given, e.g. for the
+            heavier pose or text decoders.
+
+        Returns
+        -------
+        results: PredictResult
+            Same as `predict`.
+        """
+        if not isinstance(image, np.ndarray):
+            raise InvalidImageArray("Image not parsed correctly.")
+        start = time.perf_counter_ns()
+        p_frame, gray_p_frame = self.preprocess_input(image, **kwargs)
+        preprocessed = time.perf_counter_ns()
+        pred_result = await self._ainfer(
+            {self.input_name: p_frame}, len(p_frame), *p_frame.shape[2:]
+        )
+        # Time spent waiting for an idle request counts as inference.
+        inferred = time.perf_counter_ns()
+        predict_end_time = (inferred - preprocessed) / 1e6
+
+        loop = asyncio.get_running_loop()
+        postprocess = functools.partial(
+            self.preprocess_output, pred_result, image, show_bbox=show_bbox, **kwargs
+        )
+        if executor is None:
+            process_output = postprocess()
+        else:
+            process_output = await loop.run_in_executor(executor, postprocess)
+        self._record_stages(start, preprocessed, inferred)
+        results = PredictResult(
+            predict_end_time=predict_end_time, process_output=process_output
+        )
+        if self.keep_tensors:
+            results["processed_BGR_frame"] = p_frame
+            results["processed_Gray_frame"] = gray_p_frame
+        return results
+
     @staticmethod
     @abstractstaticmethod
     def draw_output(results, image, **kwargs):
@@ -0,0 +1,235 @@
+import math
+
+import numpy as np
+
+from pyvino_utils.opencv_utils.cv_utils import get_tiles, non_max_suppression
+
+from .base_model import Base
+from .faults import InvalidImageArray
+from .results import Detections
+
+
+class DetectionBase(Base):
+    """Base Class for the SSD style detection models with a 1x1xNx7 output."""
+
+    def __init__(self, *args, **kwargs):
+        # Reshape the network to the aspect ratio of each frame instead of squashing
+        # frames into the fixed input, see `native_input_size`.
+        self.native_aspect = kwargs.get("native_aspect", False)
+        self.pixel_budget = kwargs.get("pixel_budget")
+        self.size_multiple = kwargs.get("size_multiple", 32)
+        self._native_sizes = {}
+        super().__init__(*args, **kwargs)
+
+    def native_input_size(self, image_shape):
+        """Get the (height, width) input size for frames of `image_shape`.
+
+        The size keeps the aspect ratio of the frame at about `pixel_budget`
+        pixels, those of the network input by default, rounded to multiples of
+        `size_multiple`. The rounding buckets the sizes, so that sources of the same
+        aspect ratio share one reshaped network, see `_get_exec_network`.
+
+        Note: The model has to support reshaping its spatial dimensions.
+        """
+        key = tuple(image_shape[:2])
+        size = self._native_sizes.get(key)
+        if size is None:
+            height, width = key
+            budget = self.pixel_budget or int(np.prod(self.input_shape[2:]))
+            scale = math.sqrt(budget / (height * width))
+            multiple = self.size_multiple
+            size = tuple(
+                max(multiple, int(round(dim * scale / multiple)) * multiple)
+                for dim in (height, width)
+            )
+            self._native_sizes[key] = size
+        return size
+
+    def preprocess_input(self, image, height=None, width=None, **kwargs):
+        """Resize the frame to the network input, or to its `native_input_size`
+        with `native_aspect=True`.
+
+        The SSD boxes are relative to the whole resized frame either way, so they
+        are decoded with the size of the frame.
+        """
+        if self.native_aspect and not (height and width):
+            height, width = self.native_input_size(image.shape)
+        return super().preprocess_input(image, height, width, **kwargs)
+
+    def decode_detections(self, inference_results, width, height, threshold=None):
+        """Decode the detections of every image in a batch.
+
+        Parameters
+        ----------
+        inference_results: list
+            Model outputs, the first one of shape [1, 1, N, 7] holding
+            [image_id, label, conf, xmin, ymin, xmax, ymax] rows.
+        width: int
+            Width of the image(s) the boxes are scaled to.
+        height: int
+            Height of the image(s) the boxes are scaled to.
+
+        Returns
+        -------
+        detections: np.ndarray
+            (N, 7) [xmin, ymin, xmax, ymax, conf, label, image_id] rows in pixels.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        output = inference_results[0].reshape(-1, 7)
+        # An image_id of -1 marks the end of the valid detections.
+        output = output[(output[:, 0] >= 0) & (output[:, 2] >= threshold)]
+        return np.hstack(
+            (output[:, 3:7] * (width, height, width, height), output[:, [2, 1, 0]])
+        ).astype(np.float32)
+
+    def preprocess_batch_output(
+        self, inference_results, images, show_bbox=False, **kwargs
+    ):
+        """Split the detections of a batch by their image_id, the boxes are scaled
+        to the size of each image."""
+        detections = self.decode_detections(inference_results, 1, 1)
+        batch_results = []
+        for idx, image in enumerate(images):
+            height, width = image.shape[:2]
+            image_detections = detections[detections[:, 6] == idx]
+            image_detections[:, 0:4] *= (width, height, width, height)
+            batch_results.append(
+                self.make_detections(image_detections, image, show_bbox, **kwargs)
+            )
+        return batch_results
+
+    def predict_tiled(
+        self,
+        image,
+        tile_size=None,
+        overlap=0.2,
+        nms_threshold=0.5,
+        request_id=0,
+        show_bbox=False,
+        **kwargs
+    ):
+        """Detect small objects in high resolution frames through overlapping tiles.
+
+        The tiles are views of `image`, resized into batches and run through one
+        inference per batch. Boxes are mapped back to frame coordinates and the
+        duplicates found at the seams are merged with non-maximum suppression.
+
+        Parameters
+        ----------
+        image: np.ndarray
+            BGR frame.
+        tile_size: tuple
+            (width, height) of the tiles in frame pixels, defaults to the network
+            input size, i.e. no downscaling.
+        overlap: float
+            Fraction of a tile shared with its neighbours, should be larger than the
+            objects of interest relative to the tile size.
+        nms_threshold: float
+            Overlap above which duplicates are suppressed, see
+            `merge_tile_detections`.
+
+        Returns
+        -------
+        results: Detections
+            "bbox_coord" (N, 4) int32 boxes, "confidences" (N,) and "labels" (N,).
+        """
+        if not isinstance(image, np.ndarray):
+            raise InvalidImageArray("Image not parsed correctly.")
+        tile_size = tile_size or tuple(self.input_shape[:1:-1])
+        tiles = get_tiles(image.shape, tile_size, overlap)
+
+        detections, detection_tiles = [], []
+        for start in range(0, len(tiles), self.max_batch_size):
+            chunk = tiles[start : start + self.max_batch_size]
+            batch, _ = self.preprocess_crops(
+                image, chunk, self._batch_size_for(len(chunk))
+            )
+            pred_result = self._infer_batch(batch, len(chunk), request_id)
+            tile_detections = self.decode_detections(pred_result, 1, 1)
+            tile_detections = tile_detections[tile_detections[:, 6] < len(chunk)]
+            # Scale the normalised boxes by their tile and offset them into the frame
+            tile = chunk[tile_detections[:, 6].astype(int)]
+            tile_detections[:, 0:4] *= np.tile(tile[:, 2:] - tile[:, :2], 2)
+            tile_detections[:, 0:4] += np.tile(tile[:, :2], 2)
+            detections.append(tile_detections)
+            detection_tiles.append(tile)
+
+        detections = np.vstack(detections)
+        keep = self.merge_tile_detections(
+            detections, np.vstack(detection_tiles), image.shape, nms_threshold
+        )
+        return self.make_detections(detections[keep], image, show_bbox, **kwargs)
+
+    @staticmethod
+    def merge_tile_detections(
+        detections, tiles, image_shape, nms_threshold=0.5, margin=2
+    ):
+        """Suppress the duplicates of the detections of overlapping tiles.
+
+        Objects seen whole by two tiles are merged by intersection over union, as
+        in any detector, so nested and overlapping objects of one label survive.
+        Objects cut by a seam leave a partial box inside a full one, those pairs are
+        merged by intersection over the smaller box, but only across tiles and when
+        one of the boxes touches an inner border of its tile.
+
+        Parameters
+        ----------
+        detections: np.ndarray
+            (N, 7) decoded detections in frame pixels, see `decode_detections`.
+        tiles: np.ndarray
+            (N, 4) xmin, ymin, xmax and ymax of the tile of each detection.
+        image_shape: tuple
+            (height, width, ...) of the frame.
+        margin: int
+            Distance in pixels to a tile border at which a box counts as cut.
+
+        Returns
+        -------
+        keep: np.ndarray
+            Indices of the kept detections, in decreasing score order.
+        """
+        frame_height, frame_width = image_shape[:2]
+        boxes, scores = detections[:, :4], detections[:, 4]
+        # Tile borders inside the frame cut the objects they cross.
+        inner = np.hstack((tiles[:, :2] > 0, tiles[:, 2:] < (frame_width, frame_height)))
+        cut = ((np.abs(boxes - tiles) <= margin) & inner).any(axis=1)
+
+        # Offset the boxes of each label so that only boxes of one label overlap.
+        boxes = boxes + detections[:, 5:6] * (max(frame_height, frame_width) + 1)
+        keep = non_max_suppression(boxes, scores, nms_threshold)
+
+        boxes, tiles, cut = boxes[keep], tiles[keep], cut[keep]
+        xmin, ymin, xmax, ymax = boxes.T
+        areas = np.maximum(xmax - xmin, 0) * np.maximum(ymax - ymin, 0)
+        order = np.arange(len(keep))
+        merged = []
+        while order.size:
+            idx, rest = order[0], order[1:]
+            merged.append(idx)
+            width = np.minimum(xmax[idx], xmax[rest]) - np.maximum(xmin[idx], xmin[rest])
+            height = np.minimum(ymax[idx], ymax[rest]) - np.maximum(ymin[idx], ymin[rest])
+            intersection = np.maximum(width, 0) * np.maximum(height, 0)
+            ios = intersection / np.maximum(np.minimum(areas[idx], areas[rest]), 1e-9)
+            seam = (tiles[rest] != tiles[idx]).any(axis=1) & (cut[rest] | cut[idx])
+            order = rest[~((ios > nms_threshold) & seam)]
+        return keep[merged]
+
+    def make_detections(self, detections, image, show_bbox=False, **kwargs):
+        """Wrap decoded (N, 7) detections into a `Detections` result.
+
+        Returns
+        -------
+        results: Detections
+            "bbox_coord" (N, 4) int32 boxes, "confidences" (N,) and "labels" (N,).
+        """
+        bbox_coord = detections[:, :4].astype(np.int32)
+        if show_bbox:
+            for xmin, ymin, xmax, ymax in bbox_coord.tolist():
+                self.draw_output(image, xmin, ymin, xmax, ymax, **kwargs)
+        return Detections(
+            bbox_coord=bbox_coord,
+            confidences=detections[:, 4].copy(),
+            labels=detections[:, 5].astype(np.int32),
+            image=image,
+            keep_image=self.keep_images,
+        )
@@ -0,0 +1,378 @@
+"""Quantize a model to INT8 with the OpenVINO Post-training Optimization Tool, using
+frames of an `InputFeeder` source for calibration, and compare its speed and
+outputs with the FP32 and FP16 models, e.g.
+
+    python -m pyvino_utils.models.openvino_base.quantization \
+        models/intel/face-detection-adas-0001/FP16/face-detection-adas-0001 video.mp4
+"""
+import argparse
+import os
+import time
+
+import cv2
+import numpy as np
+from loguru import logger
+
+from openvino.inference_engine import IECore
+
+from pyvino_utils.input_handler.input_feeder import InputFeeder
+
+from .faults import InvalidModel
+
+try:
+    from addict import Dict
+
+    try:
+        from openvino.tools.pot.api import DataLoader
+        from openvino.tools.pot.engines.ie_engine import IEEngine
+        from openvino.tools.pot.graph import load_model, save_model
+        from openvino.tools.pot.graph.model_utils import compress_model_weights
+        from openvino.tools.pot.pipeline.initializer import create_pipeline
+    except ModuleNotFoundError:
+        # Releases before 2021.4 ship the tool as `compression`.
+        from compression.api import DataLoader
+        from compression.engines.ie_engine import IEEngine
+        from compression.graph import load_model, save_model
+        from compression.graph.model_utils import compress_model_weights
+        from compression.pipeline.initializer import create_pipeline
+except ModuleNotFoundError:
+    DataLoader = None
+
+__all__ = [
+    "PRECISIONS",
+    "precision_path",
+    "sample_calibration_frames",
+    "quantize",
+    "compare_precisions",
+]
+
+# Folder names of the Open Model Zoo, a model's IRs are siblings, e.g.
+# intel/<model>/FP16/<model>.xml and intel/<model>/FP16-INT8/<model>.xml
+PRECISIONS = ("FP32", "FP16", "FP16-INT8", "FP32-INT8", "INT8")
+
+
+def _split_precision(model_name):
+    """Split a model path into (root, precision folder or None, name)."""
+    directory, name = os.path.split(model_name)
+    parent, folder = os.path.split(directory)
+    if folder.upper() in PRECISIONS:
+        return parent, folder.upper(), name
+    return directory, None, name
+
+
+def precision_path(model_name, precision):
+    """Get the path of the `precision` IR of a model, without extension.
+
+    "INT8" matches the "INT8", "FP16-INT8" and "FP32-INT8" folders.
+
+    Raises
+    ------
+    InvalidModel
+        When there is no such IR, INT8 ones are made with `quantize`.
+    """
+    root, _, name = _split_precision(model_name)
+    precision = precision.upper()
+    candidates = (
+        ("INT8", "FP16-INT8", "FP32-INT8") if precision == "INT8" else (precision,)
+    )
+    for candidate in candidates:
+        path = os.path.join(root, candidate, name)
+        if os.path.exists(f"{path}.xml"):
+            return path
+    raise InvalidModel(
+        f"No {precision} model of {name} found in {root}, "
+        f"INT8 models can be created with `quantize`."
+    )
+
+
+def _int8_dir(model_name):
+    """Folder `quantize` writes the INT8 IR of a model to by default, the
+    "FP16-INT8" or "FP32-INT8" sibling of its precision folder, which
+    `precision_path` finds."""
+    root, precision, _ = _split_precision(model_name)
+    return os.path.join(
+        root, f"{precision}-INT8" if precision in ("FP16", "FP32") else "INT8"
+    )
+
+
+def sample_calibration_frames(input_feed, count=300, holdout=50):
+    """Sample frames spread over a source, split into calibration and held-out
+    frames.
+
+    Parameters
+    ----------
+    input_feed: str or InputFeeder
+        Image, video or camera.
+    count: int
+        Number of calibration frames.
+    holdout: int
+        Number of frames kept out of the calibration, e.g. for
+        `compare_precisions`.
+
+    Returns
+    -------
+    calibration: list
+    held_out: list
+        BGR frames.
+    """
+    feed = input_feed
+    if not isinstance(feed, InputFeeder):
+        feed = InputFeeder(input_feed, metrics=None)
+    if isinstance(feed.cap, np.ndarray):
+        frames = [feed.cap]
+    else:
+        total = count + holdout
+        # Skip frames without decoding them to cover the whole video.
+        stride = max(1, feed.video_len // total) if feed.video_len > 0 else 1
+        frames = []
+        while len(frames) < total:
+            if not all(feed.cap.grab() for _ in range(stride - 1)):
+                break
+            flag, frame = feed.cap.read()
+            if not flag:
+                break
+            frames.append(frame)
+        if input_feed is not feed:
+            feed.cap.release()
+    if len(frames) < 2 or not holdout:
+        return frames, []
+
+    # Every n-th frame is held out, so that both sets span the whole source.
+    every = max(2, len(frames) // holdout)
+    held_out = set(range(every - 1, len(frames), every)[:holdout])
+    calibration = [frame for idx, frame in enumerate(frames) if idx not in held_out]
+    logger.info(
+        f"Sampled {len(calibration)} calibration and {len(held_out)} held-out frames "
+        f"from {feed.input_feed}"
+    )
+    return calibration, [frames[idx] for idx in sorted(held_out)]
+
+
+def _to_tensor(frame, input_shape):
+    """Resize a BGR frame to a (C, H, W) input, as `Base.preprocess_input`."""
+    height, width = input_shape[2:]
+    return cv2.resize(frame, (width, height)).transpose((2, 0, 1))
+
+
+class _FrameLoader(DataLoader or object):
+    """Feed the calibration frames to the Post-training Optimization Tool."""
+
+    def __init__(self, frames, input_shape):
+        if DataLoader is not None:
+            super().__init__(Dict())
+        self.frames = frames
+        self.input_shape = input_shape
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __getitem__(self, index):
+        if index >= len(self):
+            raise IndexError("Index out of dataset size")
+        # ((index, annotation), data), there are no annotations to calibrate with.
+        return (index, None), _to_tensor(self.frames[index], self.input_shape)
+
+
+def quantize(
+    model_name,
+    calibration_frames,
+    preset="performance",
+    target_device="CPU",
+    device="CPU",
+    output_dir=None,
+):
+    """Quantize a model to INT8 with the DefaultQuantization algorithm.
+
+    Parameters
+    ----------
+    model_name: str
+        Path of the FP32 or FP16 model without extension.
+    calibration_frames: list
+        BGR frames, see `sample_calibration_frames`.
+    preset: str
+        "performance" quantizes weights and activations symmetrically, "mixed"
+        uses asymmetric activations, which can be more accurate.
+    target_device: str
+        Device the INT8 model is optimised for, "CPU", "GPU" or "ANY".
+    device: str
+        Device the calibration statistics are collected on.
+    output_dir: str
+        Folder the IR is written to, defaults to the "FP16-INT8" or "FP32-INT8"
+        sibling of the model's precision folder.
+
+    Returns
+    -------
+    model_name: str
+        Path of the INT8 model without extension, can be loaded with
+        `precision="INT8"`.
+    """
+    if DataLoader is None:
+        raise ModuleNotFoundError(
+            "The OpenVINO Post-training Optimization Tool is not installed, "
+            "install it with: pip install pyvino_utils[pot]"
+        )
+    if not calibration_frames:
+        raise ValueError("At least one calibration frame is needed.")
+    name = os.path.basename(model_name)
+    if output_dir is None:
+        output_dir = _int8_dir(model_name)
+
+    ie_core = IECore()
+    network = ie_core.read_network(model=f"{model_name}.xml", weights=f"{model_name}.bin")
+    input_shape = network.inputs[next(iter(network.inputs))].shape
+
+    start_time = time.time()
+    model = load_model(
+        Dict(
+            {
+                "model_name": name,
+                "model": f"{model_name}.xml",
+                "weights": f"{model_name}.bin",
+            }
+        )
+    )
+    engine = IEEngine(
+        config=Dict({"device": device, "stat_requests_number": os.cpu_count() or 1}),
+        data_loader=_FrameLoader(calibration_frames, input_shape),
+        metric=None,
+    )
+    algorithms = [
+        {
+            "name": "DefaultQuantization",
+            "params": {
+                "target_device": target_device,
+                "preset": preset,
+                "stat_subset_size": len(calibration_frames),
+            },
+        }
+    ]
+    pipeline = create_pipeline([Dict(algorithm) for algorithm in algorithms], engine)
+    compressed = pipeline.run(model)
+    compress_model_weights(compressed)
+    save_model(compressed, save_path=output_dir, model_name=name)
+    logger.info(
+        f"Model: {model_name} took {time.time() - start_time:.1f} s to quantize "
+        f"with {len(calibration_frames)} frames, saved to {output_dir}"
+    )
+    return os.path.join(output_dir, name)
+
+
+def compare_precisions(
+    model_name, frames, precisions=("FP32", "FP16", "INT8"), device="CPU", config=None
+):
+    """Run the IRs of a model in each precision on the same frames.
+
+    The outputs are compared with those of the first precision found, which
+    should be the most accurate, so that no labelled data is needed.
+
+    Parameters
+    ----------
+    model_name: str
+        Path of any IR of the model without extension.
+    frames: list
+        BGR frames, e.g. the held-out ones of `sample_calibration_frames`.
+
+    Returns
+    -------
+    comparison: dict
+        Precision to "mean_ms", "p99_ms" and "fps" of single frame inferences, and
+        the "cosine" similarity and "max_abs_error" of the outputs against the
+        reference, averaged and maxed over the frames and outputs.
+    """
+    comparison = {}
+    reference = None
+    for precision in precisions:
+        try:
+            path = precision_path(model_name, precision)
+        except InvalidModel as err:
+            logger.warning(str(err))
+            continue
+        ie_core = IECore()
+        network = ie_core.read_network(model=f"{path}.xml", weights=f"{path}.bin")
+        input_name = next(iter(network.inputs))
+        input_shape = network.inputs[input_name].shape
+        exec_network = ie_core.load_network(
+            network=network, device_name=device, config=config or {}
+        )
+        tensors = [_to_tensor(frame, input_shape)[np.newaxis] for frame in frames]
+        # The first inference allocates memory and is not representative.
+        exec_network.infer({input_name: tensors[0]})
+
+        outputs, latencies = [], []
+        for tensor in tensors:
+            start = time.perf_counter_ns()
+            result = exec_network.infer({input_name: tensor})
+            latencies.append((time.perf_counter_ns() - start) / 1e6)
+            outputs.append(
+                [np.array(result[name], dtype=np.float64) for name in network.outputs]
+            )
+
+        stats = {
+            "path": path,
+            "mean_ms": float(np.mean(latencies)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            "fps": 1000 / float(np.mean(latencies)),
+        }
+        if reference is None:
+            reference = outputs
+            stats.update(reference=True, cosine=1.0, max_abs_error=0.0)
+        else:
+            cosines, errors = [], []
+            for frame_outputs, reference_outputs in zip(outputs, reference):
+                for output, expected in zip(frame_outputs, reference_outputs):
+                    output, expected = output.ravel(), expected.ravel()
+                    norm = np.linalg.norm(output) * np.linalg.norm(expected)
+                    cosines.append(output @ expected / norm if norm else 1.0)
+                    errors.append(np.abs(output - expected).max())
+            stats.update(
+                reference=False,
+                cosine=float(np.mean(cosines)),
+                max_abs_error=float(np.max(errors)),
+            )
+        comparison[precision] = stats
+        logger.info(
+            f"{precision}: {stats['mean_ms']:.2f} ms mean, {stats['p99_ms']:.2f} ms p99, "
+            f"cosine {stats['cosine']:.4f} to the reference"
+        )
+    return comparison
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "model_name", help="Path of the FP32/FP16 model without extension."
+    )
+    parser.add_argument("input_feed", help="Image or video to calibrate with.")
+    parser.add_argument("--count", type=int, default=300)
+    parser.add_argument("--holdout", type=int, default=50)
+    parser.add_argument(
+        "--preset", default="performance", choices=("performance", "mixed")
+    )
+    parser.add_argument("--target-device", default="CPU")
+    parser.add_argument("--device", default="CPU")
+    parser.add_argument("--output-dir")
+    args = parser.parse_args(argv)
+
+    calibration, held_out = sample_calibration_frames(
+        args.input_feed, args.count, args.holdout
+    )
+    quantize(
+        args.model_name,
+        calibration,
+        preset=args.preset,
+        target_device=args.target_device,
+        device=args.device,
+        output_dir=args.output_dir,
+    )
+    if held_out:
+        comparison = compare_precisions(args.model_name, held_out, device=args.device)
+        for precision, stats in comparison.items():
+            print(
+                f"{precision:>9}: {stats['fps']:8.1f} FPS, "
+                f"p99 {stats['p99_ms']:7.2f} ms, cosine {stats['cosine']:.4f}, "
+                f"max abs error {stats['max_abs_error']:.4g}"
+            )
+
+
+if __name__ == "__main__":
+    main()
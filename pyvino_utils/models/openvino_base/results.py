@@ -0,0 +1,276 @@
+import weakref
+from collections.abc import Mapping
+
+import numpy as np
+
+__all__ = [
+    "Result",
+    "PredictResult",
+    "Detections",
+    "TextRegions",
+    "AgeGenderResult",
+    "EmotionsResult",
+    "VehicleAttrsResult",
+    "HeadPoseResult",
+    "LandmarksResult",
+    "GazeResult",
+    "PoseResult",
+    "TextResult",
+    "EmbeddingResult",
+    "tracked_result_type",
+    "ImageRef",
+]
+
+
+class ImageRef:
+    """Weak reference to an image, which may be a view such as a crop of a frame.
+
+    Views are usually temporaries, e.g. `frame[y0:y1, x0:x1]` passed to `predict`,
+    which would be gone as soon as the call returns. So the frame owning the
+    memory of the view is referenced weakly instead, together with the offset,
+    shape and strides of the view, which is rebuilt on every call. The image stays
+    available for as long as its frame is alive.
+    """
+
+    __slots__ = ("_root", "_offset", "_shape", "_dtype", "_strides")
+
+    def __init__(self, image):
+        root = image
+        while isinstance(root.base, np.ndarray):
+            root = root.base
+        self._root = weakref.ref(root)
+        self._offset = (
+            image.__array_interface__["data"][0] - root.__array_interface__["data"][0]
+        )
+        self._shape = image.shape if root is not image else None
+        self._dtype = image.dtype
+        self._strides = image.strides
+
+    def __call__(self):
+        root = self._root()
+        if root is None or self._shape is None:
+            return root
+        return np.ndarray(
+            self._shape,
+            self._dtype,
+            buffer=root,
+            offset=self._offset,
+            strides=self._strides,
+        )
+
+
+class Result(Mapping):
+    """Base class of the model results.
+
+    Results are slotted objects instead of dicts, so that keeping thousands of
+    them around costs little more than their arrays. They can still be used like
+    the read-only dicts they replace, e.g. `results["bbox_coord"]` or
+    `results.get("image")`.
+
+    The "image" a result was decoded from is only referenced weakly, unless
+    `keep_image` is set, so buffered results do not keep their frames alive.
+    Crops and other views stay available for as long as their frame is, see
+    `ImageRef`.
+    """
+
+    __slots__ = ("_image",)
+    _fields = ()
+    # Fields whose first axis indexes the objects found in the image.
+    _object_fields = ()
+
+    def __init__(self, image=None, keep_image=False, **fields):
+        for name in self._fields:
+            if name != "image":
+                setattr(self, name, fields.pop(name, None))
+        if fields:
+            raise TypeError(
+                f"{type(self).__name__} got unexpected fields: {sorted(fields)}"
+            )
+        self._image = image if keep_image or image is None else ImageRef(image)
+
+    @property
+    def image(self):
+        """The image the result belongs to, None once a weakly held image is gone."""
+        image = getattr(self, "_image", None)
+        return image() if isinstance(image, ImageRef) else image
+
+    @image.setter
+    def image(self, image):
+        self._image = image
+
+    def __getitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self._fields:
+            raise KeyError(f"{type(self).__name__} has no field {key!r}")
+        setattr(self, key, value)
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def __repr__(self):
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}" for name in self._fields if name != "image"
+        )
+        return f"{type(self).__name__}({fields})"
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def to_columns(self, empty_row=False):
+        """Flatten the result into columns, one row per object for results with
+        object fields and a single row otherwise.
+
+        Scalars become scalar columns, dicts of scalars one column per key, e.g.
+        "head_pose_angles.yaw", and arrays list columns. The image and lazy views
+        are left out.
+
+        Parameters
+        ----------
+        empty_row: bool
+            Give a result without objects a single row of its other fields instead
+            of no rows.
+
+        Returns
+        -------
+        count: int
+            Number of rows.
+        columns: dict
+            Column name to a 1D np.ndarray or a list of `count` values.
+        """
+        objects = len(getattr(self, self._object_fields[0])) if self._object_fields else 1
+        columns = {}
+        if not objects and not empty_row:
+            return 0, columns
+        count = max(objects, 1)
+        for name in self._fields:
+            value = None if name == "image" else getattr(self, name)
+            if value is None:
+                continue
+            if name in self._object_fields:
+                if not objects:
+                    continue
+                value = np.asarray(value)
+                columns[name] = (
+                    value if value.ndim == 1 else value.reshape(count, -1).tolist()
+                )
+            elif isinstance(value, (str, int, float, np.number)):
+                columns[name] = [value] * count
+            elif isinstance(value, np.ndarray):
+                columns[name] = [value.ravel().tolist()] * count
+            elif type(value) is dict:
+                for key, item in value.items():
+                    columns[f"{name}.{key}"] = [item] * count
+        return count, columns
+
+
+class PredictResult(Result):
+    """Result of `Base.predict`, the input tensors are only kept with
+    `keep_tensors=True`."""
+
+    _fields = (
+        "predict_end_time",
+        "process_output",
+        "processed_BGR_frame",
+        "processed_Gray_frame",
+    )
+    __slots__ = _fields
+
+    def to_columns(self, empty_row=False):
+        """Columns of "process_output" with a "predict_time_ms" column, the input
+        tensors are left out."""
+        output = self.process_output
+        count, columns = (
+            output.to_columns(empty_row) if isinstance(output, Result) else (1, {})
+        )
+        columns["predict_time_ms"] = [self.predict_end_time] * count
+        return count, columns
+
+
+class Detections(Result):
+    """(N, 4) int32 "bbox_coord" with their (N,) "confidences" and "labels"."""
+
+    _fields = ("bbox_coord", "confidences", "labels", "image")
+    _object_fields = _fields[:-1]
+    __slots__ = _fields[:-1]
+
+
+class TextRegions(Result):
+    _fields = ("rects", "boxes", "bbox_coord", "image")
+    _object_fields = _fields[:-1]
+    __slots__ = _fields[:-1]
+
+
+class AgeGenderResult(Result):
+    _fields = ("gender", "age", "image")
+    __slots__ = _fields[:-1]
+
+
+class EmotionsResult(Result):
+    _fields = ("emotional_state", "image")
+    __slots__ = _fields[:-1]
+
+
+class VehicleAttrsResult(Result):
+    _fields = ("color", "color_confidence", "type", "type_confidence", "image")
+    __slots__ = _fields[:-1]
+
+
+class HeadPoseResult(Result):
+    _fields = ("head_pose_angles", "rotation_matrix", "image")
+    __slots__ = _fields[:-1]
+
+
+class LandmarksResult(Result):
+    _fields = ("landmarks", "eye_boxes", "face_landmarks", "image")
+    __slots__ = _fields[:-1]
+
+
+class GazeResult(Result):
+    _fields = ("Gaze_Vector", "image")
+    __slots__ = _fields[:-1]
+
+
+class PoseResult(Result):
+    _fields = ("keypoints", "image")
+    _object_fields = _fields[:-1]
+    __slots__ = _fields[:-1]
+
+
+class TextResult(Result):
+    _fields = ("text", "confidence", "image")
+    __slots__ = _fields[:-1]
+
+
+class EmbeddingResult(Result):
+    _fields = ("embedding", "image")
+    __slots__ = _fields[:-1]
+
+
+_TRACKED_TYPES = {}
+
+
+def tracked_result_type(result_type):
+    """Get the subclass of a result type with a leading "track_id" field, as returned
+    by `TrackResultCache`, created once per type."""
+    tracked = _TRACKED_TYPES.get(result_type)
+    if tracked is None:
+        tracked = _TRACKED_TYPES[result_type] = type(
+            f"Tracked{result_type.__name__}",
+            (result_type,),
+            {
+                "__module__": __name__,
+                "__slots__": ("track_id",),
+                "_fields": ("track_id", *result_type._fields),
+            },
+        )
+    return tracked
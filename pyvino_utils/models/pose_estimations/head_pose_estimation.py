@@ -1,9 +1,11 @@
-import math
+import time
 
 import cv2
 import numpy as np
+from loguru import logger
 
 from ..openvino_base.base_model import Base, InvalidModel
+from ..openvino_base.results import HeadPoseResult
 
 
 class HeadPoseEstimation(Base):
@@ -44,72 +46,160 @@ class HeadPoseEstimation(Base):
             name: "angle_r_fc", shape: [1, 1] - Estimated roll (in degrees).
 
         """
-        results = {}
+        return self.preprocess_batch_output(
+            inference_results, [image], show_bbox=show_bbox, **kwargs
+        )[0]
+
+    def preprocess_batch_output(
+        self, inference_results, images, show_bbox=False, **kwargs
+    ):
+        """Estimate the Head Pose on a batch of cropped faces."""
+        angles = self.decode_angles(inference_results, len(images))
+        rotation_matrices = self.rotation_matrices(angles)
+
+        output_layer_names = ["yaw", "pitch", "roll"]
+        batch_results = []
+        for image, face_angles, rotation_matrix in zip(images, angles, rotation_matrices):
+            results = HeadPoseResult(
+                head_pose_angles=dict(zip(output_layer_names, face_angles)),
+                rotation_matrix=rotation_matrix,
+                image=image,
+                keep_image=self.keep_images,
+            )
+            if show_bbox:
+                self.draw_output(results, image, **kwargs)
+            batch_results.append(results)
+        return batch_results
+
+    def predict_poses(self, image, boxes, request_id=0, show_bbox=False, **kwargs):
+        """Estimate the head pose of every face in `image`.
+
+        Parameters
+        ----------
+        image: np.ndarray
+            BGR frame.
+        boxes: list
+            (xmin, ymin, xmax, ymax) face boxes, e.g. `FaceDetection` "bbox_coord".
+
+        Returns
+        -------
+        angles: np.ndarray
+            (N, 3) yaw, pitch and roll angles in degrees.
+        rotation_matrices: np.ndarray
+            (N, 3, 3) head rotation matrices.
+        """
+        boxes = self._clip_boxes(boxes, image.shape)
+        angles = np.empty((len(boxes), 3), dtype=np.float32)
+        for start in range(0, len(boxes), self.max_batch_size):
+            chunk = boxes[start : start + self.max_batch_size]
+            chunk_start = time.perf_counter_ns()
+            batch, _ = self.preprocess_crops(
+                image, chunk, self._batch_size_for(len(chunk))
+            )
+            preprocessed = time.perf_counter_ns()
+            pred_result = self._infer_batch(batch, len(chunk), request_id)
+            inferred = time.perf_counter_ns()
+            angles[start : start + len(chunk)] = self.decode_angles(
+                pred_result, len(chunk)
+            )
+            self._record_stages(chunk_start, preprocessed, inferred, int(not start))
+        rotation_matrices = self.rotation_matrices(angles)
+        if show_bbox:
+            centres = (boxes[:, :2] + boxes[:, 2:]) / 2
+            self.draw_axes(image, rotation_matrices, centres, **kwargs)
+        return angles, rotation_matrices
+
+    def decode_angles(self, inference_results, count):
+        """Stack the yaw, pitch and roll outputs into a (N, 3) array.
+
+        Example
+        -------
+        Model: head-pose-estimation-adas-0001
+
+            Output layer names in Inference Engine format:
+
+            name: "angle_y_fc", shape: [N, 1] - Estimated yaw (in degrees).
+            name: "angle_p_fc", shape: [N, 1] - Estimated pitch (in degrees).
+            name: "angle_r_fc", shape: [N, 1] - Estimated roll (in degrees).
+        """
         if len(inference_results) != 3:
             msg = (
                 f"The model:{self.model_structure} does not contain expected output "
                 "shape as per the docs."
             )
-            self.logger.error(msg)
+            logger.error(msg)
             raise InvalidModel(msg)
-
-        output_layer_names = ["yaw", "pitch", "roll"]
-        flattened_predictions = np.vstack(inference_results).ravel()
-        results["head_pose_angles"] = dict(zip(output_layer_names, flattened_predictions))
-        if show_bbox:
-            self.draw_output(results, image, **kwargs)
-        results["image"] = image
-        return results
+        return np.hstack([output.reshape(count, -1) for output in inference_results])
 
     @staticmethod
-    def draw_output(results, image, **kwargs):
-        """Draw head pose estimation on frame.
+    def rotation_matrices(angles):
+        """Get the (N, 3, 3) rotation matrices of (N, 3) yaw, pitch, roll angles.
+
+        The matrices follow the axes convention of `draw_output`: x pointing right,
+        y pointing down and z out of the screen.
 
         Ref:
         https://github.com/natanielruiz/deep-head-pose/blob/master/code/utils.py#L86+L117
         """
-        yaw, pitch, roll = results["head_pose_angles"].values()
+        angles = np.radians(np.asarray(angles, dtype=np.float32).reshape(-1, 3))
+        yaw, pitch, roll = -angles[:, 0], angles[:, 1], angles[:, 2]
+        cos_y, sin_y = np.cos(yaw), np.sin(yaw)
+        cos_p, sin_p = np.cos(pitch), np.sin(pitch)
+        cos_r, sin_r = np.cos(roll), np.sin(roll)
+
+        # R = Rx(pitch) @ Ry(yaw) @ Rz(roll), written out element-wise.
+        rotation_matrices = np.empty((len(angles), 3, 3), dtype=np.float32)
+        rotation_matrices[:, 0, 0] = cos_y * cos_r
+        rotation_matrices[:, 0, 1] = -cos_y * sin_r
+        rotation_matrices[:, 0, 2] = sin_y
+        rotation_matrices[:, 1, 0] = cos_p * sin_r + sin_p * sin_y * cos_r
+        rotation_matrices[:, 1, 1] = cos_p * cos_r - sin_p * sin_y * sin_r
+        rotation_matrices[:, 1, 2] = -sin_p * cos_y
+        rotation_matrices[:, 2, 0] = sin_p * sin_r - cos_p * sin_y * cos_r
+        rotation_matrices[:, 2, 1] = sin_p * cos_r + cos_p * sin_y * sin_r
+        rotation_matrices[:, 2, 2] = cos_p * cos_y
+        return rotation_matrices
 
-        yaw = -(yaw * np.pi / 180)
-        pitch = pitch * np.pi / 180
-        roll = roll * np.pi / 180
+    @staticmethod
+    def draw_axes(image, rotation_matrices, centres, axis_size=50, **kwargs):
+        """Draw the head pose axes of N faces with one `cv2.polylines` call per axis.
+
+        Parameters
+        ----------
+        rotation_matrices: np.ndarray
+            (N, 3, 3) head rotation matrices.
+        centres: np.ndarray
+            (N, 2) (x, y) image coordinates where the axes start.
+        """
+        centres = np.asarray(centres, dtype=np.float32).reshape(-1, 1, 2)
+        # The image plane projection of each rotated axis, shape (N, 3, 2)
+        end_points = centres + axis_size * rotation_matrices[:, :2, :].transpose(0, 2, 1)
+        axes_colours = ((0, 0, 255), (0, 255, 0), (255, 0, 0))
+        for axis, (colour, thickness) in enumerate(zip(axes_colours, (3, 3, 2))):
+            lines = np.concatenate((centres, end_points[:, axis : axis + 1]), axis=1)
+            cv2.polylines(image, list(lines.astype(np.int32)), False, colour, thickness)
+        return image
 
-        height, width = image.shape[:2]
-        tdx = width / 2
-        tdy = height / 2
-        size = 1000
-
-        # X-Axis pointing to right. drawn in red
-        x1 = size * (math.cos(yaw) * math.cos(roll)) + tdx
-        y1 = (
-            size
-            * (
-                math.cos(pitch) * math.sin(roll)
-                + math.cos(roll) * math.sin(pitch) * math.sin(yaw)
-            )
-            + tdy
-        )
+    @staticmethod
+    def draw_output(results, image, **kwargs):
+        """Draw head pose estimation on frame.
 
-        # Y-Axis | drawn in green
-        #        v
-        x2 = size * (-math.cos(yaw) * math.sin(roll)) + tdx
-        y2 = -(
-            size
-            * (
-                math.cos(pitch) * math.cos(roll)
-                - math.sin(pitch) * math.sin(yaw) * math.sin(roll)
+        Ref:
+        https://github.com/natanielruiz/deep-head-pose/blob/master/code/utils.py#L86+L117
+        """
+        rotation_matrix = results.get("rotation_matrix")
+        if rotation_matrix is None:
+            rotation_matrix = HeadPoseEstimation.rotation_matrices(
+                list(results["head_pose_angles"].values())
             )
-            + tdy
+        height, width = image.shape[:2]
+        HeadPoseEstimation.draw_axes(
+            image,
+            rotation_matrix.reshape(-1, 3, 3),
+            (width / 2, height / 2),
+            axis_size=kwargs.pop("axis_size", 1000),
+            **kwargs,
         )
-
-        # Z-Axis (out of the screen) drawn in blue
-        x3 = size * (math.sin(yaw)) + tdx
-        y3 = size * (-math.cos(yaw) * math.sin(pitch)) + tdy
-
-        cv2.line(image, (int(tdx), int(tdy)), (int(x1), int(y1)), (0, 0, 255), 3)
-        cv2.line(image, (int(tdx), int(tdy)), (int(x2), int(y2)), (0, 255, 0), 3)
-        cv2.line(image, (int(tdx), int(tdy)), (int(x3), int(y3)), (255, 0, 0), 2)
-
         return image
 
     @staticmethod
@@ -1,9 +1,77 @@
-import math
-
 import cv2
 import numpy as np
 
 from ..openvino_base.base_model import Base, InvalidModel
+from ..openvino_base.results import PoseResult
+
+KEYPOINTS = (
+    "nose",
+    "neck",
+    "r_shoulder",
+    "r_elbow",
+    "r_wrist",
+    "l_shoulder",
+    "l_elbow",
+    "l_wrist",
+    "r_hip",
+    "r_knee",
+    "r_ankle",
+    "l_hip",
+    "l_knee",
+    "l_ankle",
+    "r_eye",
+    "l_eye",
+    "r_ear",
+    "l_ear",
+)
+# Keypoint pairs connected by each limb and the (x, y) PAF channels of that limb.
+# Ordered so that every limb starts from a keypoint which was already grouped.
+LIMB_KEYPOINT_IDS = np.array(
+    [
+        [1, 2],
+        [1, 5],
+        [2, 3],
+        [3, 4],
+        [5, 6],
+        [6, 7],
+        [1, 8],
+        [8, 9],
+        [9, 10],
+        [1, 11],
+        [11, 12],
+        [12, 13],
+        [1, 0],
+        [0, 14],
+        [14, 16],
+        [0, 15],
+        [15, 17],
+        [2, 16],
+        [5, 17],
+    ]
+)
+LIMB_PAF_IDS = np.array(
+    [
+        [12, 13],
+        [20, 21],
+        [14, 15],
+        [16, 17],
+        [22, 23],
+        [24, 25],
+        [0, 1],
+        [2, 3],
+        [4, 5],
+        [6, 7],
+        [8, 9],
+        [10, 11],
+        [28, 29],
+        [30, 31],
+        [34, 35],
+        [32, 33],
+        [36, 37],
+        [18, 19],
+        [26, 27],
+    ]
+)
 
 
 class HumanPoseEstimation(Base):
@@ -29,28 +97,222 @@ class HumanPoseEstimation(Base):
             **kwargs
         )
 
-    def preprocess_output(self, inference_results, image, show_bbox, **kwargs):
+    def preprocess_output(
+        self,
+        inference_results,
+        image,
+        show_bbox=False,
+        keypoint_threshold=0.1,
+        upsample_ratio=4,
+        min_keypoints=3,
+        **kwargs
+    ):
         """
         Handles the output of the Pose Estimation model.
+
+        Example
+        -------
+        Model: human-pose-estimation-0001
+
+            Output layer names in Inference Engine format:
+
+            name: "Mconv7_stage2_L1", shape: [1, 38, 32, 57] - Part affinity fields.
+            name: "Mconv7_stage2_L2", shape: [1, 19, 32, 57] - Keypoint heatmaps.
+
+        Returns
+        -------
+        results: PoseResult
+            "keypoints" is a (P, 18, 3) array of (x, y, score) image coordinates per
+            person, missing keypoints are (-1, -1, 0).
         """
-        results = {}
-        # FIXME: untested logic
-        # if kwargs.get("heatmaps"):
-        #     # Extract only the second blob output (keypoint heatmaps)
-        #     heatmaps = inference_results.get("Mconv7_stage2_L2")
-        #     # Resize the heatmap back to the size of the input
-        #     input_shape = image.shape[:2]
-        #     out_heatmap = np.zeros([heatmaps.shape[1], input_shape[0], input_shape[1]])
-        #     results["heatmaps"] = out_heatmap
-        #     if show_bbox:
-        #         self.draw_output(results, image)
+        outputs = {output.shape[1]: output[0] for output in inference_results}
+        if not {19, 38}.issubset(outputs):
+            msg = (
+                f"The model:{self.model_structure} does not contain expected output "
+                "shape as per the docs."
+            )
+            raise InvalidModel(msg)
+
+        # Upsample to get sub-stride keypoint accuracy, layout becomes HWC.
+        heatmaps = cv2.resize(
+            outputs[19].transpose((1, 2, 0)),
+            None,
+            fx=upsample_ratio,
+            fy=upsample_ratio,
+            interpolation=cv2.INTER_CUBIC,
+        )[..., : len(KEYPOINTS)]
+        pafs = cv2.resize(
+            outputs[38].transpose((1, 2, 0)),
+            None,
+            fx=upsample_ratio,
+            fy=upsample_ratio,
+            interpolation=cv2.INTER_CUBIC,
+        )
+
+        keypoints, keypoint_ids = self.find_keypoints(heatmaps, keypoint_threshold)
+        connections = [
+            self.score_limbs(keypoints, keypoint_ids, pafs, limb_id)
+            for limb_id in range(len(LIMB_KEYPOINT_IDS))
+        ]
+        poses = self.group_keypoints(keypoints, keypoint_ids, connections, min_keypoints)
+
+        # Map from the upsampled heatmap grid to image coordinates.
+        image_height, image_width = image.shape[:2]
+        scale = np.array(
+            [image_width / heatmaps.shape[1], image_height / heatmaps.shape[0]]
+        )
+        found = poses[..., 2] > 0
+        poses[..., :2] = np.where(found[..., None], poses[..., :2] * scale, -1)
+
+        results = PoseResult(keypoints=poses, image=image, keep_image=self.keep_images)
+        if show_bbox:
+            self.draw_output(results, image, **kwargs)
         return results
 
     @staticmethod
-    def draw_output(results, image, **kwargs):
-        pass
-        # FIXME: untested logic
-        # if results.get("heatmaps"):
-        #     input_shape = image.shape[:2]
-        #     for idx, _ in enumerate(heatmaps[0]):
-        #         cv2.resize(heatmaps[0][idx], input_shape[0:2][::-1])
+    def find_keypoints(heatmaps, threshold=0.1):
+        """Find the keypoint peaks of all (H, W, K) heatmaps at once.
+
+        A peak is a pixel above `threshold` which equals the maximum of its 3x3
+        neighbourhood.
+
+        Returns
+        -------
+        keypoints: np.ndarray
+            (N, 3) (x, y, score) heatmap coordinates of all peaks.
+        keypoint_ids: np.ndarray
+            (N,) keypoint type of each peak.
+        """
+        max_filtered = cv2.dilate(heatmaps, np.ones((3, 3), dtype=np.uint8))
+        peaks = (heatmaps == max_filtered) & (heatmaps > threshold)
+        # Neighbouring peaks share the same value (a plateau), keep only the first
+        # one in raster order by dropping peaks preceded by another peak.
+        padded = np.pad(peaks, ((1, 0), (1, 1), (0, 0)))
+        preceded = (
+            padded[1:, :-2] | padded[:-1, :-2] | padded[:-1, 1:-1] | padded[:-1, 2:]
+        )
+        ys, xs, keypoint_ids = np.nonzero(peaks & ~preceded)
+        keypoints = np.stack((xs, ys, heatmaps[ys, xs, keypoint_ids]), axis=1).astype(
+            np.float32
+        )
+        return keypoints, keypoint_ids
+
+    @staticmethod
+    def score_limbs(
+        keypoints,
+        keypoint_ids,
+        pafs,
+        limb_id,
+        num_samples=10,
+        paf_threshold=0.05,
+        success_ratio=0.8,
+    ):
+        """Score every candidate connection of a limb with the PAF line integral.
+
+        All candidate pairs are sampled at once, connections are then picked
+        greedily by score so that every keypoint is used at most once.
+
+        Returns
+        -------
+        connections: np.ndarray
+            (C, 3) (index_a, index_b, score) rows, indices refer to `keypoints`.
+        """
+        kpt_a, kpt_b = LIMB_KEYPOINT_IDS[limb_id]
+        candidates_a = np.flatnonzero(keypoint_ids == kpt_a)
+        candidates_b = np.flatnonzero(keypoint_ids == kpt_b)
+        if not (len(candidates_a) and len(candidates_b)):
+            return np.empty((0, 3), dtype=np.float32)
+
+        points_a = keypoints[candidates_a, :2]
+        points_b = keypoints[candidates_b, :2]
+        # (A, B, 2) vectors between every candidate pair.
+        vectors = points_b[None] - points_a[:, None]
+        lengths = np.linalg.norm(vectors, axis=2)
+        unit_vectors = vectors / np.maximum(lengths, 1e-6)[..., None]
+
+        # (A, B, S, 2) sample points along every candidate limb.
+        steps = np.linspace(0, 1, num_samples, dtype=np.float32)
+        samples = (
+            points_a[:, None, None] + steps[None, None, :, None] * vectors[:, :, None]
+        )
+        samples = np.round(samples).astype(np.int32)
+        paf = pafs[samples[..., 1], samples[..., 0]][..., LIMB_PAF_IDS[limb_id]]
+
+        # (A, B, S) PAF alignment with each limb direction.
+        alignments = np.einsum("absc,abc->abs", paf, unit_vectors)
+        distance_prior = np.minimum(0.5 * pafs.shape[0] / np.maximum(lengths, 1) - 1, 0)
+        scores = alignments.mean(axis=2) + distance_prior
+        valid = ((alignments > paf_threshold).mean(axis=2) >= success_ratio) & (
+            scores > 0
+        )
+
+        idx_a, idx_b = np.nonzero(valid)
+        order = np.argsort(-scores[idx_a, idx_b], kind="stable")
+        used_a, used_b = set(), set()
+        connections = []
+        for i, j in zip(idx_a[order], idx_b[order]):
+            if i in used_a or j in used_b:
+                continue
+            used_a.add(i)
+            used_b.add(j)
+            connections.append((candidates_a[i], candidates_b[j], scores[i, j]))
+        return np.array(connections, dtype=np.float32).reshape(-1, 3)
+
+    @staticmethod
+    def group_keypoints(keypoints, keypoint_ids, connections, min_keypoints=3):
+        """Greedily group the scored limb connections into people.
+
+        Returns
+        -------
+        poses: np.ndarray
+            (P, 18, 3) (x, y, score) heatmap coordinates, missing keypoints are 0.
+        """
+        persons = []  # Per person (18,) arrays of indices into `keypoints`
+        owner = {}  # Keypoint index -> person index
+        for limb_id, limb_connections in enumerate(connections):
+            kpt_a, kpt_b = LIMB_KEYPOINT_IDS[limb_id]
+            for idx_a, idx_b, _ in limb_connections:
+                idx_a, idx_b = int(idx_a), int(idx_b)
+                person_a, person_b = owner.get(idx_a), owner.get(idx_b)
+                if person_a is None and person_b is None:
+                    person = np.full(len(KEYPOINTS), -1)
+                    person[[kpt_a, kpt_b]] = idx_a, idx_b
+                    owner[idx_a] = owner[idx_b] = len(persons)
+                    persons.append(person)
+                elif person_b is None:
+                    if persons[person_a][kpt_b] == -1:
+                        persons[person_a][kpt_b] = idx_b
+                        owner[idx_b] = person_a
+                elif person_a is None:
+                    if persons[person_b][kpt_a] == -1:
+                        persons[person_b][kpt_a] = idx_a
+                        owner[idx_a] = person_b
+                elif person_a != person_b:
+                    # Merge two partial skeletons when they do not overlap.
+                    merged, other = persons[person_a], persons[person_b]
+                    if np.all((merged == -1) | (other == -1)):
+                        merged[other != -1] = other[other != -1]
+                        for idx in other[other != -1]:
+                            owner[int(idx)] = person_a
+                        other[:] = -1
+
+        poses = [person for person in persons if (person != -1).sum() >= min_keypoints]
+        if not poses:
+            return np.zeros((0, len(KEYPOINTS), 3), dtype=np.float32)
+        poses = np.stack(poses)
+        return np.where(
+            (poses != -1)[..., None], keypoints[np.maximum(poses, 0)], 0
+        ).astype(np.float32)
+
+    @staticmethod
+    def draw_output(results, image, color=(0, 255, 255), thickness=2, **kwargs):
+        """Draw every skeleton with a single `cv2.polylines` call."""
+        poses = results["keypoints"]
+        ends = poses[:, LIMB_KEYPOINT_IDS]  # (P, L, 2, 3)
+        found = (ends[..., 2] > 0).all(axis=2)
+        cv2.polylines(
+            image, list(ends[found][..., :2].astype(np.int32)), False, color, thickness
+        )
+        for x, y in poses[poses[..., 2] > 0][:, :2].astype(int):
+            cv2.circle(image, (x, y), 3, (0, 0, 255), cv2.FILLED)
+        return image
@@ -4,6 +4,7 @@ import cv2
 import numpy as np
 
 from ..openvino_base.base_model import Base
+from ..openvino_base.results import AgeGenderResult
 
 GENDER = ["Female", "Male"]
 
@@ -32,17 +33,38 @@ class AgeGender(Base):
         )
 
     def preprocess_output(self, inference_results, image, show_bbox, **kwargs):
-        results = {}
         age_conv3 = np.squeeze(inference_results[0])
         gender_prob = np.squeeze(inference_results[1])
 
-        results["gender"] = GENDER[np.argmax(gender_prob)]
-        results["age"] = int(np.round(age_conv3 * 100))
-        results["image"] = image
+        results = AgeGenderResult(
+            gender=GENDER[np.argmax(gender_prob)],
+            age=int(np.round(age_conv3 * 100)),
+            image=image,
+            keep_image=self.keep_images,
+        )
         if show_bbox:
             self.draw_output(results, image, **kwargs)
         return results
 
+    def preprocess_batch_output(
+        self, inference_results, images, show_bbox=False, **kwargs
+    ):
+        ages = np.round(inference_results[0].reshape(len(images), -1)[:, 0] * 100)
+        genders = inference_results[1].reshape(len(images), -1).argmax(axis=1)
+
+        batch_results = []
+        for image, age, gender in zip(images, ages.astype(int), genders):
+            results = AgeGenderResult(
+                gender=GENDER[gender],
+                age=int(age),
+                image=image,
+                keep_image=self.keep_images,
+            )
+            if show_bbox:
+                self.draw_output(results, image, **kwargs)
+            batch_results.append(results)
+        return batch_results
+
     @staticmethod
     def draw_output(results, image, **kwargs):
         w, h = 15, abs(image.shape[0] - 100)
@@ -4,6 +4,7 @@ import cv2
 import numpy as np
 
 from ..openvino_base.base_model import Base
+from ..openvino_base.results import EmotionsResult
 
 EMOTION_STATES = ("neutral", "happy", "sad", "surprise", "anger")
 
@@ -32,15 +33,36 @@ class Emotions(Base):
         )
 
     def preprocess_output(self, inference_results, image, show_bbox, **kwargs):
-        results = {}
         emo_state = np.vstack(inference_results).ravel()
-        results["emotional_state"] = EMOTION_STATES[np.argmax(emo_state)]
+        results = EmotionsResult(
+            emotional_state=EMOTION_STATES[np.argmax(emo_state)],
+            image=image,
+            keep_image=self.keep_images,
+        )
 
         if show_bbox:
             self.draw_output(results, image, **kwargs)
-        results["image"] = image
         return results
 
+    def preprocess_batch_output(
+        self, inference_results, images, show_bbox=False, **kwargs
+    ):
+        emo_states = np.hstack(
+            [output.reshape(len(images), -1) for output in inference_results]
+        ).argmax(axis=1)
+
+        batch_results = []
+        for image, emo_state in zip(images, emo_states):
+            results = EmotionsResult(
+                emotional_state=EMOTION_STATES[emo_state],
+                image=image,
+                keep_image=self.keep_images,
+            )
+            if show_bbox:
+                self.draw_output(results, image, **kwargs)
+            batch_results.append(results)
+        return batch_results
+
     @staticmethod
     def draw_output(results, image, **kwargs):
         pass
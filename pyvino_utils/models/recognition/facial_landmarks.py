@@ -1,7 +1,76 @@
+from collections.abc import Mapping
+
 import cv2
 import numpy as np
 
 from ..openvino_base.base_model import Base
+from ..openvino_base.results import ImageRef, LandmarksResult
+
+
+class LandmarksView(Mapping):
+    """Read-only dict view of decoded landmarks, built only when it is accessed.
+
+    Like the results, the face image the eye images are cut from is only referenced
+    weakly unless `keep_image` is set, see `ImageRef`.
+    """
+
+    def __init__(self, model_type, landmarks, eye_boxes, image, keep_image=False):
+        self._model_type = model_type
+        self._landmarks = landmarks
+        self._eye_boxes = eye_boxes
+        self._image = image if keep_image else ImageRef(image)
+        self._face_landmarks = None
+
+    @property
+    def image(self):
+        return self._image() if isinstance(self._image, ImageRef) else self._image
+
+    def _build(self):
+        landmarks = [tuple(point) for point in self._landmarks.tolist()]
+        if len(landmarks) == 35:
+            return {
+                "type": self._model_type,
+                "eyes_coords": landmarks[:4],
+                "nose_coords": landmarks[4:8],
+                "mouth_coords": landmarks[8:12],
+                "face_contour": landmarks[12:],
+            }
+
+        (l_xmin, l_ymin, l_xmax, l_ymax), (r_xmin, r_ymin, r_xmax, r_ymax) = (
+            self._eye_boxes.tolist()
+        )
+        image = self.image
+        if image is None:
+            raise ReferenceError(
+                "The face image is gone, create the model with keep_images=True "
+                "to cut the eye images later on."
+            )
+        return {
+            "type": self._model_type,
+            "eyes_coords": {
+                "left_eye_point": landmarks[0],
+                "right_eye_point": landmarks[1],
+                "left_eye_image": image[l_ymin:l_ymax, l_xmin:l_xmax],
+                "right_eye_image": image[r_ymin:r_ymax, r_xmin:r_xmax],
+            },
+            "nose_coords": {"nose_coords": landmarks[2]},
+            "mouth_coords": {"mouth_coords": landmarks[3:5]},
+        }
+
+    @property
+    def face_landmarks(self):
+        if self._face_landmarks is None:
+            self._face_landmarks = self._build()
+        return self._face_landmarks
+
+    def __getitem__(self, key):
+        return self.face_landmarks[key]
+
+    def __iter__(self):
+        return iter(self.face_landmarks)
+
+    def __len__(self):
+        return len(self.face_landmarks)
 
 
 class FacialLandmarks(Base):
@@ -34,114 +103,106 @@ class FacialLandmarks(Base):
 
     def preprocess_output(self, inference_results, image, show_bbox=False, **kwargs):
         """Draw bounding boxes onto the Facial Landmarks frame."""
-        flattened_predictions = np.vstack(inference_results).ravel()
-        results = {}
-        face_h, face_w = image.shape[:2]
-
-        if len(flattened_predictions) == 70:
-            landmarks = []
-            for i in range(flattened_predictions.size // 2):
-                x_coord = int(face_w * flattened_predictions[2 * i])
-                y_coord = int(face_h * flattened_predictions[2 * i + 1])
-                landmarks.append((x_coord, y_coord))
-
-            face_landmarks = {
-                "type": self._model_type,
-                "eyes_coords": landmarks[:4],
-                "nose_coords": landmarks[4:8],
-                "mouth_coords": landmarks[8:12],
-                "face_contour": landmarks[12:],
-            }
-        else:
-            coord_mapping = dict(
-                zip(
-                    (
-                        "left_eye_x_coord",
-                        "left_eye_y_coord",
-                        "right_eye_x_coord",
-                        "right_eye_y_coord",
-                        "nose_coord",
-                        "left_mouth_coord",
-                        "right_mouth_coord",
-                    ),
-                    flattened_predictions,
-                )
-            )
-
-            def get_eye_points(eye_coords, eye_size=10):
+        return self.preprocess_batch_output(
+            inference_results, [image], show_bbox=show_bbox, **kwargs
+        )[0]
 
-                eye_min = eye_coords - eye_size
-                eye_max = eye_coords + eye_size
-                return map(int, [eye_coords, eye_min, eye_max])
-
-            # left eye offset of face
-            left_eye_x_coord, left_eye_xmin, left_eye_xmax = get_eye_points(
-                coord_mapping["left_eye_x_coord"] * face_w
+    def preprocess_batch_output(
+        self, inference_results, images, show_bbox=False, eye_size=10, **kwargs
+    ):
+        """Decode the landmarks of a batch of faces in one go.
+
+        Returns
+        -------
+        batch_results: list
+            Per face `LandmarksResult`, "landmarks" is a (K, 2) int array of pixel
+            coordinates, "eye_boxes" a (2, 4) int array of the (left, right) eye
+            (xmin, ymin, xmax, ymax) and "face_landmarks" a lazy dict view.
+        """
+        predictions = np.hstack(
+            [output.reshape(len(images), -1) for output in inference_results]
+        )
+        image_sizes = np.array([image.shape[:2] for image in images])
+        landmarks = self.decode_landmarks(predictions, image_sizes)
+        eye_boxes = self.get_eye_boxes(landmarks, image_sizes, eye_size)
+
+        batch_results = []
+        for image, face_landmarks, face_eye_boxes in zip(images, landmarks, eye_boxes):
+            results = LandmarksResult(
+                landmarks=face_landmarks,
+                eye_boxes=face_eye_boxes,
+                face_landmarks=LandmarksView(
+                    self._model_type,
+                    face_landmarks,
+                    face_eye_boxes,
+                    image,
+                    self.keep_images,
+                ),
+                image=image,
+                keep_image=self.keep_images,
             )
+            if show_bbox:
+                self.draw_output(results, image, **kwargs)
+            batch_results.append(results)
+        return batch_results
 
-            # left eye offset of face
-            left_eye_y_coord, left_eye_ymin, left_eye_ymax = get_eye_points(
-                coord_mapping["left_eye_y_coord"] * face_h
-            )
+    @staticmethod
+    def decode_landmarks(predictions, image_sizes):
+        """Scale (B, 2K) normalised (x, y) predictions into (B, K, 2) pixel coordinates.
+
+        Parameters
+        ----------
+        predictions: np.ndarray
+            (B, 2K) model outputs.
+        image_sizes: np.ndarray
+            (B, 2) or (2,) (height, width) of the faces.
+        """
+        predictions = np.asarray(predictions, dtype=np.float32)
+        scale = np.asarray(image_sizes, dtype=np.float32).reshape(-1, 1, 2)[..., ::-1]
+        return (predictions.reshape(len(predictions), -1, 2) * scale).astype(np.int32)
 
-            # right eye offset of face
-            right_eye_x_coord, right_eye_xmin, right_eye_xmax = get_eye_points(
-                coord_mapping["right_eye_x_coord"] * face_w
-            )
+    @staticmethod
+    def to_frame_coords(landmarks, boxes):
+        """Offset per face landmarks by their (xmin, ymin, xmax, ymax) face boxes.
+
+        Parameters
+        ----------
+        landmarks: list
+            (K, 2) "landmarks" of each face result, or a (N, K, 2) array.
+        boxes: np.ndarray
+            (N, 4) boxes the landmarks were predicted on, e.g. clipped
+            `FaceDetection` "bbox_coord".
+
+        Returns
+        -------
+        landmarks: np.ndarray
+            (N, K, 2) float32 landmarks in frame pixels, ready for
+            `Base.predict_aligned`.
+        """
+        landmarks = np.asarray(landmarks, dtype=np.float32)
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        return landmarks.reshape(len(boxes), -1, 2) + boxes[:, None, :2]
 
-            # right eye offset of face
-            right_eye_y_coord, right_eye_ymin, right_eye_ymax = get_eye_points(
-                coord_mapping["right_eye_y_coord"] * face_h
-            )
-            eye_size = 10
-
-            left_eye_x_coord = int(flattened_predictions[0] * face_w)
-            # left eye offset of face
-            left_eye_xmin = left_eye_x_coord - eye_size
-            left_eye_xmax = left_eye_x_coord + eye_size
-
-            left_eye_y_coord = int(flattened_predictions[1] * face_h)
-            # left eye offset of face
-            left_eye_ymin = left_eye_y_coord - eye_size
-            left_eye_ymax = left_eye_y_coord + eye_size
-
-            right_eye_x_coord = int(flattened_predictions[2] * face_w)
-            # right eye offset of face
-            right_eye_xmin = right_eye_x_coord - eye_size
-            right_eye_xmax = right_eye_x_coord + eye_size
-
-            right_eye_y_coord = int(flattened_predictions[3] * face_h)
-            # right eye offset of face
-            right_eye_ymin = right_eye_y_coord - eye_size
-            right_eye_ymax = right_eye_y_coord + eye_size
-            # nose coordinates
-            nose_coord = coord_mapping["nose_coord"]
-
-            # mouth coordinates
-            left_part_mouth = coord_mapping["left_mouth_coord"] * face_w
-            right_part_mouth = coord_mapping["right_mouth_coord"] * face_w
-
-            face_landmarks = {
-                "type": self._model_type,
-                "eyes_coords": {
-                    "left_eye_point": (left_eye_x_coord, left_eye_y_coord),
-                    "right_eye_point": (right_eye_x_coord, right_eye_y_coord),
-                    "left_eye_image": image[
-                        left_eye_ymin:left_eye_ymax, left_eye_xmin:left_eye_xmax
-                    ],
-                    "right_eye_image": image[
-                        right_eye_ymin:right_eye_ymax, right_eye_xmin:right_eye_xmax,
-                    ],
-                },
-                "nose_coords": {"nose_coords": nose_coord},
-                "mouth_coords": {"mouth_coords": [left_part_mouth, right_part_mouth]},
-            }
+    @staticmethod
+    def get_eye_boxes(landmarks, image_sizes, eye_size=10):
+        """Get the (B, 2, 4) (xmin, ymin, xmax, ymax) eye boxes clipped to the faces.
 
-        results["face_landmarks"] = face_landmarks
-        results["image"] = image
-        if show_bbox:
-            self.draw_output(results, image, **kwargs)
-        return results
+        The 5 point model gives the eye centres, the 35 point model the eye corners.
+        """
+        if landmarks.shape[1] == 5:
+            eye_centres = landmarks[:, :2]
+        else:
+            eye_centres = (
+                landmarks[:, :4].reshape(-1, 2, 2, 2).mean(axis=2).astype(np.int32)
+            )
+        upper = np.asarray(image_sizes, dtype=np.int32).reshape(-1, 1, 2)[..., ::-1]
+        return np.concatenate(
+            (
+                np.clip(eye_centres - eye_size, 0, upper),
+                np.clip(eye_centres + eye_size, 0, upper),
+            ),
+            axis=2,
+        )
 
     @staticmethod
     def draw_output(results, image, radius=20, color=(0, 0, 255), thickness=2, **kwargs):
@@ -0,0 +1,314 @@
+import os
+
+import numpy as np
+from loguru import logger
+
+
+class GalleryIndex:
+    def __init__(self, dim, capacity=1024, storage=None, block_size=262144):
+        """
+        This class can be used to search a gallery of known identities for the
+        nearest neighbours of query embeddings, e.g. from `Reidentification`.
+
+        Embeddings are kept L2-normalised in one contiguous matrix, so that the
+        cosine similarities of a batch of queries against a block of the gallery
+        are a single matrix multiplication. An optional inverted file (IVF) mode,
+        see `train`, stores the embeddings of each partition contiguously and only
+        scores the partitions nearest to each query.
+
+        Parameters
+        ----------
+        dim: int
+            Embedding size.
+        capacity: int
+            Initial number of rows, doubled whenever the gallery is full.
+        storage: str
+            Optional directory the gallery is memory-mapped from, so galleries of
+            millions of identities do not have to fit into memory. An existing
+            gallery in it is opened.
+        block_size: int
+            Number of gallery rows scored per matrix multiplication, bounds the
+            size of the (queries, block_size) similarity matrix.
+
+        Example
+        -------
+        ```
+            gallery = GalleryIndex(dim=256, storage="gallery/")
+            gallery.add(identity_ids, reid.embed(frame, boxes))
+            ids, scores = gallery.search(reid.embed(other_frame, other_boxes), k=5)
+        ```
+        """
+        self.dim = dim
+        self.storage = storage
+        self.block_size = block_size
+        self.centroids = None
+        # Rows [offsets[i], offsets[i + 1]) hold the embeddings of partition i, rows
+        # added since the last `_sort` follow from offsets[-1] on.
+        self._offsets = None
+        if storage is not None and os.path.exists(self._path("ids")):
+            self._vectors = np.load(self._path("vectors"), mmap_mode="r+")
+            self._ids = np.load(self._path("ids"), mmap_mode="r+")
+            self._lists = np.load(self._path("lists"), mmap_mode="r+")
+            self._size = int(np.count_nonzero(self._ids != -1))
+            if os.path.exists(self._path("centroids")):
+                self.centroids = np.load(self._path("centroids"))
+                if os.path.exists(self._path("offsets")):
+                    self._offsets = np.load(self._path("offsets"))
+                else:
+                    self._sort()
+            logger.info(f"Opened gallery of {self._size} embeddings from {storage}")
+        else:
+            self._size = 0
+            self._allocate(capacity)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def ids(self):
+        return self._ids[: self._size]
+
+    @property
+    def vectors(self):
+        return self._vectors[: self._size]
+
+    @property
+    def is_trained(self):
+        return self.centroids is not None
+
+    def _path(self, name):
+        return os.path.join(self.storage, f"{name}.npy")
+
+    def _new_array(self, name, shape, dtype, fill):
+        if self.storage is None:
+            return np.full(shape, fill, dtype=dtype)
+        os.makedirs(self.storage, exist_ok=True)
+        array = np.lib.format.open_memmap(
+            self._path(f"{name}.tmp"), mode="w+", dtype=dtype, shape=shape
+        )
+        array[:] = fill
+        return array
+
+    def _allocate(self, capacity, order=None):
+        """(Re)allocate the gallery with room for `capacity` rows, the rows are
+        copied in `order` when given."""
+        arrays = {
+            "vectors": self._new_array("vectors", (capacity, self.dim), np.float32, 0),
+            "ids": self._new_array("ids", (capacity,), np.int64, -1),
+            "lists": self._new_array("lists", (capacity,), np.int32, 0),
+        }
+        for name, array in arrays.items():
+            old = getattr(self, f"_{name}", None)
+            # Copy by blocks, a gathered copy of a memory-mapped gallery is large.
+            for start in range(0, self._size, self.block_size):
+                rows = slice(start, min(start + self.block_size, self._size))
+                array[rows] = old[rows] if order is None else old[order[rows]]
+            if self.storage is not None:
+                array.flush()
+                # Drop the old mapping before its file is replaced.
+                setattr(self, f"_{name}", None)
+                os.replace(self._path(f"{name}.tmp"), self._path(name))
+                array = np.load(self._path(name), mmap_mode="r+")
+            setattr(self, f"_{name}", array)
+
+    def add(self, ids, embeddings):
+        """Add (N, D) embeddings of the identities `ids`, an identity can have
+        several embeddings."""
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), self.dim)
+        if np.any(ids < 0):
+            raise ValueError("Identity ids must be non-negative.")
+        if self._size + len(ids) > len(self._ids):
+            capacity = len(self._ids)
+            while capacity < self._size + len(ids):
+                capacity *= 2
+            self._allocate(capacity)
+
+        rows = slice(self._size, self._size + len(ids))
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        self._vectors[rows] = embeddings / np.maximum(norms, 1e-12)
+        self._ids[rows] = ids
+        self._size += len(ids)
+        if self.is_trained:
+            self._lists[rows] = self._assign(self._vectors[rows])
+            # New rows are scanned whole, sort them into their partitions once they
+            # outnumber the rows of an average partition.
+            sorted_size = self._offsets[-1]
+            if self._size - sorted_size > sorted_size / len(self.centroids):
+                self._sort()
+
+    def remove(self, ids):
+        """Remove all embeddings of the identities `ids`.
+
+        The holes are filled with the last rows of the gallery, so the embeddings
+        stay contiguous, a trained gallery is sorted into its partitions again.
+
+        Returns
+        -------
+        count: int
+            Number of removed embeddings.
+        """
+        removed = np.isin(self._ids[: self._size], np.asarray(ids, dtype=np.int64))
+        count = int(removed.sum())
+        new_size = self._size - count
+        holes = np.flatnonzero(removed[:new_size])
+        movers = np.flatnonzero(~removed[new_size:]) + new_size
+        for array in (self._vectors, self._ids, self._lists):
+            array[holes] = array[movers]
+        self._ids[new_size : self._size] = -1
+        self._size = new_size
+        if count and self.is_trained:
+            self._sort()
+        return count
+
+    def train(self, n_lists=None, iterations=10, sample_size=65536, seed=0):
+        """Partition the gallery with spherical k-means for inverted file search.
+
+        Parameters
+        ----------
+        n_lists: int
+            Number of partitions, defaults to about the square root of the gallery
+            size.
+        iterations: int
+            Number of k-means iterations.
+        sample_size: int
+            Number of embeddings the centroids are fitted on.
+        """
+        if not self._size:
+            raise ValueError("Cannot train an empty gallery.")
+        n_lists = min(n_lists or max(int(np.sqrt(self._size)), 1), self._size)
+        rng = np.random.default_rng(seed)
+        sample = self.vectors[
+            np.sort(rng.choice(self._size, min(sample_size, self._size), replace=False))
+        ]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)]
+        for _ in range(iterations):
+            assigned = (sample @ centroids.T).argmax(axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assigned, sample)
+            # Keep the previous centroid of a partition that ran empty.
+            empty = ~np.any(sums, axis=1)
+            sums[empty] = centroids[empty]
+            centroids = sums / np.linalg.norm(sums, axis=1, keepdims=True)
+
+        self.centroids = centroids.astype(np.float32)
+        for start in range(0, self._size, self.block_size):
+            rows = slice(start, min(start + self.block_size, self._size))
+            self._lists[rows] = self._assign(self._vectors[rows])
+        if self.storage is not None:
+            np.save(self._path("centroids"), self.centroids)
+        self._sort()
+        logger.info(f"Partitioned {self._size} embeddings into {n_lists} lists.")
+
+    def _assign(self, vectors):
+        return (vectors @ self.centroids.T).argmax(axis=1)
+
+    def _sort(self):
+        """Store the rows of each partition contiguously and update the offsets."""
+        lists = self._lists[: self._size]
+        self._allocate(len(self._ids), np.argsort(lists, kind="stable"))
+        counts = np.bincount(self._lists[: self._size], minlength=len(self.centroids))
+        self._offsets = np.concatenate(([0], np.cumsum(counts)))
+        if self.storage is not None:
+            np.save(self._path("offsets"), self._offsets)
+
+    def search(self, queries, k=5, n_probe=None):
+        """Find the `k` most similar gallery embeddings of each query.
+
+        Parameters
+        ----------
+        queries: np.ndarray
+            (Q, D) query embeddings.
+        k: int
+            Number of neighbours per query.
+        n_probe: int
+            Number of nearest partitions searched per query once the gallery is
+            trained, the whole gallery is searched when not given.
+
+        Returns
+        -------
+        ids: np.ndarray
+            (Q, k) identity ids of the neighbours, -1 where there are fewer than k.
+        scores: np.ndarray
+            (Q, k) cosine similarities in decreasing order, -inf where there are
+            fewer than k.
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        queries = queries / np.maximum(
+            np.linalg.norm(queries, axis=1, keepdims=True), 1e-12
+        )
+        top_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        top_rows = np.full((len(queries), k), -1, dtype=np.int64)
+        if n_probe is None or not self.is_trained:
+            for start in range(0, self._size, self.block_size):
+                stop = min(start + self.block_size, self._size)
+                scores = queries @ self._vectors[start:stop].T
+                top_scores, top_rows = self._merge_top_k(
+                    top_scores, top_rows, scores, np.arange(start, stop), k
+                )
+        else:
+            top_scores, top_rows = self._search_lists(
+                queries, k, n_probe, top_scores, top_rows
+            )
+
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        top_rows = np.take_along_axis(top_rows, order, axis=1)
+        ids = np.where(np.isfinite(top_scores), self._ids[top_rows], -1)
+        return ids, top_scores
+
+    def _search_lists(self, queries, k, n_probe, top_scores, top_rows):
+        """Score the queries against the contiguous rows of the partitions they
+        probe, and against the unsorted rows added since the last `_sort`."""
+        n_probe = min(n_probe, len(self.centroids))
+        nearest = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :n_probe]
+        # Group the queries by partition.
+        order = np.argsort(nearest, axis=None, kind="stable")
+        lists, starts = np.unique(nearest.ravel()[order], return_index=True)
+        for lst, query_idx in zip(lists, np.split(order // n_probe, starts[1:])):
+            begin, end = self._offsets[lst], self._offsets[lst + 1]
+            for start in range(begin, end, self.block_size):
+                stop = min(start + self.block_size, end)
+                scores = queries[query_idx] @ self._vectors[start:stop].T
+                top_scores[query_idx], top_rows[query_idx] = self._merge_top_k(
+                    top_scores[query_idx],
+                    top_rows[query_idx],
+                    scores,
+                    np.arange(start, stop),
+                    k,
+                )
+
+        probes = np.zeros((len(queries), len(self.centroids)), dtype=bool)
+        np.put_along_axis(probes, nearest, True, axis=1)
+        for start in range(self._offsets[-1], self._size, self.block_size):
+            stop = min(start + self.block_size, self._size)
+            scores = queries @ self._vectors[start:stop].T
+            scores[~probes[:, self._lists[start:stop]]] = -np.inf
+            top_scores, top_rows = self._merge_top_k(
+                top_scores, top_rows, scores, np.arange(start, stop), k
+            )
+        return top_scores, top_rows
+
+    @staticmethod
+    def _top_k(scores, rows, k):
+        """Get the k best of the (Q, M) `scores` and their (Q, M) `rows`, unordered."""
+        if scores.shape[1] <= k:
+            return scores, rows
+        best = np.argpartition(scores, -k, axis=1)[:, -k:]
+        return (
+            np.take_along_axis(scores, best, axis=1),
+            np.take_along_axis(rows, best, axis=1),
+        )
+
+    def _merge_top_k(self, top_scores, top_rows, scores, rows, k):
+        """Merge the (Q, M) `scores` of gallery `rows` into the running top k."""
+        scores, rows = self._top_k(scores, np.broadcast_to(rows, scores.shape), k)
+        return self._top_k(
+            np.hstack((top_scores, scores)), np.hstack((top_rows, rows)), k
+        )
+
+    def flush(self):
+        """Write a memory-mapped gallery to disk."""
+        if self.storage is not None:
+            for array in (self._vectors, self._ids, self._lists):
+                array.flush()
@@ -1,9 +1,14 @@
+import asyncio
+import functools
 import time
 
 import cv2
 import numpy as np
 
+from pyvino_utils.opencv_utils.cv_utils import to_uint8
+
 from ..openvino_base.base_model import Base
+from ..openvino_base.results import GazeResult
 
 
 class GazeEstimation(Base):
@@ -30,7 +35,6 @@ class GazeEstimation(Base):
         )
 
     def preprocess_output(self, inference_results, image, show_bbox, **kwargs):
-        results = {}
         gaze_vector = dict(zip(["x", "y", "z"], np.vstack(inference_results).ravel()))
 
         # TODO: Figure out why I had to comment this code out?
@@ -45,9 +49,9 @@ class GazeEstimation(Base):
         if show_bbox:
             self.draw_output(gaze_vector, image, **kwargs)
 
-        results["Gaze_Vector"] = gaze_vector
-        results["image"] = image
-        return results
+        return GazeResult(
+            Gaze_Vector=gaze_vector, image=image, keep_image=self.keep_images
+        )
 
     @staticmethod
     def draw_output(coords, image, **kwargs):
@@ -94,41 +98,189 @@ class GazeEstimation(Base):
             thickness=thickness,
         )
 
-    def preprocess_input(self, image, **kwargs):
-        width, height = self.model.inputs["left_eye_image"].shape[2:]
+    def _get_gaze_buffers(self, batch_size):
+        """Get the preallocated eye scratch, eye and head pose tensors for a batch."""
+        # Keyed apart from the (HWC, NCHW) pairs of `Base._get_batch_buffers`.
+        key = ("gaze", batch_size)
+        if key not in self._batch_buffers:
+            _, channels, height, width = self.model.inputs["left_eye_image"].shape
+            self._batch_buffers[key] = (
+                np.empty((2, batch_size, height, width, channels), dtype=np.uint8),
+                np.zeros((2, batch_size, channels, height, width), dtype=np.float32),
+                np.zeros((batch_size, 3), dtype=np.float32),
+            )
+        return self._batch_buffers[key]
 
-        p_left_eye_image = Base.preprocess_input(
-            Base, kwargs["eyes_coords"]["left_eye_image"], width, height
-        )
-        p_right_eye_image = Base.preprocess_input(
-            Base, kwargs["eyes_coords"]["right_eye_image"], width, height
-        )
+    def preprocess_gaze_input(
+        self, left_eye_images, right_eye_images, head_pose_angles, batch_size=None
+    ):
+        """Pack the eyes and head pose angles of N faces into the network inputs.
+
+        Both eyes are resized into one scratch buffer and transposed to NCHW with
+        one copy per eye.
+
+        Parameters
+        ----------
+        left_eye_images: list
+            N left eye crops.
+        right_eye_images: list
+            N right eye crops.
+        head_pose_angles: np.ndarray
+            (N, 3) yaw, pitch and roll angles or a list of N "head_pose_angles" dicts.
+        batch_size: int
+            Batch size of the returned tensors, must be >= N.
+        """
+        count = len(left_eye_images)
+        hwc_eyes, eyes, angles = self._get_gaze_buffers(batch_size or count)
+        height, width, channels = hwc_eyes.shape[2:]
+        for side, eye_images in enumerate((left_eye_images, right_eye_images)):
+            float_rows = {}
+            for idx, eye_image in enumerate(eye_images):
+                if eye_image.size:
+                    slot = hwc_eyes[side, idx]
+                    out = cv2.resize(
+                        to_uint8(eye_image, channels), (width, height), dst=slot
+                    )
+                    row = self._check_slot(out, slot)
+                    if row is not None:
+                        float_rows[idx] = row
+                else:
+                    hwc_eyes[side, idx] = 0
+            self._fill_batch(eyes[side], hwc_eyes[side], count, float_rows)
+        if len(head_pose_angles) and isinstance(head_pose_angles[0], dict):
+            head_pose_angles = [list(angle.values()) for angle in head_pose_angles]
+        angles[:count] = head_pose_angles
+        return {
+            "left_eye_image": eyes[0],
+            "right_eye_image": eyes[1],
+            "head_pose_angles": angles,
+        }
 
-        return p_left_eye_image, p_right_eye_image
+    def preprocess_input(self, image, **kwargs):
+        inputs = self.preprocess_gaze_input(
+            [kwargs["eyes_coords"]["left_eye_image"]],
+            [kwargs["eyes_coords"]["right_eye_image"]],
+            [kwargs["head_pose_angles"]],
+        )
+        return inputs["left_eye_image"], inputs["right_eye_image"]
 
     def predict(self, image, request_id=0, show_bbox=False, **kwargs):
-        p_left_eye_image, p_right_eye_image = self.preprocess_input(image, **kwargs)
-        head_pose_angles = list(kwargs.get("head_pose_angles").values())
-
-        predict_start_time = time.time()
-        status = self.exec_network.start_async(
-            request_id=request_id,
-            inputs={
-                "left_eye_image": p_left_eye_image,
-                "right_eye_image": p_right_eye_image,
-                "head_pose_angles": head_pose_angles,
-            },
+        start = time.perf_counter_ns()
+        inputs = self.preprocess_gaze_input(
+            [kwargs["eyes_coords"]["left_eye_image"]],
+            [kwargs["eyes_coords"]["right_eye_image"]],
+            [kwargs["head_pose_angles"]],
         )
-        status = self.exec_network.requests[request_id].wait(-1)
+        preprocessed = time.perf_counter_ns()
 
+        if self.metrics is not None:
+            self.metrics.requests_in_use.inc()
+        try:
+            self.exec_network.start_async(request_id=request_id, inputs=inputs)
+            status = self.exec_network.requests[request_id].wait(-1)
+        finally:
+            if self.metrics is not None:
+                self.metrics.requests_in_use.dec()
+        if status != 0 and self.metrics is not None:
+            self.metrics.dropped.inc()
         if status == 0:
             pred_result = []
             for output_name, data_ptr in self.model.outputs.items():
                 pred_result.append(
                     self.exec_network.requests[request_id].outputs[output_name]
                 )
-            predict_end_time = float(time.time() - predict_start_time) * 1000
-            gaze_vector, _ = self.preprocess_output(
+            inferred = time.perf_counter_ns()
+            predict_end_time = (inferred - preprocessed) / 1e6
+            results = self.preprocess_output(
                 pred_result, image, show_bbox=show_bbox, **kwargs
             )
-        return (predict_end_time, gaze_vector)
+            self._record_stages(start, preprocessed, inferred)
+            return (predict_end_time, results["Gaze_Vector"])
+
+    async def apredict(self, image, show_bbox=False, executor=None, **kwargs):
+        """Estimate the gaze of one face without blocking the event loop.
+
+        Takes the "eyes_coords" and "head_pose_angles" keyword arguments of
+        `predict` and returns the same, see `Base.apredict`.
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter_ns()
+        inputs = self.preprocess_gaze_input(
+            [kwargs["eyes_coords"]["left_eye_image"]],
+            [kwargs["eyes_coords"]["right_eye_image"]],
+            [kwargs["head_pose_angles"]],
+        )
+        # The buffers are shared by all calls, copy them before waiting for a request.
+        inputs = {name: tensor.copy() for name, tensor in inputs.items()}
+        preprocessed = time.perf_counter_ns()
+        pred_result = await self._ainfer(inputs)
+        inferred = time.perf_counter_ns()
+        predict_end_time = (inferred - preprocessed) / 1e6
+
+        postprocess = functools.partial(
+            self.preprocess_output, pred_result, image, show_bbox=show_bbox, **kwargs
+        )
+        if executor is None:
+            results = postprocess()
+        else:
+            results = await loop.run_in_executor(executor, postprocess)
+        self._record_stages(start, preprocessed, inferred)
+        return (predict_end_time, results["Gaze_Vector"])
+
+    def predict_gazes(
+        self, left_eye_images, right_eye_images, head_pose_angles, request_id=0
+    ):
+        """Estimate the gaze of N faces with one inference per batch.
+
+        Unlike `Base.predict_batch` it takes the eyes and head poses of faces
+        rather than whole frames.
+
+        Parameters
+        ----------
+        left_eye_images: list
+            N left eye crops, e.g. from `FacialLandmarks` "face_landmarks".
+        right_eye_images: list
+            N right eye crops.
+        head_pose_angles: np.ndarray
+            (N, 3) yaw, pitch and roll angles or a list of N "head_pose_angles" dicts.
+
+        Returns
+        -------
+        gaze_vectors: np.ndarray
+            (N, 3) x, y and z gaze vectors.
+        """
+        count = len(left_eye_images)
+        gaze_vectors = np.empty((count, 3), dtype=np.float32)
+        for start in range(0, count, self.max_batch_size):
+            chunk_start = time.perf_counter_ns()
+            stop = min(start + self.max_batch_size, count)
+            inputs = self.preprocess_gaze_input(
+                left_eye_images[start:stop],
+                right_eye_images[start:stop],
+                head_pose_angles[start:stop],
+                self._batch_size_for(stop - start),
+            )
+            preprocessed = time.perf_counter_ns()
+            exec_network = self._get_exec_network(len(inputs["head_pose_angles"]))
+            if self.metrics is not None:
+                self.metrics.requests_in_use.inc()
+            try:
+                exec_network.start_async(request_id=request_id, inputs=inputs)
+                status = exec_network.requests[request_id].wait(-1)
+            finally:
+                if self.metrics is not None:
+                    self.metrics.requests_in_use.dec()
+            if status != 0:
+                if self.metrics is not None:
+                    self.metrics.dropped.inc()
+                raise RuntimeError(f"Inference request failed with status: {status!r}")
+            inferred = time.perf_counter_ns()
+            output_name = next(iter(self.model.outputs))
+            gaze_vectors[start:stop] = (
+                exec_network.requests[request_id]
+                .outputs[output_name][: stop - start]
+                .reshape(-1, 3)
+            )
+            # The faces usually come from one frame, counted with the first chunk.
+            self._record_stages(chunk_start, preprocessed, inferred, int(not start))
+        return gaze_vectors
@@ -0,0 +1,126 @@
+import time
+
+import numpy as np
+
+from ..openvino_base.base_model import Base, InvalidImageArray
+from ..openvino_base.results import EmbeddingResult
+
+
+class Reidentification(Base):
+    """Class for the Face and Person Re-Identification Models."""
+
+    def __init__(
+        self,
+        model_name,
+        source_width=None,
+        source_height=None,
+        device="CPU",
+        threshold=0.60,
+        extensions=None,
+        **kwargs
+    ):
+        super().__init__(
+            model_name,
+            source_width,
+            source_height,
+            device,
+            threshold,
+            extensions,
+            **kwargs
+        )
+
+    def preprocess_output(self, inference_results, image, show_bbox=False, **kwargs):
+        """
+        Handles the output of the Re-Identification model.
+
+        Example
+        -------
+        Model: face-reidentification-retail-0095
+
+            Output layer names in Inference Engine format:
+
+            name: "658", shape: [1, 256, 1, 1] - Face embedding, compared by
+                cosine similarity.
+
+        Model: person-reidentification-retail-0277
+
+            name: "reid_embedding", shape: [1, 256] - Person embedding.
+        """
+        return self.preprocess_batch_output(
+            inference_results, [image], show_bbox=show_bbox, **kwargs
+        )[0]
+
+    def preprocess_batch_output(
+        self, inference_results, images, show_bbox=False, **kwargs
+    ):
+        embeddings = self.l2_normalize(inference_results[0].reshape(len(images), -1))
+        return [
+            EmbeddingResult(embedding=embedding, image=image, keep_image=self.keep_images)
+            for embedding, image in zip(embeddings, images)
+        ]
+
+    def embed(self, image, boxes, request_id=0):
+        """Get the embeddings of every region of interest of `image` in batches.
+
+        Parameters
+        ----------
+        image: np.ndarray
+            BGR frame.
+        boxes: list
+            (xmin, ymin, xmax, ymax) boxes, e.g. `PersonDetection` "bbox_coord".
+
+        Returns
+        -------
+        embeddings: np.ndarray
+            (N, D) L2-normalised float32 embeddings in the order of `boxes`.
+        """
+        if not isinstance(image, np.ndarray):
+            raise InvalidImageArray("Image not parsed correctly.")
+        boxes = self._clip_boxes(boxes, image.shape)
+        return self._embed_batches(
+            boxes,
+            lambda chunk, size: self.preprocess_crops(image, chunk, size)[0],
+            request_id,
+        )
+
+    def embed_aligned(self, image, landmarks, request_id=0, reference=None):
+        """Get the embeddings of the faces of `image` aligned on their (N, K, 2)
+        landmarks in frame pixels, see `Base.predict_aligned`."""
+        if not isinstance(image, np.ndarray):
+            raise InvalidImageArray("Image not parsed correctly.")
+        return self._embed_batches(
+            np.asarray(landmarks, dtype=np.float32),
+            lambda chunk, size: self.preprocess_aligned(image, chunk, size, reference)[0],
+            request_id,
+        )
+
+    def _embed_batches(self, items, preprocess, request_id=0):
+        embeddings = []
+        for start in range(0, len(items), self.max_batch_size):
+            chunk = items[start : start + self.max_batch_size]
+            chunk_start = time.perf_counter_ns()
+            batch = preprocess(chunk, self._batch_size_for(len(chunk)))
+            preprocessed = time.perf_counter_ns()
+            pred_result = self._infer_batch(batch, len(chunk), request_id)
+            inferred = time.perf_counter_ns()
+            embeddings.append(pred_result[0].reshape(len(chunk), -1))
+            self._record_stages(chunk_start, preprocessed, inferred, int(not start))
+        if not embeddings:
+            return np.empty((0, self._embedding_size()), dtype=np.float32)
+        return self.l2_normalize(np.vstack(embeddings))
+
+    def _embedding_size(self):
+        output = next(iter(self.model.outputs.values()))
+        return int(np.prod(output.shape[1:]))
+
+    @staticmethod
+    def l2_normalize(embeddings):
+        """Scale (N, D) embeddings to unit length, so that dot products are cosine
+        similarities."""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+    @staticmethod
+    def draw_output(results, image, **kwargs):
+        pass
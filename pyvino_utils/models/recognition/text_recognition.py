@@ -3,7 +3,45 @@ import time
 import cv2
 import numpy as np
 
-from ..openvino_base.base_model import Base
+from pyvino_utils.opencv_utils.cv_utils import to_uint8
+
+from ..openvino_base.base_model import Base, InvalidImageArray
+from ..openvino_base.results import TextResult
+
+# text-recognition-0012 alphabet, the last symbol is the CTC blank.
+ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz#"
+
+
+class LexiconTrie:
+    """Prefix tree of the words the beam search is allowed to produce."""
+
+    _END = ""
+
+    def __init__(self, words=()):
+        self._root = {}
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        node = self._root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[self._END] = True
+
+    def _find(self, prefix):
+        node = self._root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node
+
+    def has_prefix(self, prefix):
+        return self._find(prefix) is not None
+
+    def is_word(self, word):
+        node = self._find(word)
+        return node is not None and self._END in node
 
 
 class TextRecognition(Base):
@@ -28,13 +66,214 @@ class TextRecognition(Base):
             extensions,
             **kwargs
         )
+        self.alphabet = kwargs.get("alphabet", ALPHABET)
+        # Widths the network is reshaped to, crops are padded to the nearest one.
+        self.width_buckets = sorted(kwargs.get("width_buckets", [self.input_shape[3]]))
 
     def preprocess_output(self, inference_results, image, show_bbox, **kwargs):
-        results = {}
-        # Do stuff
-        results["image"] = image
+        """
+        Decode the CTC output of the Text Recognition model.
+
+        Example
+        -------
+        Model: text-recognition-0012
+
+            Output layer names in Inference Engine format:
+
+            name: "shadow/LSTMLayers/transpose_time_major", shape: [30, 1, 37] -
+                (T, B, C) logits over the alphabet followed by the CTC blank.
+        """
+        text, confidence = self.decode(inference_results[0], **kwargs)[0]
+        results = TextResult(
+            text=text, confidence=confidence, image=image, keep_image=self.keep_images
+        )
+        if show_bbox:
+            self.draw_output(results, image, **kwargs)
         return results
 
+    def preprocess_input(self, image, height=None, width=None, **kwargs):
+        return self.preprocess_text_crops([image], width or self.input_shape[3]), None
+
+    def preprocess_text_crops(self, crops, width, batch_size=None):
+        """Resize `crops` to the input height and pad them to `width` in one tensor.
+
+        The aspect ratio is kept, crops wider than `width` are squashed.
+        """
+        _, channels, height, _ = self.input_shape
+        batch_size = batch_size or len(crops)
+        key = ("text", batch_size, width)
+        if key not in self._batch_buffers:
+            self._batch_buffers[key] = np.zeros(
+                (batch_size, channels, height, width), dtype=np.float32
+            )
+        batch = self._batch_buffers[key]
+
+        for idx, crop in enumerate(crops):
+            # 16 bit, BGRA and grey crops become 8 bit as in the other batch writers.
+            crop = to_uint8(crop, channels)
+            crop_width = int(np.clip(crop.shape[1] * height / crop.shape[0], 1, width))
+            resized = cv2.resize(crop, (crop_width, height)).reshape(
+                height, crop_width, -1
+            )
+            batch[idx, :, :, :crop_width] = resized.transpose((2, 0, 1))
+            # Pad by repeating the last column, the network sees no hard edge.
+            batch[idx, :, :, crop_width:] = batch[idx, :, :, crop_width - 1 : crop_width]
+        return batch
+
+    def recognize(self, crops, request_id=0, **kwargs):
+        """Recognise the text of every crop, one inference per width bucket batch.
+
+        Parameters
+        ----------
+        crops: list
+            Text crops of any size, e.g. from `TextDetection.crop_text_regions`.
+        kwargs:
+            Passed on to `decode`, e.g. `beam_width` and `lexicon`.
+
+        Returns
+        -------
+        results: list
+            Per crop `TextResult` with the "text" and its "confidence", in the
+            order of `crops`. Empty crops, e.g. of degenerate rectangles, get an
+            empty text with a confidence of 0.
+        """
+        height = self.input_shape[2]
+        widths = np.array(
+            [crop.shape[1] * height / max(crop.shape[0], 1) for crop in crops]
+        )
+        bucket_ids = np.minimum(
+            np.searchsorted(self.width_buckets, widths), len(self.width_buckets) - 1
+        )
+        # Bucket -1 is never run, resizing an empty crop raises.
+        bucket_ids[[crop.size == 0 for crop in crops]] = -1
+
+        results = [
+            None if crop.size else TextResult(text="", confidence=0.0) for crop in crops
+        ]
+        # The crops of a call count as one frame.
+        frames = 1
+        for bucket_id, width in enumerate(self.width_buckets):
+            indices = np.flatnonzero(bucket_ids == bucket_id)
+            for start in range(0, len(indices), self.max_batch_size):
+                chunk_start = time.perf_counter_ns()
+                chunk = indices[start : start + self.max_batch_size]
+                batch = self.preprocess_text_crops(
+                    [crops[idx] for idx in chunk], width, self._batch_size_for(len(chunk))
+                )
+                preprocessed = time.perf_counter_ns()
+                exec_network = self._get_exec_network(len(batch), height, width)
+                if self.metrics is not None:
+                    self.metrics.requests_in_use.inc()
+                try:
+                    exec_network.start_async(
+                        request_id=request_id, inputs={self.input_name: batch}
+                    )
+                    status = exec_network.requests[request_id].wait(-1)
+                finally:
+                    if self.metrics is not None:
+                        self.metrics.requests_in_use.dec()
+                if status != 0:
+                    raise RuntimeError(
+                        f"Inference request failed with status: {status!r}"
+                    )
+                output_name = next(iter(self.model.outputs))
+                logits = exec_network.requests[request_id].outputs[output_name]
+                inferred = time.perf_counter_ns()
+                decoded = self.decode(logits[:, : len(chunk)], **kwargs)
+                for idx, (text, confidence) in zip(chunk, decoded):
+                    results[idx] = TextResult(text=text, confidence=confidence)
+                self._record_stages(chunk_start, preprocessed, inferred, frames)
+                frames = 0
+        return results
+
+    def predict_crops(self, image, boxes, request_id=0, show_bbox=False, **kwargs):
+        if not isinstance(image, np.ndarray):
+            raise InvalidImageArray("Image not parsed correctly.")
+        boxes = self._clip_boxes(boxes, image.shape)
+        crops = [image[ymin:ymax, xmin:xmax] for xmin, ymin, xmax, ymax in boxes]
+        return self.recognize(crops, request_id, **kwargs)
+
+    def decode(self, logits, beam_width=None, lexicon=None, **kwargs):
+        """Decode (T, B, C) CTC logits into B (text, confidence) pairs.
+
+        Greedy decoding is used unless a `beam_width` or `lexicon` is given.
+        """
+        probs = np.exp(logits - logits.max(axis=2, keepdims=True))
+        probs /= probs.sum(axis=2, keepdims=True)
+        if beam_width is None and lexicon is None:
+            return self.ctc_greedy_decode(probs, self.alphabet)
+
+        if lexicon is not None and not isinstance(lexicon, LexiconTrie):
+            lexicon = LexiconTrie(lexicon)
+        return [
+            self.ctc_beam_search_decode(
+                probs[:, idx], self.alphabet, beam_width or 10, lexicon
+            )
+            for idx in range(probs.shape[1])
+        ]
+
+    @staticmethod
+    def ctc_greedy_decode(probs, alphabet):
+        """Best path decoding of (T, B, C) probabilities for the whole batch at once.
+
+        The confidence of each string is the probability of its best path.
+        """
+        blank = len(alphabet) - 1
+        best = probs.argmax(axis=2)
+        confidences = np.exp(np.log(probs.max(axis=2)).sum(axis=0))
+        previous = np.vstack((np.full((1, best.shape[1]), blank), best[:-1]))
+        keep = (best != blank) & (best != previous)
+
+        chars = np.array(list(alphabet))[best]
+        return [
+            ("".join(chars[keep[:, idx], idx]), float(confidences[idx]))
+            for idx in range(best.shape[1])
+        ]
+
+    @staticmethod
+    def ctc_beam_search_decode(probs, alphabet, beam_width=10, lexicon=None):
+        """Prefix beam search over (T, C) probabilities of a single string.
+
+        With a `lexicon` only prefixes of its words are expanded and the best
+        complete word wins, falling back to the best unconstrained beam.
+        """
+        blank = len(alphabet) - 1
+        # prefix -> (probability ending in blank, probability ending in a symbol)
+        beams = {"": (1.0, 0.0)}
+        for step in probs:
+            candidates = np.argsort(step[:blank])[-beam_width:]
+            next_beams = {}
+            for prefix, (p_blank, p_symbol) in beams.items():
+                n_blank, n_symbol = next_beams.get(prefix, (0.0, 0.0))
+                n_blank += (p_blank + p_symbol) * step[blank]
+                if prefix:
+                    # A repeated symbol without a blank in between collapses.
+                    n_symbol += p_symbol * step[alphabet.index(prefix[-1])]
+                next_beams[prefix] = (n_blank, n_symbol)
+
+                for char_id in candidates:
+                    char = alphabet[char_id]
+                    extended = prefix + char
+                    if lexicon is not None and not lexicon.has_prefix(extended):
+                        continue
+                    e_blank, e_symbol = next_beams.get(extended, (0.0, 0.0))
+                    if prefix and prefix[-1] == char:
+                        e_symbol += p_blank * step[char_id]
+                    else:
+                        e_symbol += (p_blank + p_symbol) * step[char_id]
+                    next_beams[extended] = (e_blank, e_symbol)
+
+            beams = dict(
+                sorted(next_beams.items(), key=lambda beam: -sum(beam[1]))[:beam_width]
+            )
+
+        ranked = sorted(beams.items(), key=lambda beam: -sum(beam[1]))
+        if lexicon is not None:
+            words = [beam for beam in ranked if lexicon.is_word(beam[0])]
+            ranked = words or ranked
+        text, (p_blank, p_symbol) = ranked[0]
+        return text, float(p_blank + p_symbol)
+
     @staticmethod
     def draw_output(results, image, **kwargs):
         pass
@@ -0,0 +1,219 @@
+from collections import Counter, OrderedDict, deque
+
+import numpy as np
+from loguru import logger
+
+from ..openvino_base.results import Result, tracked_result_type
+
+
+class TrackResultCache:
+    def __init__(
+        self,
+        model,
+        refresh_interval=30,
+        ttl=90,
+        max_tracks=256,
+        min_quality_gain=1.2,
+        max_votes=15,
+    ):
+        """
+        This class can be used to cache the results of a recognition model per
+        tracked object, so that the model only runs when there is something new to
+        be learned about it.
+
+        A track is re-run when it is new, when `refresh_interval` frames passed since
+        its last run or when its crop is better than the best one seen so far, i.e.
+        larger or more frontal. The returned attributes are voted over the last
+        `max_votes` runs of the track.
+
+        Parameters
+        ----------
+        model: Base
+            Any model with a `predict_crops` method, e.g. `AgeGender` or `Emotions`.
+        refresh_interval: int
+            Frames after which a track is re-run regardless of its crop quality,
+            keep it short for attributes that change, like emotions.
+        ttl: int
+            Frames after which a track that was not seen is evicted.
+        max_tracks: int
+            Number of tracks kept, the least recently seen ones are evicted first.
+        min_quality_gain: float
+            Factor by which a crop's quality has to beat the best one seen to
+            trigger a re-run.
+        max_votes: int
+            Number of runs per track the attributes are voted over.
+
+        Example
+        -------
+        ```
+            age_gender = TrackResultCache(AgeGender(model_name=...), refresh_interval=60)
+            results = age_gender.predict_crops(frame, boxes, track_ids)
+        ```
+        """
+        self.model = model
+        self.refresh_interval = refresh_interval
+        self.ttl = ttl
+        self.max_tracks = max_tracks
+        self.min_quality_gain = min_quality_gain
+        self.max_votes = max_votes
+        self.frame_count = 0
+        self.model_calls = 0
+        self.cache_hits = 0
+        self._tracks = OrderedDict()
+
+    def __len__(self):
+        return len(self._tracks)
+
+    def __contains__(self, track_id):
+        return track_id in self._tracks
+
+    @property
+    def hit_rate(self):
+        total = self.model_calls + self.cache_hits
+        return self.cache_hits / total if total else 0.0
+
+    @staticmethod
+    def frontalness(head_pose_angles):
+        """Score how frontal faces are from their (N, 3) yaw, pitch and roll angles.
+
+        Returns cos(yaw) * cos(pitch) clipped to [0, 1], 1 for a face looking
+        straight at the camera.
+        """
+        angles = np.radians(np.asarray(head_pose_angles, dtype=np.float32))
+        score = np.cos(angles[:, 0]) * np.cos(angles[:, 1])
+        return np.clip(score, 0, 1)
+
+    def _stale(self, track, quality):
+        return (
+            track is None
+            or self.frame_count - track["last_run"] >= self.refresh_interval
+            or quality > track["best_quality"] * self.min_quality_gain
+        )
+
+    def predict_crops(
+        self, image, boxes, track_ids, frontalness=None, request_id=0, **kwargs
+    ):
+        """Get the voted results of every tracked box, running the model only on
+        the boxes whose track is due for a refresh, in one batch.
+
+        Parameters
+        ----------
+        image: np.ndarray
+            BGR frame, one call per frame.
+        boxes: list
+            (xmin, ymin, xmax, ymax) boxes of the tracked objects.
+        track_ids: list
+            Caller supplied track ID of every box, e.g. from a tracker.
+        frontalness: np.ndarray
+            Optional (N,) [0, 1] score per box, e.g. from `frontalness`, that is
+            multiplied with the box area to rate the crop quality.
+        kwargs:
+            Passed on to the model's `predict_crops`.
+
+        Returns
+        -------
+        results: list
+            Per box results of the model's result type in the order of `boxes`,
+            with a "track_id" field, see `tracked_result_type`.
+
+        Raises
+        ------
+        ValueError
+            When a track ID is given twice, or for more boxes than `max_tracks`,
+            which would evict tracks of the same frame.
+        """
+        duplicates = [track_id for track_id, n in Counter(track_ids).items() if n > 1]
+        if duplicates:
+            raise ValueError(f"Duplicate track IDs in one frame: {duplicates}")
+        if len(track_ids) > self.max_tracks:
+            raise ValueError(
+                f"{len(track_ids)} boxes exceed the {self.max_tracks} tracks kept."
+            )
+        self.frame_count += 1
+        boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        quality = np.prod(np.clip(boxes[:, 2:] - boxes[:, :2], 0, None), axis=1)
+        if frontalness is not None:
+            quality = quality * np.asarray(frontalness, dtype=np.float32)
+
+        stale = [
+            idx
+            for idx, track_id in enumerate(track_ids)
+            if self._stale(self._tracks.get(track_id), quality[idx])
+        ]
+        if stale:
+            fresh = self.model.predict_crops(
+                image, boxes[stale], request_id=request_id, **kwargs
+            )
+            for idx, result in zip(stale, fresh):
+                self._update(track_ids[idx], result, quality[idx])
+        self.model_calls += len(stale)
+        self.cache_hits += len(track_ids) - len(stale)
+
+        results = []
+        for track_id in track_ids:
+            track = self._tracks[track_id]
+            track["last_seen"] = self.frame_count
+            self._tracks.move_to_end(track_id)
+            voted = self.vote(track["votes"])
+            if issubclass(track["type"], Result):
+                results.append(
+                    tracked_result_type(track["type"])(track_id=track_id, **voted)
+                )
+            else:
+                results.append({**voted, "track_id": track_id})
+        # The tracks of this frame are the most recent ones and at most
+        # `max_tracks`, so only older ones are evicted.
+        self.evict()
+        return results
+
+    def _update(self, track_id, result, quality):
+        track = self._tracks.get(track_id)
+        if track is None:
+            track = self._tracks[track_id] = {
+                "votes": deque(maxlen=self.max_votes),
+                "best_quality": 0,
+            }
+        track["type"] = type(result)
+        track["votes"].append(
+            {key: value for key, value in result.items() if key != "image"}
+        )
+        track["best_quality"] = max(track["best_quality"], quality)
+        track["last_run"] = self.frame_count
+
+    @staticmethod
+    def vote(runs):
+        """Aggregate the results of several runs of a track.
+
+        Labels are decided by majority vote, numbers by their median and anything
+        else, e.g. arrays, is taken from the latest run.
+        """
+        voted = {}
+        for key, value in runs[-1].items():
+            values = [run[key] for run in runs if key in run]
+            if isinstance(value, str):
+                voted[key] = Counter(values).most_common(1)[0][0]
+            elif isinstance(value, (int, float, np.number)) and not isinstance(
+                value, bool
+            ):
+                voted[key] = type(value)(np.median(values))
+            else:
+                voted[key] = value
+        return voted
+
+    def evict(self):
+        """Drop the tracks that were not seen for `ttl` frames and the least
+        recently seen ones above `max_tracks`."""
+        expired = [
+            track_id
+            for track_id, track in self._tracks.items()
+            if self.frame_count - track["last_seen"] > self.ttl
+        ]
+        for track_id in expired:
+            del self._tracks[track_id]
+        while len(self._tracks) > self.max_tracks:
+            self._tracks.popitem(last=False)
+        if expired:
+            logger.debug(f"Evicted {len(expired)} expired tracks.")
+
+    def clear(self):
+        self._tracks.clear()
@@ -3,7 +3,8 @@ import time
 import cv2
 import numpy as np
 
-from ..openvino_base.base_model import Base
+from ..openvino_base.base_model import Base, InvalidModel
+from ..openvino_base.results import VehicleAttrsResult
 
 CAR_COLORS = ["white", "gray", "yellow", "red", "green", "blue", "black"]
 CAR_TYPES = ["car", "bus", "truck", "van"]
@@ -34,22 +35,83 @@ class VehicleAttrs(Base):
 
     def preprocess_output(self, inference_results, image, show_bbox, **kwargs):
         """
-        Handles the output of the Car Metadata model.
+        Handles the output of the Vehicle Attributes model.
+
+        Example
+        -------
+        Model: vehicle-attributes-recognition-barrier-0039
+
+            Output layer names in Inference Engine format:
+
+            name: "color", shape: [1, 7, 1, 1] - Softmax output across seven color
+                classes [white, gray, yellow, red, green, blue, black]
+            name: "type", shape: [1, 4, 1, 1] - Softmax output across four type
+                classes [car, bus, truck, van]
         """
-        results = {}
-        # TODO: Fix Untested code!
-        # color = inference_results.get("color")
-        # output_type = inference_results.get("type")
-        # # Get the argmax of the "color" output
-        # results["color"] = np.argmax(color)
-        # # Get the argmax of the "type" output
-        # output_type = np.argmax(output_type)
-        # results["output_type"] = output_type
-        if show_bbox:
-            self.draw_output(image, results, **kwargs)
-        results["image"] = image
-        return results
+        return self.preprocess_batch_output(
+            inference_results, [image], show_bbox=show_bbox, **kwargs
+        )[0]
+
+    def preprocess_batch_output(
+        self, inference_results, images, show_bbox=False, **kwargs
+    ):
+        colors, color_confs, types, type_confs = self.decode_attributes(
+            inference_results, len(images)
+        )
+
+        batch_results = []
+        for image, color, color_conf, car_type, type_conf in zip(
+            images, colors, color_confs.tolist(), types, type_confs.tolist()
+        ):
+            results = VehicleAttrsResult(
+                color=CAR_COLORS[color],
+                color_confidence=color_conf,
+                type=CAR_TYPES[car_type],
+                type_confidence=type_conf,
+                image=image,
+                keep_image=self.keep_images,
+            )
+            if show_bbox:
+                self.draw_output(image, results, **kwargs)
+            batch_results.append(results)
+        return batch_results
+
+    def decode_attributes(self, inference_results, count):
+        """Get the argmax labels and confidences of `count` colour and type outputs.
+
+        The outputs are told apart by their number of classes, so their order does
+        not matter.
+
+        Returns
+        -------
+        colors, color_confidences, types, type_confidences: np.ndarray
+            (N,) indices into `CAR_COLORS`/`CAR_TYPES` and their probabilities.
+        """
+        outputs = {
+            output.shape[1]: output.reshape(count, -1) for output in inference_results
+        }
+        if not {len(CAR_COLORS), len(CAR_TYPES)}.issubset(outputs):
+            msg = (
+                f"The model:{self.model_structure} does not contain expected output "
+                "shape as per the docs."
+            )
+            raise InvalidModel(msg)
+
+        decoded = []
+        for output in (outputs[len(CAR_COLORS)], outputs[len(CAR_TYPES)]):
+            labels = output.argmax(axis=1)
+            decoded.extend((labels, output[np.arange(count), labels]))
+        return decoded
 
     @staticmethod
     def draw_output(image, results, **kwargs):
-        pass
+        cv2.putText(
+            image,
+            f"{results['color']} {results['type']}",
+            (15, max(image.shape[0] - 15, 15)),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.5,
+            (0, 255, 0),
+            1,
+        )
+        return image
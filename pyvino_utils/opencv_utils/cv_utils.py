@@ -2,6 +2,19 @@ import cv2
 import matplotlib.pyplot as plt
 import numpy as np
 
+# 5 point (left eye, right eye, nose tip, left and right mouth corners) face layout
+# expected by the face re-identification models, relative to the crop size.
+FACE_REFERENCE_LANDMARKS = np.array(
+    [
+        [0.31556875, 0.46157411],
+        [0.68262292, 0.45983393],
+        [0.50026250, 0.64050536],
+        [0.34947188, 0.82469196],
+        [0.65343646, 0.82325089],
+    ],
+    dtype=np.float32,
+)
+
 
 def select_color(color: str):
     colors = {
@@ -49,6 +62,121 @@ def get_semantic_mask(processed_output):
     return mask
 
 
+def get_tiles(image_shape, tile_size, overlap=0.2):
+    """
+    Split an image into overlapping tiles of the same size.
+
+    The last tile of every row and column is aligned with the image border, so all
+    tiles have the same size unless the image is smaller than a tile.
+
+    Parameters
+    ----------
+    image_shape: tuple
+        (height, width, ...) of the image.
+    tile_size: tuple
+        (width, height) of the tiles.
+    overlap: float
+        Fraction of a tile shared with its neighbours.
+
+    Returns
+    -------
+    tiles: np.ndarray
+        (T, 4) array of xmin, ymin, xmax and ymax of the tiles, row by row.
+    """
+    starts = []
+    for size, tile in zip(image_shape[1::-1], tile_size):
+        tile = min(tile, size)
+        step = max(int(tile * (1 - overlap)), 1)
+        starts.append(
+            np.unique(np.minimum(np.arange(0, size - tile + step, step), size - tile))
+        )
+    xs, ys = np.meshgrid(*starts)
+    tiles = np.stack((xs.ravel(), ys.ravel()), axis=1)
+    tile_size = np.minimum(tile_size, image_shape[1::-1])
+    return np.hstack((tiles, tiles + tile_size))
+
+
+def non_max_suppression(boxes, scores, iou_threshold=0.5, metric="iou"):
+    """
+    Greedy non-maximum suppression, the overlaps of each kept box with all the
+    remaining boxes are computed in one vectorised step.
+
+    Parameters
+    ----------
+    boxes: np.ndarray
+        (N, 4) array of xmin, ymin, xmax and ymax of the boxes.
+    scores: np.ndarray
+        (N,) confidence of each box.
+    iou_threshold: float
+        Boxes overlapping a kept box by more than this are suppressed.
+    metric: str
+        "iou" for intersection over union, "ios" for intersection over the area of
+        the smaller box, which also merges boxes cut in half at tile seams.
+
+    Returns
+    -------
+    keep: np.ndarray
+        Indices of the kept boxes, in decreasing score order.
+    """
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    xmin, ymin, xmax, ymax = boxes.T
+    areas = np.maximum(xmax - xmin, 0) * np.maximum(ymax - ymin, 0)
+    order = np.argsort(-np.asarray(scores), kind="stable")
+
+    keep = []
+    while order.size:
+        idx, rest = order[0], order[1:]
+        keep.append(idx)
+        width = np.minimum(xmax[idx], xmax[rest]) - np.maximum(xmin[idx], xmin[rest])
+        height = np.minimum(ymax[idx], ymax[rest]) - np.maximum(ymin[idx], ymin[rest])
+        intersection = np.maximum(width, 0) * np.maximum(height, 0)
+        if metric == "ios":
+            union = np.minimum(areas[idx], areas[rest])
+        else:
+            union = areas[idx] + areas[rest] - intersection
+        overlap = intersection / np.maximum(union, 1e-9)
+        order = rest[overlap <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+def similarity_transforms(src_points, dst_points):
+    """
+    Least-squares similarity transforms (rotation, uniform scale and translation)
+    mapping each set of `src_points` onto `dst_points`, for all sets at once.
+
+    Parameters
+    ----------
+    src_points: np.ndarray
+        (N, K, 2) points, e.g. the 5 facial landmarks of N faces.
+    dst_points: np.ndarray
+        (K, 2) or (N, K, 2) target points.
+
+    Returns
+    -------
+    matrices: np.ndarray
+        (N, 2, 3) float32 affine matrices for `cv2.warpAffine`.
+    """
+    src = np.asarray(src_points, dtype=np.float64).reshape(len(src_points), -1, 2)
+    dst = np.broadcast_to(np.asarray(dst_points, dtype=np.float64), src.shape)
+    src_mean, dst_mean = src.mean(axis=1), dst.mean(axis=1)
+    src_centred = src - src_mean[:, None]
+    dst_centred = dst - dst_mean[:, None]
+
+    # The closed form solution of [[a, -b], [b, a]] @ src + t = dst.
+    norm = np.maximum(np.einsum("nkd,nkd->n", src_centred, src_centred), 1e-12)
+    a = np.einsum("nkd,nkd->n", src_centred, dst_centred) / norm
+    b = (
+        np.einsum("nk,nk->n", src_centred[..., 0], dst_centred[..., 1])
+        - np.einsum("nk,nk->n", src_centred[..., 1], dst_centred[..., 0])
+    ) / norm
+
+    matrices = np.empty((len(src), 2, 3), dtype=np.float32)
+    matrices[:, 0, 0], matrices[:, 0, 1] = a, -b
+    matrices[:, 1, 0], matrices[:, 1, 1] = b, a
+    matrices[:, :, 2] = dst_mean - np.einsum("nij,nj->ni", matrices[:, :, :2], src_mean)
+    return matrices
+
+
 class BBoxViz:
     """
     This class helps draw bounding boxes around objects.
@@ -565,3 +693,43 @@ class Contours:
 
             # if testIntersectionOut(xmin, ymax):
             #     textOut += 1
+
+
+def to_uint8(image, channels=3):
+    """
+    Convert an image to 8 bits with `channels` channels, as the input buffers of the
+    models expect, images which already are are returned as is.
+
+    Integer images of more bits, e.g. 16 bit TIFF tiles, are scaled by the range of
+    their type, grey images are replicated into BGR and the alpha channel of BGRA
+    images is dropped. Floating point images, whose range is unknown, keep their
+    values as float32, the models write them straight into their float input.
+
+    Raises
+    ------
+    ValueError
+        For channel counts that cannot be converted.
+    """
+    if np.issubdtype(image.dtype, np.floating):
+        image = image.astype(np.float32, copy=False)
+    elif image.dtype != np.uint8:
+        info = np.iinfo(image.dtype)
+        alpha = 255 / (int(info.max) - int(info.min))
+        image = cv2.convertScaleAbs(
+            image.astype(np.float32), alpha=alpha, beta=-int(info.min) * alpha
+        )
+    image_channels = 1 if image.ndim == 2 else image.shape[2]
+    if image_channels == channels:
+        return image if image.ndim == 3 else image[..., None]
+    conversions = {
+        (1, 3): cv2.COLOR_GRAY2BGR,
+        (4, 3): cv2.COLOR_BGRA2BGR,
+        (3, 1): cv2.COLOR_BGR2GRAY,
+        (4, 1): cv2.COLOR_BGRA2GRAY,
+    }
+    if (image_channels, channels) not in conversions:
+        raise ValueError(
+            f"Cannot convert images of {image_channels} channels to {channels}."
+        )
+    image = cv2.cvtColor(image, conversions[image_channels, channels])
+    return image if image.ndim == 3 else image[..., None]
@@ -0,0 +1,297 @@
+import json
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+from loguru import logger
+
+from pyvino_utils.telemetry.tracing import TRACER
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ModuleNotFoundError:
+    pa = pq = None
+
+__all__ = ["ResultsSink"]
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow", "jsonl": ".jsonl"}
+
+
+class ResultsSink:
+    def __init__(
+        self, output_dir, output_format="parquet", row_group_size=65536, max_queue=8
+    ):
+        """
+        This class can be used to stream the results of any model to disk in
+        columnar form, so that they can be analysed with e.g. `pyarrow.dataset`
+        instead of being parsed back from JSON.
+
+        Results are flattened into columns as they are written, buffered per source
+        and handed to a background thread in record batches of `row_group_size`
+        rows, one file per source.
+
+        Parameters
+        ----------
+        output_dir: str
+            Directory the files are written to, `<source>.parquet`, `<source>.arrow`
+            or `<source>.jsonl`.
+        output_format: str
+            "parquet", "arrow" (IPC file) or "jsonl", which is used as a fallback
+            when `pyarrow` is not installed.
+        row_group_size: int
+            Number of rows per record batch and Parquet row group.
+        max_queue: int
+            Number of record batches waiting for the writer before `write` blocks.
+
+        Example
+        -------
+        ```
+            with ResultsSink("results/") as sink:
+                for frame_id, frame in enumerate(feed.next_frame()):
+                    faces = face_detector.predict(frame)
+                    sink.write(frame_id, faces, source="faces")
+                    sink.write(frame_id, age_gender.predict_crops(...), source="age")
+
+            pyarrow.dataset.dataset("results/faces.parquet").to_table()
+        ```
+        """
+        if output_format not in FORMATS:
+            raise ValueError(f"Format: {output_format!r} not in {sorted(FORMATS)}")
+        if pa is None and output_format != "jsonl":
+            logger.warning(
+                f"pyarrow is not installed, writing jsonl not {output_format}."
+            )
+            output_format = "jsonl"
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.row_group_size = row_group_size
+        self._buffers = {}
+        self._writers = {}
+        self._schemas = {}
+        self._pending = {}
+        self._error = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="ResultsSink", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def path(self, source):
+        """File the rows of `source` are written to."""
+        return os.path.join(self.output_dir, f"{source}{FORMATS[self.output_format]}")
+
+    def write(self, frame_id, results, source=None, timestamp=None):
+        """Add the results of one frame.
+
+        Parameters
+        ----------
+        frame_id: int
+            Index of the frame the results belong to.
+        results: Result
+            Output of `predict`, `predict_tiled` etc. or a list of results of
+            `predict_crops`, whose "object_id" is their index in the list. A frame
+            without objects is written as one row with null object columns.
+        source: str
+            Name of the model or stream, defaults to the result type, an empty list
+            of results is only written with a `source`.
+        timestamp: float
+            Capture time of the frame, defaults to now.
+        """
+        if self._error is not None:
+            raise RuntimeError("The results writer failed.") from self._error
+        timestamp = time.time() if timestamp is None else timestamp
+        if not isinstance(results, (list, tuple)):
+            results = [results]
+            object_ids = None
+        else:
+            object_ids = range(len(results))
+        if not results and source is None:
+            return
+
+        source = source or type(results[0]).__name__
+        buffer = self._buffers.setdefault(source, {"rows": 0, "chunks": []})
+        rows = buffer["rows"]
+        for idx, result in enumerate(results):
+            count, columns = result.to_columns()
+            if not count:
+                continue
+            object_id = (
+                np.full(count, idx, dtype=np.int64)
+                if object_ids is not None
+                else np.arange(count, dtype=np.int64)
+            )
+            self._append(buffer, frame_id, timestamp, object_id, count, columns)
+        if buffer["rows"] == rows:
+            # Keep a row for frames without objects, e.g. for their
+            # "predict_time_ms", its object columns are null.
+            _, columns = results[0].to_columns(empty_row=True) if results else (1, {})
+            self._append(buffer, frame_id, timestamp, [None], 1, columns)
+        if buffer["rows"] >= self.row_group_size:
+            self._flush(source)
+
+    @staticmethod
+    def _append(buffer, frame_id, timestamp, object_id, count, columns):
+        meta = {
+            "frame_id": np.full(count, frame_id, dtype=np.int64),
+            "timestamp": np.full(count, timestamp, dtype=np.float64),
+            "object_id": object_id,
+        }
+        buffer["chunks"].append((count, {**meta, **columns}))
+        buffer["rows"] += count
+
+    def _flush(self, source):
+        buffer = self._buffers.get(source)
+        if not buffer or not buffer["rows"]:
+            return
+        chunks, buffer["chunks"], buffer["rows"] = buffer["chunks"], [], 0
+        # Block when the writer falls behind instead of buffering without bound.
+        self._queue.put((source, self._to_columns(chunks)))
+
+    @staticmethod
+    def _to_columns(chunks):
+        """Concatenate the column chunks, filling the columns a chunk lacks with
+        None."""
+        names = list(dict.fromkeys(name for _, columns in chunks for name in columns))
+        merged = {}
+        for name in names:
+            parts = [columns.get(name) for _, columns in chunks]
+            if all(isinstance(part, np.ndarray) for part in parts):
+                merged[name] = np.concatenate(parts)
+                continue
+            values = []
+            for (count, _), part in zip(chunks, parts):
+                if part is None:
+                    values.extend([None] * count)
+                else:
+                    values.extend(part.tolist() if isinstance(part, np.ndarray) else part)
+            merged[name] = values
+        return merged
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    self._write_pending()
+                    return
+                if self._error is None:
+                    with TRACER.span("write", "output", source=item[0]):
+                        self._write(*item)
+            except Exception as err:
+                logger.exception(f"Failed writing the results of: {item[0]}")
+                self._error = err
+            finally:
+                self._queue.task_done()
+
+    def _write(self, source, columns):
+        if self.output_format == "jsonl":
+            writer = self._writers.get(source)
+            if writer is None:
+                writer = self._writers[source] = open(self.path(source), "w")
+            values = [
+                column.tolist() if isinstance(column, np.ndarray) else column
+                for column in columns.values()
+            ]
+            writer.writelines(
+                json.dumps(dict(zip(columns, row)), default=self._json_default) + "\n"
+                for row in zip(*values)
+            )
+            return
+
+        table = pa.table({name: self._to_arrow(value) for name, value in columns.items()})
+        if source not in self._writers:
+            if table["object_id"].null_count == len(table):
+                # Rows of frames without objects have no object columns to decide
+                # the schema of the file with, wait for a batch with objects.
+                self._pending.setdefault(source, []).append(table)
+                return
+            self._open(source, table.schema)
+        for table in self._pending.pop(source, []) + [table]:
+            self._write_table(source, table)
+
+    def _open(self, source, schema):
+        if self.output_format == "parquet":
+            self._writers[source] = pq.ParquetWriter(self.path(source), schema)
+        else:
+            self._writers[source] = pa.ipc.new_file(self.path(source), schema)
+        self._schemas[source] = schema
+
+    def _write_table(self, source, table):
+        table = self._conform(table, self._schemas[source])
+        if self.output_format == "parquet":
+            self._writers[source].write_table(table, row_group_size=self.row_group_size)
+        else:
+            self._writers[source].write_table(table, max_chunksize=self.row_group_size)
+
+    def _write_pending(self):
+        """Write the sources which never had a batch with objects."""
+        for source, tables in self._pending.items():
+            self._open(source, tables[0].schema)
+            for table in tables:
+                self._write_table(source, table)
+        self._pending.clear()
+
+    @staticmethod
+    def _json_default(value):
+        if isinstance(value, np.generic):
+            return value.item()
+        raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+    @staticmethod
+    def _to_arrow(values):
+        if isinstance(values, np.ndarray):
+            return pa.array(values)
+        # numpy scalars in lists are not converted by pyarrow on its own.
+        return pa.array(
+            [value.item() if isinstance(value, np.generic) else value for value in values]
+        )
+
+    @staticmethod
+    def _conform(table, schema):
+        """Cast `table` to the schema of the file, the first batch decides it."""
+        if table.schema.equals(schema):
+            return table
+        extra = set(table.schema.names) - set(schema.names)
+        if extra:
+            logger.warning(f"Dropping columns not in the file schema: {sorted(extra)}")
+        return pa.table(
+            {
+                field.name: (
+                    table[field.name].cast(field.type)
+                    if field.name in table.schema.names
+                    else pa.nulls(len(table), field.type)
+                )
+                for field in schema
+            },
+            schema=schema,
+        )
+
+    def flush(self):
+        """Write all buffered results and wait for the writer."""
+        for source in list(self._buffers):
+            self._flush(source)
+        self._queue.join()
+        if self._error is not None:
+            raise RuntimeError("The results writer failed.") from self._error
+
+    def close(self):
+        """Write all buffered results and close the files."""
+        if not self._thread.is_alive():
+            return
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+            for writer in self._writers.values():
+                writer.close()
+            self._writers.clear()
+            logger.info(f"Results written to {self.output_dir}")
@@ -0,0 +1,154 @@
+import socket
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from .protocol import recv_message, send_message
+
+__all__ = ["InferenceClient", "load_test"]
+
+
+class InferenceClient:
+    def __init__(self, address, timeout=None):
+        """
+        This class can be used to run requests against an `InferenceServer`.
+
+        Parameters
+        ----------
+        address: str or tuple
+            Path of a Unix socket or a (host, port) TCP address.
+        timeout: float
+            Socket timeout in seconds.
+
+        Example
+        -------
+        ```
+            with InferenceClient("/tmp/faces.sock") as client:
+                results = client.predict(frame)
+                boxes = results["bbox_coord"]
+        ```
+        """
+        if isinstance(address, str):
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            address = tuple(address)
+        self._sock.settimeout(timeout)
+        self._sock.connect(address)
+        self.last_batch_size = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _request(self, meta, arrays=None):
+        send_message(self._sock, meta, arrays)
+        reply, arrays = recv_message(self._sock)
+        if reply.get("status") != "ok":
+            raise RuntimeError(f"Inference server error: {reply.get('error')}")
+        self.last_batch_size = reply.get("batch_size")
+        return reply, arrays
+
+    def predict(self, image, encode=None):
+        """Get the decoded results of the model for one image.
+
+        Parameters
+        ----------
+        image: np.ndarray or bytes
+            BGR frame, or an already encoded image file.
+        encode: str
+            Extension to encode the frame with before sending it, e.g. ".jpg",
+            frames are sent raw when not given.
+
+        Returns
+        -------
+        results: dict
+            The fields of the model's result, e.g. "bbox_coord".
+        """
+        if isinstance(image, (bytes, bytearray)):
+            image = np.frombuffer(image, dtype=np.uint8)
+        elif encode is not None:
+            ok, image = cv2.imencode(encode, image)
+            if not ok:
+                raise ValueError(f"Could not encode the image as {encode}.")
+        reply, arrays = self._request({"kind": "image"}, {"image": image})
+        return {**reply["fields"], **arrays}
+
+    def infer(self, tensor):
+        """Get the raw outputs of the model for one preprocessed (C, H, W) tensor.
+
+        Returns
+        -------
+        outputs: dict
+            Output name to array, outputs without a batch axis hold the rows of
+            all requests in the batch, see "batch_index".
+        """
+        tensor = np.asarray(tensor, dtype=np.float32)
+        reply, arrays = self._request({"kind": "tensor"}, {"tensor": tensor})
+        arrays["batch_index"] = reply["fields"]["batch_index"]
+        return arrays
+
+    def stats(self):
+        """Get the batching statistics of the server."""
+        reply, _ = self._request({"kind": "stats"})
+        return reply
+
+    def ready(self):
+        """Whether the model of the server is loaded and warmed up."""
+        reply, _ = self._request({"kind": "ready"})
+        return reply["ready"]
+
+    def close(self):
+        self._sock.close()
+
+
+def load_test(address, image, clients=8, requests=100, encode=None):
+    """Run `requests` predictions of `image` from each of `clients` concurrent
+    clients and measure the latencies.
+
+    Returns
+    -------
+    stats: dict
+        "throughput" in requests per second, "mean_ms", "p50_ms" and "p99_ms"
+        latencies and the "mean_batch_size" seen by the clients.
+    """
+    if encode is not None:
+        image = cv2.imencode(encode, image)[1].tobytes()
+    latencies = np.zeros((clients, requests))
+    batch_sizes = np.zeros((clients, requests))
+    errors = []
+
+    def run(idx):
+        try:
+            with InferenceClient(address) as client:
+                for req in range(requests):
+                    start = time.perf_counter()
+                    client.predict(image)
+                    latencies[idx, req] = time.perf_counter() - start
+                    batch_sizes[idx, req] = client.last_batch_size
+        except Exception as err:
+            errors.append(err)
+
+    threads = [threading.Thread(target=run, args=(idx,)) for idx in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise errors[0]
+
+    latencies *= 1000
+    return {
+        "throughput": clients * requests / elapsed,
+        "mean_ms": float(latencies.mean()),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "mean_batch_size": float(batch_sizes.mean()),
+    }
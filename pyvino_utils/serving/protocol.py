@@ -0,0 +1,95 @@
+"""Length prefixed binary messages shared by the inference server and client.
+
+A message is a `!II` header with the sizes of a JSON meta block and of the binary
+payload, followed by both. The meta block lists the arrays in the payload as
+{"name", "dtype", "shape"} entries, so arrays travel as raw bytes without pickling.
+"""
+import json
+import struct
+
+import numpy as np
+
+__all__ = ["send_message", "recv_message", "result_to_message"]
+
+_HEADER = struct.Struct("!II")
+
+
+def _recv_exactly(sock, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    while view:
+        received = sock.recv_into(view)
+        if not received:
+            raise ConnectionError("Connection closed mid-message.")
+        view = view[received:]
+    return buffer
+
+
+def _to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def send_message(sock, meta, arrays=None):
+    """Send a JSON serializable `meta` dict and a dict of named arrays."""
+    arrays = arrays or {}
+    meta = dict(meta)
+    meta["arrays"] = [
+        {"name": name, "dtype": array.dtype.str, "shape": array.shape}
+        for name, array in arrays.items()
+    ]
+    meta_bytes = json.dumps(meta, default=_to_json).encode()
+    payload = [np.ascontiguousarray(array).data for array in arrays.values()]
+    sizes = sum(part.nbytes for part in payload)
+    sock.sendall(_HEADER.pack(len(meta_bytes), sizes) + meta_bytes)
+    for part in payload:
+        sock.sendall(part)
+
+
+def recv_message(sock):
+    """Receive a message sent with `send_message`.
+
+    Returns
+    -------
+    meta: dict
+    arrays: dict
+        Named arrays, views of the received payload.
+
+    Raises
+    ------
+    ConnectionError
+        When the peer closed the connection.
+    """
+    header = sock.recv(_HEADER.size)
+    if not header:
+        raise ConnectionError("Connection closed.")
+    if len(header) < _HEADER.size:
+        header += _recv_exactly(sock, _HEADER.size - len(header))
+    meta_size, payload_size = _HEADER.unpack(header)
+    meta = json.loads(bytes(_recv_exactly(sock, meta_size)))
+    payload = _recv_exactly(sock, payload_size)
+
+    arrays, offset = {}, 0
+    for spec in meta.pop("arrays"):
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        arrays[spec["name"]] = np.frombuffer(
+            payload, dtype=dtype, count=count, offset=offset
+        ).reshape(spec["shape"])
+        offset += count * dtype.itemsize
+    return meta, arrays
+
+
+def result_to_message(result):
+    """Split a model result into JSON fields and arrays, the image and lazy views
+    are left out."""
+    fields, arrays = {}, {}
+    for name, value in result.items():
+        if name == "image" or value is None:
+            continue
+        if isinstance(value, np.ndarray):
+            arrays[name] = value
+        elif isinstance(value, (str, int, float, np.generic)) or type(value) is dict:
+            fields[name] = value
+    return fields, arrays
@@ -0,0 +1,509 @@
+import glob
+import multiprocessing as mp
+import os
+import queue
+import re
+import time
+import weakref
+
+from loguru import logger
+
+from pyvino_utils.input_handler.frame_ring import SharedFrameRing
+from pyvino_utils.telemetry.metrics import REGISTRY
+
+__all__ = ["ReplicaPool", "cpu_topology", "partition_cores"]
+
+
+def _parse_cpulist(text):
+    """Parse a sysfs CPU list, e.g. "0-3,8-11"."""
+    cpus = []
+    for part in text.strip().split(","):
+        if part:
+            first, _, last = part.partition("-")
+            cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def _format_cpulist(cpus):
+    """Format CPUs as a compact list, e.g. "0-3,8-11"."""
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(f"{a}-{b}" if a != b else f"{a}" for a, b in ranges)
+
+
+def cpu_topology():
+    """Get the NUMA nodes and physical cores this process may run on.
+
+    Returns
+    -------
+    topology: dict
+        NUMA node to its physical cores, each a list of the CPU ids of its
+        hardware threads. A single node 0 without SMT siblings when sysfs is not
+        available, e.g. outside of Linux.
+    """
+    allowed = (
+        os.sched_getaffinity(0)
+        if hasattr(os, "sched_getaffinity")
+        else set(range(os.cpu_count() or 1))
+    )
+    nodes = {}
+    for path in glob.glob("/sys/devices/system/node/node*/cpulist"):
+        node = int(re.search(r"node(\d+)", path).group(1))
+        with open(path) as cpulist:
+            cpus = [cpu for cpu in _parse_cpulist(cpulist.read()) if cpu in allowed]
+        if cpus:
+            nodes[node] = cpus
+    if not nodes:
+        nodes = {0: sorted(allowed)}
+
+    topology = {}
+    for node, cpus in sorted(nodes.items()):
+        cores = {}
+        for cpu in cpus:
+            try:
+                with open(
+                    f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list"
+                ) as siblings:
+                    core = min(_parse_cpulist(siblings.read()))
+            except (OSError, ValueError):
+                core = cpu
+            cores.setdefault(core, []).append(cpu)
+        topology[node] = [cores[core] for core in sorted(cores)]
+    return topology
+
+
+def partition_cores(replicas=None, cores_per_replica=None, topology=None):
+    """Split the physical cores into disjoint sets, one per replica.
+
+    Replicas are spread round-robin over the NUMA nodes and never span two nodes,
+    hardware threads of a core always go to the same replica.
+
+    Parameters
+    ----------
+    replicas: int
+        Number of replicas, defaults to one per node, or as many as fit
+        `cores_per_replica`.
+    cores_per_replica: int
+        Physical cores of each replica, defaults to an even split of the node.
+    topology: dict
+        See `cpu_topology`, which it defaults to.
+
+    Returns
+    -------
+    partitions: list
+        (node, cpus, cores) of each replica, `cpus` are the CPU ids to pin it to
+        and `cores` the number of physical cores, i.e. of inference threads.
+    """
+    topology = topology if topology is not None else cpu_topology()
+    nodes = sorted(topology)
+    if replicas is None:
+        replicas = (
+            sum(len(topology[node]) // cores_per_replica for node in nodes)
+            if cores_per_replica
+            else len(nodes)
+        )
+    if replicas < 1:
+        raise ValueError("There are not enough cores for a single replica.")
+
+    counts = {
+        node: replicas // len(nodes) + (idx < replicas % len(nodes))
+        for idx, node in enumerate(nodes)
+    }
+    per_node = []
+    for node in nodes:
+        cores = topology[node]
+        count = counts[node]
+        size = cores_per_replica or (len(cores) // count if count else 0)
+        if count and (size < 1 or size * count > len(cores)):
+            raise ValueError(
+                f"NUMA node {node} has {len(cores)} cores, too few for {count} "
+                f"replicas of {cores_per_replica or 1} cores."
+            )
+        per_node.append(
+            [
+                (
+                    node,
+                    sorted(cpu for core in cores[start : start + size] for cpu in core),
+                    size,
+                )
+                for start in range(0, count * size, size or 1)
+            ]
+        )
+    # Interleave the nodes, so that the first replicas of a pool use every socket.
+    return [
+        partitions[idx]
+        for idx in range(max(counts.values()))
+        for partitions in per_node
+        if idx < len(partitions)
+    ]
+
+
+def _detach(result):
+    """Drop the image references of a result, which cannot be pickled and would
+    outlive the frames of the ring."""
+    if hasattr(result, "image"):
+        result.image = None
+    output = getattr(result, "process_output", None)
+    if hasattr(output, "image"):
+        output.image = None
+    return result
+
+
+def _run_replica(
+    replica,
+    cpus,
+    cores,
+    model_cls,
+    model_name,
+    kwargs,
+    predict_kwargs,
+    tasks,
+    ring,
+    results,
+):
+    """Entry point of the replica processes."""
+    try:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cpus)
+        # The plugin allocates on the node of the core that first touches the memory,
+        # so loading the model after pinning keeps its weights and buffers local.
+        config = {
+            "CPU_THREADS_NUM": str(cores),
+            # The affinity of the process already keeps the threads on its cores.
+            "CPU_BIND_THREAD": "NO",
+            **kwargs.get("config", {}),
+        }
+        model = model_cls(model_name, **{"metrics": None, **kwargs, "config": config})
+    except Exception as err:
+        logger.exception(f"Replica {replica} failed to load {model_name}.")
+        results.put(("error", replica, None, repr(err), 0))
+        return
+    results.put(("ready", replica, os.getpid(), None, 0))
+
+    while True:
+        if ring is not None:
+            ref = ring.get()
+            if ref is None:
+                break
+            index, frame = ref.meta, ref.frame
+        else:
+            task = tasks.get()
+            if task is None:
+                break
+            index, frame = task
+        start = time.perf_counter_ns()
+        try:
+            message = (
+                "result",
+                replica,
+                index,
+                _detach(model.predict(frame, **predict_kwargs)),
+            )
+        except Exception as err:
+            logger.exception(f"Replica {replica} failed on frame {index}.")
+            message = ("error", replica, index, repr(err))
+        finally:
+            if ring is not None:
+                ring.release(ref)
+        results.put((*message, time.perf_counter_ns() - start))
+    if ring is not None:
+        ring.close()
+
+
+class ReplicaPool:
+    def __init__(
+        self,
+        model_cls,
+        model_name,
+        replicas=None,
+        cores_per_replica=None,
+        frame_shape=None,
+        max_in_flight=None,
+        predict_kwargs=None,
+        metrics=REGISTRY,
+        **kwargs,
+    ):
+        """
+        This class runs replicas of a model in worker processes pinned to disjoint
+        core sets, e.g. one per socket of a dual-socket host, and balances the frames
+        over them.
+
+        Models sharing the cores of one process contend for them and end up with
+        their memory on the wrong NUMA node. Each replica is pinned with
+        `os.sched_setaffinity` before it loads its model, so that its memory is
+        allocated on its own node, and runs as many inference threads as it has
+        physical cores. Idle replicas pull the next frame, so slower replicas get
+        fewer frames.
+
+        Parameters
+        ----------
+        model_cls: type
+            Model class, e.g. `FaceDetection`, importable by the worker processes.
+        model_name: str
+            Path of the model without extension.
+        replicas: int
+            Number of replicas, see `partition_cores`.
+        cores_per_replica: int
+            Physical cores of each replica, see `partition_cores`.
+        frame_shape: tuple
+            Shape of the frames, when given they are passed through a
+            `SharedFrameRing` instead of being pickled.
+        max_in_flight: int
+            Frames submitted but not yet returned by `map`, defaults to two per
+            replica to keep each busy.
+        predict_kwargs: dict
+            Passed on to `predict`, e.g. {"show_bbox": False}.
+        metrics: MetricsRegistry
+            Registry the per-replica utilisation and frames go to, None turns
+            them off.
+        kwargs:
+            Passed on to `model_cls`, must be picklable. The "config" is merged
+            with the thread count of each replica.
+
+        Example
+        -------
+        ```
+            with ReplicaPool(FaceDetection, model_name, frame_shape=(1080, 1920, 3),
+                             source_width=1920, source_height=1080) as pool:
+                for result in pool.map(feed.next_frame(progress=False)):
+                    boxes = result["process_output"]["bbox_coord"]
+                print(pool.stats())
+        ```
+        """
+        self.model_cls = model_cls
+        self.model_name = model_name
+        self.partitions = partition_cores(replicas, cores_per_replica)
+        self.max_in_flight = max_in_flight or 2 * len(self.partitions)
+        self.predict_kwargs = predict_kwargs or {}
+        self.kwargs = kwargs
+        # Forking a process that already loaded OpenVINO is unsafe.
+        self._ctx = mp.get_context("spawn")
+        self._ring = (
+            SharedFrameRing(frame_shape, slots=self.max_in_flight, ctx=self._ctx)
+            if frame_shape is not None
+            else None
+        )
+        self._tasks = self._ctx.Queue() if self._ring is None else None
+        self._results = self._ctx.Queue()
+        self._processes = []
+        self._next_index = 0
+        self._in_flight = 0
+        self._started = None
+        self._stopped = None
+        replicas = len(self.partitions)
+        self._pids = [None] * replicas
+        self._frames = [0] * replicas
+        self._busy_ns = [0] * replicas
+        self._frame_counters = None
+
+        if metrics is not None:
+            name = os.path.basename(model_name)
+            self._frame_counters = [
+                metrics.counter(
+                    "pyvino_replica_frames_total",
+                    "Frames run through a replica.",
+                    model=name,
+                    replica=str(idx),
+                )
+                for idx in range(replicas)
+            ]
+            pool = weakref.ref(self)
+            for idx, (node, _, _) in enumerate(self.partitions):
+                metrics.gauge(
+                    "pyvino_replica_utilization",
+                    "Fraction of the time a replica spent in predict.",
+                    fn=lambda idx=idx: pool()._utilization(idx) if pool() else 0.0,
+                    model=name,
+                    replica=str(idx),
+                    node=str(node),
+                )
+
+    def _started_at(self):
+        """Seconds the replicas ran for since they were ready."""
+        if not self._started:
+            return 0.0
+        return (self._stopped or time.perf_counter()) - self._started
+
+    def _utilization(self, replica):
+        elapsed = self._started_at()
+        return self._busy_ns[replica] / (elapsed * 1e9) if elapsed else 0.0
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self, timeout=300):
+        """Start the replicas and wait until every one loaded its model."""
+        for replica, (node, cpus, cores) in enumerate(self.partitions):
+            process = self._ctx.Process(
+                target=_run_replica,
+                args=(
+                    replica,
+                    cpus,
+                    cores,
+                    self.model_cls,
+                    self.model_name,
+                    self.kwargs,
+                    self.predict_kwargs,
+                    self._tasks,
+                    self._ring,
+                    self._results,
+                ),
+                name=f"replica-{replica}",
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+            logger.info(
+                f"Replica {replica}: {cores} cores on NUMA node {node}, "
+                f"CPUs {_format_cpulist(cpus)}"
+            )
+
+        deadline = time.monotonic() + timeout
+        for _ in self._processes:
+            try:
+                kind, replica, pid, error, _ = self._results.get(
+                    timeout=max(0, deadline - time.monotonic())
+                )
+            except queue.Empty:
+                self.close()
+                raise TimeoutError(f"The replicas did not load within {timeout} s.")
+            if kind == "error":
+                self.close()
+                raise RuntimeError(f"Replica {replica} failed to load: {error}")
+            self._pids[replica] = pid
+        self._started = time.perf_counter()
+        return self
+
+    def submit(self, frame):
+        """Queue a frame for the next idle replica.
+
+        Returns
+        -------
+        index: int
+            Index of the frame, results are returned with it by `collect`.
+        """
+        index = self._next_index
+        if self._ring is not None:
+            self._ring.put(frame, meta=index)
+        else:
+            self._tasks.put((index, frame))
+        self._next_index += 1
+        self._in_flight += 1
+        return index
+
+    def collect(self, timeout=None):
+        """Get the next finished frame.
+
+        Returns
+        -------
+        index: int
+        result: PredictResult
+            The result of `predict`, without its image references.
+
+        Raises
+        ------
+        RuntimeError
+            When the replica failed on the frame.
+        """
+        kind, replica, index, result, busy_ns = self._results.get(timeout=timeout)
+        self._in_flight -= 1
+        self._frames[replica] += 1
+        self._busy_ns[replica] += busy_ns
+        if self._frame_counters is not None:
+            self._frame_counters[replica].inc()
+        if kind == "error":
+            raise RuntimeError(f"Replica {replica} failed on frame {index}: {result}")
+        return index, result
+
+    def map(self, frames, ordered=True):
+        """Run every frame of an iterable, e.g. `InputFeeder.next_frame`, through
+        the replicas.
+
+        At most `max_in_flight` frames are queued at once, results are yielded in
+        the order of the frames unless `ordered=False`.
+        """
+        pending = {}
+        next_index = self._next_index
+        frames = iter(frames)
+        exhausted = False
+        while not exhausted or self._in_flight:
+            while not exhausted and self._in_flight < self.max_in_flight:
+                try:
+                    self.submit(next(frames))
+                except StopIteration:
+                    exhausted = True
+            if not self._in_flight:
+                break
+            index, result = self.collect()
+            if not ordered:
+                yield result
+                continue
+            pending[index] = result
+            while next_index in pending:
+                yield pending.pop(next_index)
+                next_index += 1
+
+    def stats(self):
+        """Get the frames and utilisation of each replica.
+
+        Returns
+        -------
+        stats: list
+            One dict per replica with its "node", "cpus", "cores", "pid", "frames",
+            "busy_s" and "utilization", the fraction of the time since `start`
+            spent in `predict`.
+        """
+        return [
+            {
+                "replica": replica,
+                "node": node,
+                "cpus": _format_cpulist(cpus),
+                "cores": cores,
+                "pid": self._pids[replica],
+                "frames": self._frames[replica],
+                "busy_s": self._busy_ns[replica] / 1e9,
+                "utilization": self._utilization(replica),
+            }
+            for replica, (node, cpus, cores) in enumerate(self.partitions)
+        ]
+
+    @property
+    def throughput(self):
+        """Frames per second of all replicas since `start`."""
+        elapsed = self._started_at()
+        return sum(self._frames) / elapsed if elapsed else 0.0
+
+    def close(self, timeout=10):
+        """Stop the replicas once the queued frames are done."""
+        if self._ring is not None:
+            self._ring.finish(len(self._processes))
+        else:
+            for _ in self._processes:
+                self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        if self._started and not self._stopped:
+            self._stopped = time.perf_counter()
+        if self._ring is not None:
+            self._ring.close()
+            self._ring.unlink()
+            self._ring = None
+        stats = self.stats()
+        if any(replica["frames"] for replica in stats):
+            logger.info(
+                "Replica utilization: "
+                + ", ".join(
+                    f"{replica['replica']}: {replica['utilization']:.0%}"
+                    for replica in stats
+                )
+            )
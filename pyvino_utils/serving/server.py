@@ -0,0 +1,277 @@
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+
+import cv2
+from loguru import logger
+
+from pyvino_utils.telemetry.tracing import TRACER
+
+from .protocol import recv_message, result_to_message, send_message
+
+__all__ = ["InferenceServer"]
+
+
+class _Request:
+    __slots__ = ("kind", "data", "future", "arrived")
+
+    def __init__(self, kind, data):
+        self.kind = kind
+        self.data = data
+        self.future = Future()
+        self.arrived = time.perf_counter()
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server.inference_server
+        while True:
+            try:
+                meta, arrays = recv_message(self.request)
+            except (ConnectionError, OSError):
+                return
+            try:
+                reply_meta, reply_arrays = server.handle(meta, arrays)
+            except Exception as err:
+                logger.exception("Inference request failed.")
+                reply_meta, reply_arrays = {"status": "error", "error": str(err)}, {}
+            send_message(self.request, reply_meta, reply_arrays)
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def server_bind(self):
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        super().server_bind()
+
+
+class InferenceServer:
+    def __init__(self, model, address, max_batch=None, max_delay_ms=5.0, **kwargs):
+        """
+        This class can be used to share one model instance between many light client
+        processes, concurrent requests are batched dynamically into single
+        inferences.
+
+        The batcher waits for up to `max_delay_ms` after the first request of a batch
+        for more requests, or until `max_batch` requests arrived, so a lone request
+        is only delayed by `max_delay_ms`.
+
+        Requests are either encoded images (JPEG, PNG, ...) or raw images, answered
+        with the decoded results of the model, or preprocessed (C, H, W) input
+        tensors, answered with the raw model outputs. See `InferenceClient`.
+
+        Parameters
+        ----------
+        model: Base
+            Any model, e.g. `FaceDetection`, it is only used by the batcher thread.
+        address: str or tuple
+            Path of a Unix socket or a (host, port) TCP address.
+        max_batch: int
+            Largest batch, defaults to the model's `tuned_batch_size` or else its
+            `max_batch_size`.
+        max_delay_ms: float
+            Longest time a request waits for others to fill its batch.
+        kwargs:
+            Passed on to the model's `preprocess_batch_output`.
+
+        Example
+        -------
+        ```
+            server = InferenceServer(FaceDetection(model_name=...), "/tmp/faces.sock")
+            server.serve_forever()
+        ```
+        """
+        self.model = model
+        self.address = address
+        max_batch = max_batch or model.tuned_batch_size or model.max_batch_size
+        self.max_batch = min(max_batch, model.max_batch_size)
+        self.max_delay = max_delay_ms / 1000
+        self.kwargs = kwargs
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._running = threading.Event()
+        # Orders the queueing of requests before the shutdown, see `shutdown`.
+        self._lock = threading.Lock()
+        self._queue_depth = None
+
+        if isinstance(address, str):
+            if os.path.exists(address):
+                os.unlink(address)
+            self._server = _UnixServer(address, _Handler)
+        else:
+            self._server = _TCPServer(tuple(address), _Handler)
+            self.address = self._server.server_address
+        self._server.inference_server = self
+        if model.metrics is not None:
+            self._queue_depth = model.metrics.registry.gauge(
+                "pyvino_queue_depth",
+                "Requests waiting for a batch.",
+                queue=str(self.address),
+            )
+        self._batcher = threading.Thread(target=self._run_batches, daemon=True)
+
+    @property
+    def mean_batch_size(self):
+        return self.requests / self.batches if self.batches else 0.0
+
+    def handle(self, meta, arrays):
+        """Answer one request, blocking until its batch ran."""
+        kind = meta.get("kind")
+        if kind == "image":
+            data = arrays["image"]
+            if data.ndim == 1:
+                data = cv2.imdecode(data, cv2.IMREAD_COLOR)
+                if data is None:
+                    raise ValueError("Could not decode the image.")
+        elif kind == "tensor":
+            data = arrays["tensor"].reshape(self.model.input_shape[1:])
+        elif kind == "stats":
+            return self.stats(), {}
+        elif kind == "ready":
+            return {"status": "ok", "ready": self.model.is_ready}, {}
+        else:
+            raise ValueError(f"Unknown request kind: {kind!r}")
+
+        request = _Request(kind, data)
+        with self._lock:
+            if not self._running.is_set():
+                raise RuntimeError("The server is not running.")
+            self._queue.put(request)
+        fields, outputs, batch_size = request.future.result()
+        return {"status": "ok", "batch_size": batch_size, "fields": fields}, outputs
+
+    def stats(self):
+        return {
+            "status": "ok",
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch_size": self.mean_batch_size,
+        }
+
+    def _next_batch(self):
+        """Block for the first request, then gather more until the batch is full
+        or the first request waited for `max_delay`."""
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = batch[0].arrived + self.max_delay
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            try:
+                batch.append(
+                    self._queue.get(timeout=timeout)
+                    if timeout > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+        if self._queue_depth is not None:
+            self._queue_depth.set(self._queue.qsize())
+        return batch
+
+    def _run_batches(self):
+        while self._running.is_set():
+            batch = self._next_batch()
+            for kind in ("image", "tensor"):
+                requests = [request for request in batch if request.kind == kind]
+                if not requests:
+                    continue
+                try:
+                    items = [request.data for request in requests]
+                    with TRACER.span("batch", "server", kind=kind, size=len(items)):
+                        replies = self._infer(kind, items)
+                except Exception as err:
+                    if self.model.metrics is not None:
+                        self.model.metrics.dropped.inc(len(requests))
+                    for request in requests:
+                        request.future.set_exception(err)
+                    continue
+                self.batches += 1
+                self.requests += len(requests)
+                for request, (fields, outputs) in zip(requests, replies):
+                    request.future.set_result((fields, outputs, len(requests)))
+
+    def _infer(self, kind, items):
+        if kind == "image":
+            results = self.model.predict_batch(items, **self.kwargs)
+            return [result_to_message(result) for result in results]
+
+        batch_size = self.model._batch_size_for(len(items))
+        _, batch = self.model._get_batch_buffers(batch_size)
+        batch[: len(items)] = items
+        outputs = self.model._infer_batch(batch, len(items))
+        names = list(self.model.model.outputs)
+        replies = []
+        for idx in range(len(items)):
+            # Outputs without a batch axis, e.g. SSD detections, go to every
+            # request, which picks its rows with its "batch_index".
+            replies.append(
+                (
+                    {"batch_index": idx},
+                    {
+                        name: output[idx : idx + 1]
+                        if output.shape[0] == len(items)
+                        else output
+                        for name, output in zip(names, outputs)
+                    },
+                )
+            )
+        return replies
+
+    def start(self):
+        """Serve in a background thread."""
+        self._running.set()
+        self._batcher.start()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Serving {self.model.model_structure} on {self.address}")
+        return self
+
+    def serve_forever(self):
+        self._running.set()
+        self._batcher.start()
+        logger.info(f"Serving {self.model.model_structure} on {self.address}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        with self._lock:
+            if not self._running.is_set():
+                return
+            self._running.clear()
+        self._server.shutdown()
+        self._server.server_close()
+        self._batcher.join()
+        # Fail the requests the batcher did not get to, their handlers wait on them.
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            request.future.set_exception(RuntimeError("The server shut down."))
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+        logger.info(
+            f"Served {self.requests} requests in {self.batches} batches "
+            f"(mean batch size: {self.mean_batch_size:.2f})"
+        )
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
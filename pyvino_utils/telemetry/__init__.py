@@ -0,0 +1,5 @@
+# Python standard library
+import os
+import pkgutil
+
+__all__ = [module for _, module, _ in pkgutil.iter_modules([os.path.dirname(__file__)])]
@@ -0,0 +1,435 @@
+import bisect
+import math
+import os
+import resource
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from loguru import logger
+
+__all__ = [
+    "REGISTRY",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "ModelMetrics",
+    "FeedMetrics",
+]
+
+# Latency buckets in seconds, from sub-millisecond preprocessing to slow models.
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels.items()) + list((extra or {}).items())
+    if not items:
+        return ""
+    escaped = (
+        str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+        for _, value in items
+    )
+    return (
+        "{"
+        + ",".join(f'{key}="{value}"' for (key, _), value in zip(items, escaped))
+        + "}"
+    )
+
+
+def _format_value(value):
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonically increasing value, e.g. the number of processed frames."""
+
+    __slots__ = ("labels", "value", "_lock")
+    kind = "counter"
+
+    def __init__(self, labels):
+        self.labels = labels
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def sample(self):
+        return {"labels": self.labels, "value": self.value}
+
+
+class Gauge:
+    """Value that goes up and down, e.g. the number of busy infer requests.
+
+    `fn` is called on every scrape instead when given, it must not hold a strong
+    reference to a model.
+    """
+
+    __slots__ = ("labels", "value", "fn", "_lock")
+    kind = "gauge"
+
+    def __init__(self, labels, fn=None):
+        self.labels = labels
+        self.value = 0.0
+        self.fn = fn
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def sample(self):
+        value = self.value if self.fn is None else self.fn()
+        return {"labels": self.labels, "value": float(value)}
+
+
+class Histogram:
+    """Distribution of observed values in fixed cumulative buckets."""
+
+    __slots__ = ("labels", "buckets", "counts", "count", "sum", "_lock")
+    kind = "histogram"
+
+    def __init__(self, labels, buckets=LATENCY_BUCKETS):
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[idx] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q):
+        """Estimate the `q` quantile by interpolating inside its bucket."""
+        with self._lock:
+            counts, count = list(self.counts), self.count
+        if not count:
+            return float("nan")
+        rank = q * count
+        cumulative = 0
+        for idx, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if idx == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[idx - 1] if idx else 0.0
+                upper = self.buckets[idx]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def sample(self):
+        with self._lock:
+            counts, count, total = list(self.counts), self.count, self.sum
+        cumulative, buckets = 0, {}
+        for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+            cumulative += bucket_count
+            buckets[bound] = cumulative
+        return {
+            "labels": self.labels,
+            "count": count,
+            "sum": total,
+            "buckets": buckets,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """
+        This class holds the metrics of the models and feeds of a process, it can be
+        read with `snapshot` or scraped by Prometheus, see `serve`.
+
+        Metrics are created once per name and label set and updated in place, so
+        recording a value only takes a lock and an addition.
+
+        Example
+        -------
+        ```
+            from pyvino_utils.telemetry.metrics import REGISTRY
+
+            REGISTRY.serve(port=9464)  # http://localhost:9464/metrics
+            face_detector = FaceDetection(model_name=...)
+            ...
+            REGISTRY.snapshot()["pyvino_infer_seconds"]
+        ```
+        """
+        self._families = {}
+        self._lock = threading.Lock()
+        self.gauge(
+            "pyvino_process_resident_memory_bytes",
+            "Resident memory of the process.",
+            fn=_resident_memory_bytes,
+        )
+
+    def _get(self, cls, name, help, labels, **kwargs):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = {
+                    "kind": cls.kind,
+                    "help": help,
+                    "metrics": {},
+                }
+            elif family["kind"] != cls.kind:
+                raise ValueError(
+                    f"Metric: {name} is a {family['kind']} not a {cls.kind}."
+                )
+            metric = family["metrics"].get(key)
+            if metric is None:
+                metric = family["metrics"][key] = cls(dict(labels), **kwargs)
+        return metric
+
+    def counter(self, name, help="", **labels):
+        """Get or create the counter `name` with `labels`."""
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name, help="", fn=None, **labels):
+        """Get or create the gauge `name` with `labels`."""
+        gauge = self._get(Gauge, name, help, labels)
+        if fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def histogram(self, name, help="", buckets=LATENCY_BUCKETS, **labels):
+        """Get or create the histogram `name` with `labels`."""
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def snapshot(self):
+        """Get the current value of every metric.
+
+        Returns
+        -------
+        snapshot: dict
+            Metric name to {"type", "help", "samples"}, histogram samples hold the
+            "count", "sum", cumulative "buckets" and estimated "p50" and "p99".
+        """
+        with self._lock:
+            families = {
+                name: (family["kind"], family["help"], list(family["metrics"].values()))
+                for name, family in self._families.items()
+            }
+        return {
+            name: {
+                "type": kind,
+                "help": help,
+                "samples": [metric.sample() for metric in metrics],
+            }
+            for name, (kind, help, metrics) in families.items()
+        }
+
+    def to_prometheus(self):
+        """Render the metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, family in self.snapshot().items():
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            for sample in family["samples"]:
+                labels = sample["labels"]
+                if family["type"] != "histogram":
+                    lines.append(
+                        f"{name}{_format_labels(labels)} {_format_value(sample['value'])}"
+                    )
+                    continue
+                for bound, count in sample["buckets"].items():
+                    le = {"le": _format_value(bound)}
+                    lines.append(f"{name}_bucket{_format_labels(labels, le)} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {sample['sum']!r}")
+                lines.append(f"{name}_count{_format_labels(labels)} {sample['count']}")
+        return "\n".join(lines) + "\n"
+
+    def ready(self):
+        """Whether every model of the registry is loaded and warmed up."""
+        metric = self.snapshot().get("pyvino_model_ready")
+        return metric is None or all(
+            sample["value"] == 1 for sample in metric["samples"]
+        )
+
+    def serve(self, port=9464, host="0.0.0.0"):
+        """Serve the metrics on http://<host>:<port>/metrics from a daemon thread.
+
+        http://<host>:<port>/ready answers 200 once `ready`, 503 before, for the
+        readiness probes of orchestrators.
+
+        Returns
+        -------
+        server: http.server.ThreadingHTTPServer
+            Call `shutdown` on it to stop serving.
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] == "/ready":
+                    ready = registry.ready()
+                    body = b"ready\n" if ready else b"warming up\n"
+                    self.send_response(200 if ready else 503)
+                    self.send_header("Content-Type", "text/plain")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logger.info(
+            f"Serving metrics on http://{host}:{server.server_address[1]}/metrics"
+        )
+        return server
+
+
+def _resident_memory_bytes():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Peak instead of current usage, in kilobytes on Linux and bytes on macOS.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class ModelMetrics:
+    """Metrics of one model, created by `Base` with the model's file name as label."""
+
+    __slots__ = (
+        "registry",
+        "preprocess",
+        "infer",
+        "postprocess",
+        "frames",
+        "dropped",
+        "requests_in_use",
+        "model_size",
+        "exec_networks",
+        "ready",
+        "first_inference",
+        "warm_inference",
+    )
+
+    def __init__(self, registry, model):
+        self.registry = registry
+        self.preprocess, self.infer, self.postprocess = (
+            registry.histogram(
+                f"pyvino_{stage}_seconds", f"Time spent in {stage} per call.", model=model
+            )
+            for stage in ("preprocess", "infer", "postprocess")
+        )
+        self.frames = registry.counter(
+            "pyvino_frames_processed_total", "Frames run through the model.", model=model
+        )
+        self.dropped = registry.counter(
+            "pyvino_frames_dropped_total",
+            "Frames that were not run through the model.",
+            model=model,
+        )
+        self.requests_in_use = registry.gauge(
+            "pyvino_infer_requests_in_use", "Busy infer requests.", model=model
+        )
+        self.model_size = registry.gauge(
+            "pyvino_model_weights_bytes", "Size of the model weights.", model=model
+        )
+        self.exec_networks = registry.gauge(
+            "pyvino_exec_networks",
+            "Executable networks loaded, one per shape.",
+            model=model,
+        )
+        self.ready = registry.gauge(
+            "pyvino_model_ready", "1 once the model is loaded and warmed up.", model=model
+        )
+        self.first_inference = registry.gauge(
+            "pyvino_first_inference_seconds",
+            "Latency of the first inference after loading.",
+            model=model,
+        )
+        self.warm_inference = registry.gauge(
+            "pyvino_warm_inference_seconds",
+            "Median latency of the following warm-up inferences.",
+            model=model,
+        )
+
+    def observe(self, preprocess, infer, postprocess, frames=1):
+        """Record the stage durations of one call in seconds."""
+        self.preprocess.observe(preprocess)
+        self.infer.observe(infer)
+        self.postprocess.observe(postprocess)
+        self.frames.inc(frames)
+
+
+class FeedMetrics:
+    """Decode metrics of one `InputFeeder` source."""
+
+    __slots__ = ("decode", "frames", "fps", "_last", "_interval")
+
+    def __init__(self, registry, source):
+        self.decode = registry.histogram(
+            "pyvino_feed_decode_seconds", "Time spent reading a frame.", source=source
+        )
+        self.frames = registry.counter(
+            "pyvino_feed_frames_total", "Frames read from the source.", source=source
+        )
+        self.fps = registry.gauge(
+            "pyvino_feed_fps", "Smoothed rate frames are read at.", source=source
+        )
+        self._last = None
+        self._interval = None
+
+    def observe(self, start_ns, end_ns):
+        """Record a frame read between the `time.perf_counter_ns` values `start_ns`
+        and `end_ns`."""
+        start, end = start_ns / 1e9, end_ns / 1e9
+        self.decode.observe(end - start)
+        self.frames.inc()
+        if self._last is not None:
+            interval = end - self._last
+            # Exponential moving average over roughly the last 30 frames.
+            self._interval = (
+                interval
+                if self._interval is None
+                else self._interval + (interval - self._interval) / 30
+            )
+            if self._interval > 0:
+                self.fps.set(1 / self._interval)
+        self._last = end
+
+
+REGISTRY = MetricsRegistry()
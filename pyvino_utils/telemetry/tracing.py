@@ -0,0 +1,204 @@
+import collections
+import contextvars
+import json
+import os
+import threading
+import time
+
+from loguru import logger
+
+__all__ = ["TRACER", "Tracer", "merge_traces", "current_frame"]
+
+# (frame_id, capture_ns) of the frame being processed, contexts follow threads,
+# asyncio tasks and generators, so spans pick up the frame they belong to.
+_current_frame = contextvars.ContextVar("pyvino_frame", default=None)
+
+
+def current_frame():
+    """Get the (frame_id, capture_ns) of the frame being processed, or None."""
+    return _current_frame.get()
+
+
+class _NullContext:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL = _NullContext()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer.add(
+            self.name, self.start, time.perf_counter_ns(), self.cat, self.args
+        )
+        return False
+
+
+class _Frame:
+    __slots__ = ("tracer", "frame", "token")
+
+    def __init__(self, tracer, frame_id, capture_ns):
+        self.tracer = tracer
+        self.frame = (frame_id, capture_ns)
+
+    def __enter__(self):
+        self.token = _current_frame.set(self.frame)
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            _current_frame.reset(self.token)
+        except ValueError:
+            # Generators closed by the garbage collector exit in another context.
+            pass
+        frame_id, capture_ns = self.frame
+        self.tracer.add(
+            "frame", capture_ns, time.perf_counter_ns(), "frame", {"frame_id": frame_id}
+        )
+        return False
+
+
+class Tracer:
+    def __init__(self, max_events=1000000):
+        """
+        This class records spans of the pipeline stages, e.g. decode, preprocess,
+        infer and postprocess, and dumps them in the Chrome trace event format for
+        https://ui.perfetto.dev or chrome://tracing.
+
+        Tracing is off until `start` is called, a disabled tracer only costs an
+        attribute lookup per stage. Timestamps come from `time.perf_counter_ns`,
+        a monotonic clock shared by the processes of a host on Linux, so the dumps
+        of several processes can be combined with `merge_traces`.
+
+        Parameters
+        ----------
+        max_events: int
+            Number of most recent events kept.
+
+        Example
+        -------
+        ```
+            from pyvino_utils.telemetry.tracing import TRACER
+
+            TRACER.start()
+            for frame in feed.next_frame():
+                faces = face_detector.predict(frame)
+                with TRACER.span("draw"):
+                    face_detector.draw_output(faces, frame)
+            TRACER.dump("trace.json")
+        ```
+        """
+        self.enabled = False
+        self._events = collections.deque(maxlen=max_events)
+        self._threads = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        self.enabled = True
+        return self
+
+    def stop(self):
+        self.enabled = False
+
+    def clear(self):
+        self._events.clear()
+
+    def span(self, name, cat="pyvino", **args):
+        """Context manager recording the time spent in its block as `name`."""
+        if not self.enabled:
+            return _NULL
+        return _Span(self, name, cat, args)
+
+    def frame(self, frame_id, capture_ns):
+        """Context manager marking its block as the processing of a frame.
+
+        Spans recorded inside it carry the "frame_id", on exit a "frame" span from
+        the capture to now gives the capture to result latency. `InputFeeder`
+        opens one around each frame it yields, worker threads or processes open
+        their own with the id and capture time passed along with the frame.
+        """
+        if not self.enabled:
+            return _NULL
+        return _Frame(self, frame_id, capture_ns)
+
+    def add(self, name, start_ns, end_ns, cat="pyvino", args=None):
+        """Record a complete span from two `time.perf_counter_ns` values."""
+        if not self.enabled:
+            return
+        frame = _current_frame.get()
+        if frame is not None and cat != "frame":
+            args = {**args, "frame_id": frame[0]} if args else {"frame_id": frame[0]}
+        thread = threading.current_thread()
+        tid = thread.ident
+        if tid not in self._threads:
+            with self._lock:
+                self._threads[tid] = thread.name
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": start_ns / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        self._events.append(event)
+
+    def events(self):
+        """Get the recorded events, thread names first."""
+        pid = os.getpid()
+        with self._lock:
+            threads = dict(self._threads)
+        metadata = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in threads.items()
+        ]
+        return metadata + list(self._events)
+
+    def dump(self, path):
+        """Write the recorded events as a Chrome trace JSON file."""
+        events = self.events()
+        with open(path, "w") as trace:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace)
+        logger.info(f"Wrote {len(events)} trace events to {path}")
+        return path
+
+
+def merge_traces(paths, output):
+    """Combine the trace files dumped by several processes into `output`."""
+    events = []
+    for path in paths:
+        with open(path) as trace:
+            events.extend(json.load(trace)["traceEvents"])
+    with open(output, "w") as trace:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace)
+    return output
+
+
+TRACER = Tracer()
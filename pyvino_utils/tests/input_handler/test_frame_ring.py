@@ -0,0 +1,29 @@
+import unittest
+
+import numpy as np
+
+from pyvino_utils import SharedFrameRing
+
+
+class test_frame_ring(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.DUT = SharedFrameRing(shape=(4, 6, 3), slots=2)
+
+    def tearDown(self):
+        self.DUT.close()
+        self.DUT.unlink()
+
+    def test_put_get_release(self):
+        frame = np.arange(72, dtype=np.uint8).reshape(4, 6, 3)
+        seq = self.DUT.put(frame, meta="t0", readers=2)
+        ref = self.DUT.get(timeout=1)
+        self.assertEqual((ref.seq, ref.meta), (seq, "t0"))
+        np.testing.assert_array_equal(ref.frame, frame)
+        self.DUT.release(ref)
+        self.assertEqual(self.DUT.in_flight, 1)
+        self.DUT.release(ref.slot, ref.seq)
+        self.assertEqual(self.DUT.in_flight, 0)
+
+    def test_finish(self):
+        self.DUT.finish()
+        self.assertEqual(list(self.DUT), [])
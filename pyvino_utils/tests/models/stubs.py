@@ -0,0 +1,119 @@
+"""Stand-ins for the network objects of the Inference Engine, so that models can be
+tested on synthetic outputs without IR files."""
+import os
+import tempfile
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+from pyvino_utils.models.openvino_base import base_model
+
+
+class StubRequest:
+    """Infer request which runs the network function in a thread, using a busy
+    request raises."""
+
+    def __init__(self, exec_network):
+        self.exec_network = exec_network
+        self.outputs = {}
+        self.busy = False
+        self.count = 0
+        self._callback = None
+        self._thread = None
+
+    def _run(self, inputs):
+        try:
+            self.outputs = self.exec_network.run(inputs)
+            self.count += 1
+        finally:
+            self.busy = False
+        if self._callback is not None:
+            self._callback(0, self._callback_data)
+
+    def _claim(self):
+        if self.busy:
+            raise RuntimeError("The infer request is busy.")
+        self.busy = True
+
+    def infer(self, inputs=None):
+        self._claim()
+        self._run(inputs)
+
+    def async_infer(self, inputs=None):
+        self._claim()
+        self._thread = threading.Thread(target=self._run, args=(inputs,))
+        self._thread.start()
+
+    def wait(self, timeout=-1):
+        if self._thread is not None:
+            self._thread.join()
+        return 0
+
+    def set_completion_callback(self, callback, data=None):
+        self._callback, self._callback_data = callback, data
+
+    def get_perf_counts(self):
+        return {}
+
+
+class StubExecNetwork:
+    def __init__(self, network, config, num_requests):
+        self.fn = network.fn
+        self.config = config
+        self.shapes = {name: list(data.shape) for name, data in network.inputs.items()}
+        self.requests = [StubRequest(self) for _ in range(num_requests)]
+
+    def run(self, inputs):
+        for name, data in inputs.items():
+            if list(data.shape) != self.shapes[name]:
+                raise ValueError(f"{name}: {data.shape} does not match {self.shapes}")
+        return self.fn(inputs)
+
+    def start_async(self, request_id, inputs):
+        self.requests[request_id].async_infer(inputs)
+
+
+class StubNetwork:
+    """Network of `inputs` and `outputs` name to shape, `fn` maps an input dict to an
+    output dict."""
+
+    def __init__(self, inputs, outputs, fn):
+        self.inputs = {name: SimpleNamespace(shape=list(s)) for name, s in inputs.items()}
+        self.outputs = {
+            name: SimpleNamespace(shape=list(s)) for name, s in outputs.items()
+        }
+        self.fn = fn
+
+    def reshape(self, shapes):
+        for name, shape in shapes.items():
+            self.inputs[name].shape = list(shape)
+
+
+class StubCore:
+    def __init__(self, network):
+        self.network = network
+        self.loaded = []
+
+    def read_network(self, model, weights):
+        return self.network
+
+    def load_network(self, network, device_name, config=None, num_requests=1):
+        exec_network = StubExecNetwork(network, config, num_requests or 1)
+        self.loaded.append(exec_network)
+        return exec_network
+
+
+def stub_model(cls, network, **kwargs):
+    """Create a `cls` model running `network`, metrics and tuning profiles are off
+    unless given."""
+    kwargs.setdefault("metrics", None)
+    kwargs.setdefault("profile", False)
+    core = StubCore(network)
+    with tempfile.TemporaryDirectory() as directory:
+        model_name = os.path.join(directory, "model")
+        for extension in (".xml", ".bin"):
+            open(model_name + extension, "w").close()
+        with mock.patch.object(base_model, "IECore", lambda: core):
+            model = cls(model_name, **kwargs)
+    model.core = core
+    return model
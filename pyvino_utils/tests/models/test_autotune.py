@@ -0,0 +1,107 @@
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+try:
+    from pyvino_utils.models.openvino_base.autotune import (
+        AutoTuner,
+        _profile_key,
+        load_profile,
+        select_config,
+    )
+    from pyvino_utils.models.openvino_base.base_model import Base
+    from pyvino_utils.models.recognition.age_gender import AgeGender
+    from pyvino_utils.tests.models.stubs import StubNetwork, stub_model
+except ModuleNotFoundError:
+    AutoTuner = None
+
+
+def result(name, throughput, p99_ms):
+    return {
+        "name": name,
+        "config": {"CPU_THROUGHPUT_STREAMS": "1"},
+        "num_requests": 2,
+        "batch_size": 4,
+        "throughput": throughput,
+        "p99_ms": p99_ms,
+    }
+
+
+@unittest.skipIf(AutoTuner is None, "OpenVINO is not installed.")
+class test_autotune(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.DUT = AutoTuner
+        self.results = [
+            result("fast", 100, 5),
+            result("balanced", 200, 8),
+            result("wide", 300, 20),
+            # Beaten by "balanced" in both, and by "wide" in latency at equal
+            # throughput.
+            result("dominated", 150, 10),
+            result("slow wide", 300, 25),
+        ]
+        self.entry = {"results": self.DUT.pareto(self.results)}
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.model_structure = os.path.join(self.directory.name, "model.xml")
+        with open(self.model_structure, "w") as xml:
+            xml.write("<net/>")
+
+    def names(self, results):
+        return [result["name"] for result in results]
+
+    def write_profile(self, content, name="profile.json"):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as profile:
+            profile.write(content)
+        return path
+
+    def test_pareto(self):
+        self.assertEqual(self.names(self.entry["results"]), ["wide", "balanced", "fast"])
+
+    def test_select_config(self):
+        self.assertEqual(select_config(self.entry)["name"], "fast")
+        self.assertEqual(select_config(self.entry, "throughput")["name"], "wide")
+        with self.assertRaises(ValueError):
+            select_config(self.entry, "energy")
+
+    def test_max_latency_ms(self):
+        self.assertEqual(
+            [
+                select_config(self.entry, "latency", max_latency_ms)["name"]
+                for max_latency_ms in (4, 5, 10, 20, 100)
+            ],
+            # Nothing under 4 ms falls back to the lowest latency.
+            ["fast", "fast", "balanced", "wide", "wide"],
+        )
+
+    def test_tuned_config(self):
+        path = self.write_profile(
+            json.dumps({_profile_key(self.model_structure, "CPU"): self.entry})
+        )
+        model = SimpleNamespace(model_structure=self.model_structure, _device="CPU")
+        latency = Base._tuned_config(model, profile=path)
+        self.assertEqual(latency["name"], "fast")
+        self.assertNotIn("batch_size", latency)
+        throughput = Base._tuned_config(model, profile=path, objective="throughput")
+        self.assertEqual((throughput["name"], throughput["batch_size"]), ("wide", 4))
+        bounded = Base._tuned_config(model, profile=path, max_latency_ms=10)
+        self.assertEqual((bounded["name"], bounded["batch_size"]), ("balanced", 4))
+        self.assertEqual(Base._tuned_config(model, profile=False), {})
+
+    def test_corrupt_profile(self):
+        path = self.write_profile('{"model.xml": {"results": [')
+        self.assertIsNone(load_profile(self.model_structure, path=path))
+
+        network = StubNetwork(
+            {"data": [1, 3, 4, 4]},
+            {"age_conv3": [1, 1, 1, 1], "prob": [1, 2, 1, 1]},
+            lambda inputs: {},
+        )
+        # A corrupt profile or one which is not an object is ignored.
+        for name, content in (("truncated.json", '{"a": ['), ("list.json", "[]")):
+            path = self.write_profile(content, name)
+            model = stub_model(AgeGender, network, profile=path)
+            self.assertEqual(model.num_requests, 1)
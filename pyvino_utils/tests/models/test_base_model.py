@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+import unittest
+
+import numpy as np
+
+try:
+    from pyvino_utils.models.recognition.age_gender import AgeGender
+    from pyvino_utils.tests.models.stubs import StubNetwork, stub_model
+except ModuleNotFoundError:
+    AgeGender = None
+
+
+def unloaded_model(cls, input_shape):
+    """Get a model without reading and loading a network, enough to preprocess."""
+    model = cls.__new__(cls)
+    model.input_shape = list(input_shape)
+    model._batch_buffers = {}
+    return model
+
+
+@unittest.skipIf(AgeGender is None, "OpenVINO is not installed.")
+class test_base_model(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.DUT = unloaded_model(AgeGender, [1, 3, 4, 4])
+
+    def test_preprocess_input_float(self):
+        frame = np.full((8, 8, 3), 300.5, dtype=np.float64)
+        p_frame, _ = self.DUT.preprocess_input(frame)
+        self.assertEqual(p_frame.shape, (1, 3, 4, 4))
+        np.testing.assert_allclose(p_frame, 300.5)
+
+    def test_preprocess_images_float(self):
+        images = [
+            np.full((8, 8, 3), 0.25, dtype=np.float32),
+            np.full((8, 8, 3), 7, dtype=np.uint8),
+            np.full((8, 8), 300.0, dtype=np.float64),
+        ]
+        batch = self.DUT.preprocess_images(images)
+        np.testing.assert_allclose(batch[:, :, 0, 0], [[0.25] * 3, [7] * 3, [300] * 3])
+
+    def test_preprocess_crops_float(self):
+        image = np.arange(64, dtype=np.float32).reshape(8, 8, 1).repeat(3, axis=2) / 4
+        batch, crops = self.DUT.preprocess_crops(image, np.array([[0, 0, 4, 4]]), 2)
+        self.assertEqual(batch.shape, (2, 3, 4, 4))
+        np.testing.assert_allclose(batch[0].transpose((1, 2, 0)), crops[0])
+
+
+def age_gender_network():
+    """The age of a crop is its mean pixel value, its gender whether that is odd."""
+
+    def fn(inputs):
+        means = inputs["data"].mean(axis=(1, 2, 3))
+        genders = np.stack((means % 2 == 0, means % 2 == 1), axis=1)
+        return {
+            "age_conv3": (means / 100).reshape(-1, 1, 1, 1),
+            "prob": genders.reshape(-1, 2, 1, 1).astype(np.float32),
+        }
+
+    return StubNetwork(
+        {"data": [1, 3, 4, 4]}, {"age_conv3": [1, 1, 1, 1], "prob": [1, 2, 1, 1]}, fn
+    )
+
+
+@unittest.skipIf(AgeGender is None, "OpenVINO is not installed.")
+class test_predict_crops(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.DUT = stub_model(AgeGender, age_gender_network(), max_batch_size=4)
+        # Crop i is filled with the value i.
+        self.image = np.zeros((8, 64, 3), dtype=np.uint8)
+        self.boxes = np.array([[8 * i, 0, 8 * i + 8, 8] for i in range(7)])
+        for i, (xmin, _, xmax, _) in enumerate(self.boxes):
+            self.image[:, xmin:xmax] = i
+
+    def test_batch_size_for(self):
+        self.assertEqual(
+            [self.DUT._batch_size_for(n) for n in range(1, 7)], [1, 2, 4, 4, 4, 4]
+        )
+
+    def test_crop_order(self):
+        # 7 crops run as a batch of 4 and a partial batch of 3 padded to 4.
+        results = self.DUT.predict_crops(self.image, self.boxes)
+        self.assertEqual([result["age"] for result in results], list(range(7)))
+        self.assertEqual(
+            [result["gender"] for result in results],
+            ["Female", "Male"] * 3 + ["Female"],
+        )
+
+    def test_partial_batch(self):
+        results = self.DUT.predict_crops(self.image, self.boxes[[6, 2, 5]])
+        self.assertEqual([result["age"] for result in results], [6, 2, 5])
+        self.assertEqual(self.DUT.predict_crops(self.image, self.boxes[:0]), [])
+
+    def test_exec_network_cache(self):
+        self.DUT.predict_crops(self.image, self.boxes[:1])
+        self.assertEqual(len(self.DUT.core.loaded), 1)
+        for count in (7, 3, 2, 4):
+            self.DUT.predict_crops(self.image, self.boxes[:count])
+        # One network per batch size, loaded once: 1 (main), 2 and 4.
+        self.assertEqual(len(self.DUT.core.loaded), 3)
+        self.assertEqual(sorted(self.DUT._exec_networks), [(2, 3, 4, 4), (4, 3, 4, 4)])
+        self.assertEqual(self.DUT.model.inputs["data"].shape, [1, 3, 4, 4])
+
+
+@unittest.skipIf(AgeGender is None, "OpenVINO is not installed.")
+class test_apredict(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        network = age_gender_network()
+        fn, self.running, self.max_running = network.fn, 0, 0
+        lock = threading.Lock()
+
+        def slow_fn(inputs):
+            with lock:
+                self.running += 1
+                self.max_running = max(self.max_running, self.running)
+            time.sleep(0.02)
+            with lock:
+                self.running -= 1
+            return fn(inputs)
+
+        network.fn = slow_fn
+        self.DUT = stub_model(AgeGender, network, num_requests=2)
+        self.images = [np.full((8, 8, 3), i, dtype=np.uint8) for i in range(6)]
+
+    def test_concurrent_apredict(self):
+        async def run():
+            return await asyncio.gather(*map(self.DUT.apredict, self.images))
+
+        # A request used twice at once raises "The infer request is busy."
+        results = asyncio.run(run())
+        requests = self.DUT.exec_network.requests
+        self.assertEqual(self.max_running, 2)
+        self.assertEqual(sum(request.count for request in requests), 6)
+        self.assertTrue(all(request.count for request in requests))
+        for image, result in zip(self.images, results):
+            expected = self.DUT.predict(image)["process_output"]
+            self.assertEqual(result["process_output"].to_dict(), expected.to_dict())
+        self.assertEqual(
+            [result["process_output"]["age"] for result in results], list(range(6))
+        )
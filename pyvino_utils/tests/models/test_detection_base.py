@@ -0,0 +1,97 @@
+import unittest
+
+import numpy as np
+
+try:
+    from pyvino_utils.models.detection.face_detection import FaceDetection
+    from pyvino_utils.models.openvino_base.detection_base import DetectionBase
+    from pyvino_utils.tests.models.stubs import StubNetwork, stub_model
+except ModuleNotFoundError:
+    DetectionBase = None
+
+
+@unittest.skipIf(DetectionBase is None, "OpenVINO is not installed.")
+class test_detection_base(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.DUT = DetectionBase
+        # Two 100x100 tiles of a 100x180 frame overlapping on x in [80, 100].
+        self.left, self.right = [0, 0, 100, 100], [80, 0, 180, 100]
+
+    @staticmethod
+    def detections(*boxes):
+        """(N, 7) detections of one label with decreasing scores."""
+        return np.array(
+            [[*box, 0.9 - 0.1 * idx, 1, 0] for idx, box in enumerate(boxes)],
+            dtype=np.float32,
+        )
+
+    def test_nested_boxes_in_one_tile(self):
+        detections = self.detections([10, 10, 70, 90], [30, 40, 50, 60])
+        tiles = np.array([self.left, self.left])
+        keep = self.DUT.merge_tile_detections(detections, tiles, (100, 180))
+        self.assertEqual(keep.tolist(), [0, 1])
+
+    def test_seam_duplicates(self):
+        # The object is whole in the right tile and cut at x=100 in the left one.
+        detections = self.detections([85, 20, 130, 60], [85, 20, 100, 60])
+        tiles = np.array([self.right, self.left])
+        keep = self.DUT.merge_tile_detections(detections, tiles, (100, 180))
+        self.assertEqual(keep.tolist(), [0])
+
+    def test_whole_duplicates(self):
+        # Seen whole by both tiles, merged by intersection over union.
+        detections = self.detections([84, 20, 96, 60], [85, 21, 96, 60])
+        tiles = np.array([self.left, self.right])
+        keep = self.DUT.merge_tile_detections(detections, tiles, (100, 180))
+        self.assertEqual(keep.tolist(), [0])
+
+
+@unittest.skipIf(DetectionBase is None, "OpenVINO is not installed.")
+class test_native_aspect(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.input_shapes = []
+
+        def fn(inputs):
+            self.input_shapes.append(inputs["data"].shape)
+            # One face in the middle of the upper half of the input.
+            detection = [[[[0, 1, 0.9, 0.25, 0.25, 0.75, 0.5]]]]
+            return {"detection_out": np.array(detection, dtype=np.float32)}
+
+        network = StubNetwork(
+            {"data": [1, 3, 64, 64]}, {"detection_out": [1, 1, 1, 7]}, fn
+        )
+        self.DUT = stub_model(
+            FaceDetection, network, native_aspect=True, size_multiple=16
+        )
+
+    def test_native_input_size(self):
+        for image_shape, size in (
+            # 4096 pixels at 16:9 are 48x85, rounded to 48x80.
+            ((90, 160, 3), (48, 80)),
+            ((720, 1280, 3), (48, 80)),
+            ((160, 90, 3), (80, 48)),
+            ((64, 64, 3), (64, 64)),
+            # Sizes never round down to 0.
+            ((10, 1000, 3), (16, 640)),
+        ):
+            with self.subTest(image_shape=image_shape):
+                self.assertEqual(self.DUT.native_input_size(image_shape), size)
+        self.DUT.pixel_budget = 128 * 128
+        self.DUT._native_sizes.clear()
+        self.assertEqual(self.DUT.native_input_size((90, 160)), (96, 176))
+
+    def test_predict(self):
+        for image_shape, box in (
+            ((90, 160, 3), [40, 22, 120, 45]),
+            ((720, 1280, 3), [320, 180, 960, 360]),
+            ((160, 90, 3), [22, 40, 67, 80]),
+        ):
+            with self.subTest(image_shape=image_shape):
+                results = self.DUT.predict(np.zeros(image_shape, dtype=np.uint8))
+                self.assertEqual(
+                    self.input_shapes[-1][2:], self.DUT.native_input_size(image_shape)
+                )
+                detections = results["process_output"]
+                self.assertEqual(detections["bbox_coord"].tolist(), [box])
+        # The frames of one aspect ratio share a reshaped network.
+        self.assertEqual(len(self.DUT._exec_networks), 2)
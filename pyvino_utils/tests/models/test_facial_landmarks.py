@@ -0,0 +1,44 @@
+import gc
+import unittest
+
+import numpy as np
+
+try:
+    from pyvino_utils.models.recognition.facial_landmarks import FacialLandmarks
+except ModuleNotFoundError:
+    FacialLandmarks = None
+
+
+@unittest.skipIf(FacialLandmarks is None, "OpenVINO is not installed.")
+class test_facial_landmarks(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        # Decoding needs no network, so skip loading one.
+        self.DUT = FacialLandmarks.__new__(FacialLandmarks)
+        self.DUT._model_type = "landmarks-regression-retail"
+        self.DUT.keep_images = False
+        self.frame = np.random.randint(0, 255, (120, 160, 3), dtype=np.uint8)
+        # Normalised (x, y) of the eyes, nose and mouth corners.
+        self.output = np.array(
+            [[0.25, 0.25, 0.75, 0.25, 0.5, 0.5, 0.25, 0.75, 0.75, 0.75]],
+            dtype=np.float32,
+        )
+
+    def test_crop_to_eye_images(self):
+        # The face crop is a temporary view, gone once the call returns.
+        results = self.DUT.preprocess_output([self.output], self.frame[20:100, 40:120])
+        gc.collect()
+        np.testing.assert_array_equal(results["image"], self.frame[20:100, 40:120])
+        np.testing.assert_array_equal(results["eye_boxes"][0], [10, 10, 30, 30])
+
+        eyes = results["face_landmarks"]["eyes_coords"]
+        self.assertEqual(eyes["left_eye_point"], (20, 20))
+        np.testing.assert_array_equal(eyes["left_eye_image"], self.frame[30:50, 50:70])
+        np.testing.assert_array_equal(eyes["right_eye_image"], self.frame[30:50, 90:110])
+
+    def test_frame_dropped(self):
+        results = self.DUT.preprocess_output([self.output], self.frame[20:100, 40:120])
+        del self.frame
+        gc.collect()
+        self.assertIsNone(results["image"])
+        with self.assertRaises(ReferenceError):
+            results["face_landmarks"]["eyes_coords"]
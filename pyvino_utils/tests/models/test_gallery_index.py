@@ -0,0 +1,132 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+try:
+    from pyvino_utils.models.recognition.gallery_index import GalleryIndex
+except ModuleNotFoundError:
+    GalleryIndex = None
+
+
+@unittest.skipIf(GalleryIndex is None, "OpenVINO is not installed.")
+class test_gallery_index(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.embeddings = rng.normal(size=(50, 8)).astype(np.float32)
+        self.ids = np.arange(50) // 2  # Two embeddings per identity
+        # Small capacity and blocks to grow the gallery and merge several blocks.
+        self.DUT = GalleryIndex(dim=8, capacity=4, block_size=16)
+        self.DUT.add(self.ids, self.embeddings)
+
+    def brute_force(self, queries, k):
+        vectors = self.embeddings / np.linalg.norm(self.embeddings, axis=1)[:, None]
+        queries = queries / np.linalg.norm(queries, axis=1)[:, None]
+        scores = queries @ vectors.T
+        order = np.argsort(-scores, axis=1)[:, :k]
+        return self.ids[order], np.take_along_axis(scores, order, axis=1)
+
+    def test_add(self):
+        self.assertEqual(len(self.DUT), 50)
+        np.testing.assert_array_equal(self.DUT.ids, self.ids)
+        np.testing.assert_allclose(np.linalg.norm(self.DUT.vectors, axis=1), 1, 1e-5)
+        with self.assertRaises(ValueError):
+            self.DUT.add([-1], self.embeddings[:1])
+
+    def test_search(self):
+        ids, scores = self.DUT.search(self.embeddings[:5], k=3)
+        expected_ids, expected_scores = self.brute_force(self.embeddings[:5], 3)
+        np.testing.assert_array_equal(ids, expected_ids)
+        np.testing.assert_allclose(scores, expected_scores, atol=1e-5)
+        np.testing.assert_array_equal(ids[:, 0], self.ids[:5])
+
+    def test_fewer_than_k(self):
+        gallery = GalleryIndex(dim=8)
+        gallery.add([7], self.embeddings[:1])
+        ids, scores = gallery.search(self.embeddings[:2], k=3)
+        np.testing.assert_array_equal(ids, [[7, -1, -1], [7, -1, -1]])
+        self.assertTrue(np.isneginf(scores[:, 1:]).all())
+
+    def test_remove(self):
+        self.assertEqual(self.DUT.remove([0, 3]), 4)
+        self.assertEqual(len(self.DUT), 46)
+        self.assertFalse(np.isin(self.DUT.ids, [0, 3]).any())
+        ids, _ = self.DUT.search(self.embeddings[:2], k=46)
+        self.assertFalse(np.isin(ids, [0, 3]).any())
+        # Moved rows keep their embeddings.
+        ids, scores = self.DUT.search(self.embeddings[49:], k=1)
+        self.assertEqual(ids[0, 0], self.ids[49])
+        self.assertAlmostEqual(scores[0, 0], 1, places=5)
+
+    def test_ivf(self):
+        self.DUT.train(n_lists=4)
+        self.assertTrue(self.DUT.is_trained)
+        # Probing every partition is an exhaustive search.
+        ids, scores = self.DUT.search(self.embeddings[:5], k=3, n_probe=4)
+        np.testing.assert_array_equal(ids, self.brute_force(self.embeddings[:5], 3)[0])
+        # A query is always in its nearest partition.
+        ids, _ = self.DUT.search(self.embeddings[:5], k=1, n_probe=1)
+        np.testing.assert_array_equal(ids[:, 0], self.ids[:5])
+        with self.assertRaises(ValueError):
+            GalleryIndex(dim=8).train()
+
+    def test_ivf_layout(self):
+        self.DUT.train(n_lists=4)
+        lists = self.DUT._lists[: len(self.DUT)]
+        # The partitions are contiguous and sorted, the offsets bound them.
+        self.assertTrue(np.all(np.diff(lists) >= 0))
+        np.testing.assert_array_equal(
+            self.DUT._offsets, np.searchsorted(lists, np.arange(5))
+        )
+        # A single probe only scores the rows of the nearest partition.
+        queries = self.embeddings[:5] + 0.1
+        ids, scores = self.DUT.search(queries, k=3, n_probe=1)
+        nearest = self.DUT._assign(queries / np.linalg.norm(queries, axis=1)[:, None])
+        for query, lst, query_ids, query_scores in zip(queries, nearest, ids, scores):
+            begin, end = self.DUT._offsets[lst : lst + 2]
+            members = self.DUT.vectors[begin:end]
+            expected = np.sort(members @ query / np.linalg.norm(query))[::-1][:3]
+            np.testing.assert_allclose(query_scores[: len(expected)], expected, atol=1e-5)
+            self.assertTrue(
+                np.isin(query_ids[query_ids != -1], self.DUT.ids[begin:end]).all()
+            )
+
+    def test_ivf_add_remove(self):
+        self.DUT.train(n_lists=4)
+        rng = np.random.default_rng(1)
+        added = rng.normal(size=(30, 8)).astype(np.float32)
+        # A few rows wait unsorted behind the partitions, more are sorted in.
+        self.DUT.add(np.arange(100, 105), added[:5])
+        self.assertEqual(self.DUT._offsets[-1], 50)
+        ids, _ = self.DUT.search(added[:5], k=1, n_probe=4)
+        np.testing.assert_array_equal(ids[:, 0], np.arange(100, 105))
+        self.DUT.add(np.arange(105, 130), added[5:])
+        self.assertEqual(self.DUT._offsets[-1], 80)
+        self.embeddings = np.vstack((self.embeddings, added))
+        self.ids = np.concatenate((self.ids, np.arange(100, 130)))
+        self.assertEqual(len(self.DUT), 80)
+        # Probing every partition is still an exhaustive search.
+        ids, _ = self.DUT.search(added[:5], k=3, n_probe=4)
+        np.testing.assert_array_equal(ids, self.brute_force(added[:5], 3)[0])
+
+        self.DUT.remove(np.arange(100, 110))
+        keep = ~np.isin(self.ids, np.arange(100, 110))
+        self.embeddings, self.ids = self.embeddings[keep], self.ids[keep]
+        self.assertTrue(np.all(np.diff(self.DUT._lists[: len(self.DUT)]) >= 0))
+        ids, _ = self.DUT.search(added[10:15], k=3, n_probe=4)
+        np.testing.assert_array_equal(ids, self.brute_force(added[10:15], 3)[0])
+
+    def test_storage(self):
+        with tempfile.TemporaryDirectory() as storage:
+            gallery = GalleryIndex(dim=8, capacity=4, storage=storage)
+            gallery.add(self.ids, self.embeddings)
+            gallery.train(n_lists=4)
+            gallery.flush()
+            del gallery
+
+            reopened = GalleryIndex(dim=8, storage=storage)
+            self.assertEqual(len(reopened), 50)
+            self.assertTrue(reopened.is_trained)
+            ids, _ = reopened.search(self.embeddings[:5], k=1, n_probe=1)
+            np.testing.assert_array_equal(ids[:, 0], self.ids[:5])
+            del reopened
@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+
+try:
+    from pyvino_utils.models.recognition.gaze_estimation import GazeEstimation
+    from pyvino_utils.tests.models.stubs import StubNetwork, stub_model
+except ModuleNotFoundError:
+    GazeEstimation = None
+
+
+def gaze_network():
+    """The gaze of a face is the mean of its left and right eye and the sum of its
+    head pose angles."""
+
+    def fn(inputs):
+        return {
+            "gaze_vector": np.stack(
+                (
+                    inputs["left_eye_image"].mean(axis=(1, 2, 3)),
+                    inputs["right_eye_image"].mean(axis=(1, 2, 3)),
+                    inputs["head_pose_angles"].sum(axis=1),
+                ),
+                axis=1,
+            )
+        }
+
+    return StubNetwork(
+        {
+            "head_pose_angles": [1, 3],
+            "left_eye_image": [1, 3, 6, 6],
+            "right_eye_image": [1, 3, 6, 6],
+        },
+        {"gaze_vector": [1, 3]},
+        fn,
+    )
+
+
+@unittest.skipIf(GazeEstimation is None, "OpenVINO is not installed.")
+class test_gaze_estimation(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.DUT = stub_model(GazeEstimation, gaze_network(), max_batch_size=4)
+        self.left = [np.full((10, 12, 3), i, dtype=np.uint8) for i in range(5)]
+        self.right = [np.full((10, 12, 3), 10 + i, dtype=np.uint8) for i in range(5)]
+        self.angles = np.arange(15, dtype=np.float32).reshape(5, 3)
+
+    def test_preprocess_gaze_input(self):
+        angles = [dict(zip(("yaw", "pitch", "roll"), row)) for row in self.angles[:3]]
+        # Empty, grey and float eye crops are packed as well.
+        left = [self.left[0], np.full((4, 4), 7, dtype=np.uint8), self.left[2]]
+        right = [np.zeros((0, 5, 3), dtype=np.uint8), self.right[1], self.right[2] / 2]
+        inputs = self.DUT.preprocess_gaze_input(left, right, angles, batch_size=4)
+        self.assertEqual(inputs["left_eye_image"].shape, (4, 3, 6, 6))
+        self.assertEqual(inputs["head_pose_angles"].shape, (4, 3))
+        np.testing.assert_array_equal(
+            inputs["left_eye_image"][:3, :, 0, 0], [[0] * 3, [7] * 3, [2] * 3]
+        )
+        np.testing.assert_array_equal(
+            inputs["right_eye_image"][:3, :, 0, 0], [[0] * 3, [11] * 3, [6] * 3]
+        )
+        np.testing.assert_array_equal(inputs["head_pose_angles"][:3], self.angles[:3])
+
+    def test_predict_gazes(self):
+        # A batch of 4 and a partial batch of 1.
+        gaze_vectors = self.DUT.predict_gazes(self.left, self.right, self.angles)
+        self.assertEqual(gaze_vectors.shape, (5, 3))
+        np.testing.assert_allclose(
+            gaze_vectors,
+            np.stack((np.arange(5), 10 + np.arange(5), self.angles.sum(axis=1)), axis=1),
+        )
+        self.assertEqual(self.DUT.predict_gazes([], [], np.empty((0, 3))).shape, (0, 3))
+
+    def test_predict(self):
+        eyes_coords = {"left_eye_image": self.left[3], "right_eye_image": self.right[3]}
+        _, gaze_vector = self.DUT.predict(
+            None,
+            eyes_coords=eyes_coords,
+            head_pose_angles={"yaw": 1.0, "pitch": 2.0, "roll": 3.0},
+        )
+        self.assertEqual(gaze_vector, {"x": 3.0, "y": 13.0, "z": 6.0})
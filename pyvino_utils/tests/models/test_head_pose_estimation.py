@@ -0,0 +1,86 @@
+import unittest
+
+import numpy as np
+
+try:
+    from pyvino_utils.models.pose_estimations.head_pose_estimation import (
+        HeadPoseEstimation,
+    )
+    from pyvino_utils.tests.models.stubs import StubNetwork, stub_model
+except ModuleNotFoundError:
+    HeadPoseEstimation = None
+
+
+def rotation_matrix(yaw, pitch, roll):
+    """Rx(pitch) @ Ry(-yaw) @ Rz(roll) of one face."""
+    yaw, pitch, roll = np.radians([-yaw, pitch, roll])
+    rx = np.array(
+        [
+            [1, 0, 0],
+            [0, np.cos(pitch), -np.sin(pitch)],
+            [0, np.sin(pitch), np.cos(pitch)],
+        ]
+    )
+    ry = np.array(
+        [[np.cos(yaw), 0, np.sin(yaw)], [0, 1, 0], [-np.sin(yaw), 0, np.cos(yaw)]]
+    )
+    rz = np.array(
+        [[np.cos(roll), -np.sin(roll), 0], [np.sin(roll), np.cos(roll), 0], [0, 0, 1]]
+    )
+    return rx @ ry @ rz
+
+
+def head_pose_network():
+    """The yaw of a face is its mean pixel value, the pitch its half and the roll 0."""
+
+    def fn(inputs):
+        means = inputs["data"].mean(axis=(1, 2, 3)).reshape(-1, 1)
+        return {
+            "angle_p_fc": means / 2,
+            "angle_r_fc": np.zeros_like(means),
+            "angle_y_fc": means,
+        }
+
+    return StubNetwork(
+        {"data": [1, 3, 4, 4]},
+        {"angle_y_fc": [1, 1], "angle_p_fc": [1, 1], "angle_r_fc": [1, 1]},
+        fn,
+    )
+
+
+@unittest.skipIf(HeadPoseEstimation is None, "OpenVINO is not installed.")
+class test_head_pose_estimation(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.DUT = HeadPoseEstimation
+        self.angles = np.array([[0, 0, 0], [30, -10, 5], [-45, 20, 90], [170, 80, -60]])
+
+    def test_rotation_matrices(self):
+        matrices = self.DUT.rotation_matrices(self.angles)
+        self.assertEqual(matrices.shape, (4, 3, 3))
+        np.testing.assert_allclose(
+            matrices @ matrices.transpose(0, 2, 1),
+            np.eye(3)[None].repeat(4, 0),
+            atol=1e-5,
+        )
+        np.testing.assert_allclose(np.linalg.det(matrices), 1, atol=1e-5)
+        for angles, matrix in zip(self.angles, matrices):
+            np.testing.assert_allclose(matrix, rotation_matrix(*angles), atol=1e-5)
+
+    def test_draw_axes(self):
+        image = np.zeros((100, 200, 3), dtype=np.uint8)
+        matrices = self.DUT.rotation_matrices(self.angles[:2])
+        self.DUT.draw_axes(image, matrices, [[50, 50], [150, 50]], axis_size=20)
+        # The x axis of the first face points right, in red.
+        np.testing.assert_array_equal(image[50, 60], [0, 0, 255])
+        for xmin, xmax in ((0, 100), (100, 200)):
+            self.assertTrue(image[:, xmin:xmax].any())
+
+    def test_predict_poses(self):
+        model = stub_model(HeadPoseEstimation, head_pose_network(), max_batch_size=2)
+        image = np.zeros((10, 30, 3), dtype=np.uint8)
+        for i in range(3):
+            image[:, 10 * i : 10 * i + 10] = 10 * i
+        boxes = [[10 * i, 0, 10 * i + 10, 10] for i in range(3)]
+        angles, matrices = model.predict_poses(image, boxes, show_bbox=True)
+        np.testing.assert_allclose(angles, [[0, 0, 0], [10, 5, 0], [20, 10, 0]])
+        np.testing.assert_allclose(matrices, self.DUT.rotation_matrices(angles))
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+
+try:
+    from pyvino_utils.models.pose_estimations.human_pose_estimation import (
+        LIMB_KEYPOINT_IDS,
+        HumanPoseEstimation,
+    )
+except ModuleNotFoundError:
+    HumanPoseEstimation = None
+
+
+@unittest.skipIf(HumanPoseEstimation is None, "OpenVINO is not installed.")
+class test_human_pose_estimation(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.DUT = HumanPoseEstimation
+
+    def test_find_keypoints(self):
+        heatmaps = np.zeros((8, 8, 2), dtype=np.float32)
+        heatmaps[1:4, 2:5, 0] = 0.5
+        heatmaps[2, 3, 0] = 0.9
+        # A plateau is a single peak.
+        heatmaps[5, 5:7, 1] = 0.7
+        # Below the threshold.
+        heatmaps[6, 1, 1] = 0.05
+        keypoints, keypoint_ids = self.DUT.find_keypoints(heatmaps, threshold=0.1)
+        np.testing.assert_allclose(keypoints, [[3, 2, 0.9], [5, 5, 0.7]])
+        self.assertEqual(keypoint_ids.tolist(), [0, 1])
+
+    def test_group_keypoints(self):
+        # neck, r_shoulder, l_shoulder, r_elbow of one person, neck and r_shoulder
+        # of another and r_ear, r_eye of a partial skeleton merged into the first.
+        keypoint_ids = np.array([1, 2, 5, 3, 1, 2, 0, 0, 16, 14])
+        keypoints = np.stack(
+            (np.arange(10), np.arange(10) + 100, np.full(10, 0.5)), axis=1
+        ).astype(np.float32)
+        connections = [np.empty((0, 3), dtype=np.float32)] * len(LIMB_KEYPOINT_IDS)
+        connections[0] = np.array([[0, 1, 1], [4, 5, 1]], dtype=np.float32)
+        connections[1] = np.array([[0, 2, 1]], dtype=np.float32)
+        connections[2] = np.array([[1, 3, 1]], dtype=np.float32)
+        connections[14] = np.array([[9, 8, 1]], dtype=np.float32)
+        connections[17] = np.array([[1, 8, 1]], dtype=np.float32)
+
+        poses = self.DUT.group_keypoints(keypoints, keypoint_ids, connections)
+        self.assertEqual(poses.shape, (1, 18, 3))
+        found = {kpt: int(poses[0, kpt, 0]) for kpt in np.flatnonzero(poses[0, :, 2])}
+        self.assertEqual(found, {1: 0, 2: 1, 3: 3, 5: 2, 14: 9, 16: 8})
+
+    def test_no_people(self):
+        connections = [np.empty((0, 3), dtype=np.float32)] * len(LIMB_KEYPOINT_IDS)
+        poses = self.DUT.group_keypoints(
+            np.empty((0, 3), dtype=np.float32), np.empty(0, dtype=int), connections
+        )
+        self.assertEqual(poses.shape, (0, 18, 3))
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+try:
+    from pyvino_utils.models.openvino_base.faults import InvalidModel
+    from pyvino_utils.models.openvino_base.quantization import (
+        _int8_dir,
+        precision_path,
+        sample_calibration_frames,
+    )
+except ModuleNotFoundError:
+    precision_path = None
+
+
+@unittest.skipIf(precision_path is None, "OpenVINO is not installed.")
+class test_quantization(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.DUT = precision_path
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.root = self.directory.name
+
+    def add_ir(self, *parts):
+        path = os.path.join(self.root, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(f"{path}.xml", "w").close()
+        return path
+
+    def test_precision_path(self):
+        model_name = self.add_ir("FP16", "model")
+        fp32 = self.add_ir("FP32", "model")
+        self.assertEqual(self.DUT(model_name, "fp32"), fp32)
+        with self.assertRaises(InvalidModel):
+            self.DUT(model_name, "INT8")
+        fp32_int8 = self.add_ir("FP32-INT8", "model")
+        self.assertEqual(self.DUT(model_name, "INT8"), fp32_int8)
+        # The FP16 based INT8 IR comes first.
+        fp16_int8 = self.add_ir("FP16-INT8", "model")
+        self.assertEqual(self.DUT(model_name, "int8"), fp16_int8)
+        self.assertEqual(self.DUT(fp32_int8, "FP32-INT8"), fp32_int8)
+
+    def test_int8_dir_round_trip(self):
+        for folders, int8_folder in (
+            (("FP16",), "FP16-INT8"),
+            (("FP32",), "FP32-INT8"),
+            (("other",), os.path.join("other", "INT8")),
+        ):
+            with self.subTest(folders=folders):
+                model_name = self.add_ir(*folders, "model")
+                output_dir = _int8_dir(model_name)
+                self.assertEqual(output_dir, os.path.join(self.root, int8_folder))
+                int8 = self.add_ir(output_dir, "model")
+                self.assertEqual(self.DUT(model_name, "INT8"), int8)
+                os.remove(f"{int8}.xml")
+
+    def test_sample_calibration_frames(self):
+        # Frame i of the video is filled with 2 * i.
+        video = os.path.join(self.root, "video.avi")
+        writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*"MJPG"), 25, (32, 32))
+        for idx in range(100):
+            writer.write(np.full((32, 32, 3), 2 * idx, dtype=np.uint8))
+        writer.release()
+
+        calibration, held_out = sample_calibration_frames(video, count=20, holdout=5)
+        self.assertEqual((len(calibration), len(held_out)), (20, 5))
+        calibration_ids, held_out_ids = (
+            [int(round(frame.mean() / 2)) for frame in frames]
+            for frames in (calibration, held_out)
+        )
+        self.assertFalse(set(calibration_ids) & set(held_out_ids))
+        # Both sets span the video, not only its start.
+        for ids in (calibration_ids, held_out_ids):
+            self.assertEqual(ids, sorted(ids))
+            self.assertLess(ids[0], 20)
+            self.assertGreater(ids[-1], 80)
@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+
+try:
+    from pyvino_utils.models.recognition.reidentification import Reidentification
+    from pyvino_utils.telemetry.metrics import MetricsRegistry
+    from pyvino_utils.tests.models.stubs import StubNetwork, stub_model
+except ModuleNotFoundError:
+    Reidentification = None
+
+
+def reidentification_network():
+    """The embedding of a crop is (mean pixel value, 1)."""
+
+    def fn(inputs):
+        means = inputs["data"].mean(axis=(1, 2, 3)).reshape(-1, 1)
+        return {"embedding": np.hstack((means, np.ones_like(means)))}
+
+    return StubNetwork({"data": [1, 3, 4, 4]}, {"embedding": [1, 2]}, fn)
+
+
+@unittest.skipIf(Reidentification is None, "OpenVINO is not installed.")
+class test_reidentification(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.DUT = stub_model(
+            Reidentification,
+            reidentification_network(),
+            max_batch_size=2,
+            metrics=MetricsRegistry(),
+        )
+
+    def test_embed(self):
+        image = np.zeros((10, 30, 3), dtype=np.uint8)
+        for i in range(3):
+            image[:, 10 * i : 10 * i + 10] = i
+        boxes = [[10 * i, 0, 10 * i + 10, 10] for i in range(3)]
+        embeddings = self.DUT.embed(image, boxes)
+        expected = np.array([[0, 1], [1, 1], [2, 1]], dtype=np.float32)
+        np.testing.assert_allclose(
+            embeddings, expected / np.linalg.norm(expected, axis=1, keepdims=True)
+        )
+        self.assertEqual(self.DUT.embed(image, []).shape, (0, 2))
+
+    def test_embed_records_stages(self):
+        image = np.zeros((10, 30, 3), dtype=np.uint8)
+        boxes = [[10 * i, 0, 10 * i + 10, 10] for i in range(3)]
+        self.DUT.embed(image, boxes)
+        # One frame and one stage sample per batch of crops.
+        self.assertEqual(self.DUT.metrics.frames.value, 1)
+        self.assertEqual(self.DUT.metrics.infer.count, 2)
+        self.assertEqual(self.DUT.metrics.requests_in_use.value, 0)
@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+
+try:
+    from pyvino_utils.models.openvino_base.results import (
+        Detections,
+        HeadPoseResult,
+        PredictResult,
+    )
+except ModuleNotFoundError:
+    Detections = None
+
+
+@unittest.skipIf(Detections is None, "OpenVINO is not installed.")
+class test_results(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.DUT = Detections(
+            bbox_coord=np.array([[0, 0, 10, 10], [5, 5, 20, 20]], dtype=np.int32),
+            confidences=np.array([0.9, 0.8], dtype=np.float32),
+            labels=np.array([1, 2], dtype=np.int32),
+        )
+
+    def test_object_fields(self):
+        count, columns = self.DUT.to_columns()
+        self.assertEqual(count, 2)
+        self.assertEqual(sorted(columns), ["bbox_coord", "confidences", "labels"])
+        self.assertEqual(columns["bbox_coord"], [[0, 0, 10, 10], [5, 5, 20, 20]])
+        np.testing.assert_array_equal(columns["labels"], [1, 2])
+
+    def test_scalar_and_dict_fields(self):
+        result = HeadPoseResult(
+            head_pose_angles={"yaw": 1.0, "pitch": 2.0, "roll": 3.0},
+            rotation_matrix=np.eye(2),
+        )
+        count, columns = result.to_columns()
+        self.assertEqual(count, 1)
+        self.assertEqual(columns["head_pose_angles.yaw"], [1.0])
+        self.assertEqual(columns["rotation_matrix"], [[1.0, 0.0, 0.0, 1.0]])
+
+    def test_predict_result(self):
+        result = PredictResult(predict_end_time=4.2, process_output=self.DUT)
+        count, columns = result.to_columns()
+        self.assertEqual(count, 2)
+        self.assertEqual(columns["predict_time_ms"], [4.2, 4.2])
+
+    def test_empty(self):
+        empty = Detections(
+            bbox_coord=np.empty((0, 4), dtype=np.int32),
+            confidences=np.empty(0, dtype=np.float32),
+            labels=np.empty(0, dtype=np.int32),
+        )
+        self.assertEqual(empty.to_columns(), (0, {}))
+
+    def test_image_left_out(self):
+        image = np.zeros((2, 2, 3), dtype=np.uint8)
+        fields = {name: self.DUT[name] for name in Detections._object_fields}
+        result = Detections(image=image, keep_image=True, **fields)
+        self.assertIs(result["image"], image)
+        self.assertNotIn("image", result.to_columns()[1])
+
+    def test_empty_row(self):
+        empty = Detections(
+            bbox_coord=np.empty((0, 4), dtype=np.int32),
+            confidences=np.empty(0, dtype=np.float32),
+            labels=np.empty(0, dtype=np.int32),
+        )
+        result = PredictResult(predict_end_time=4.2, process_output=empty)
+        self.assertEqual(result.to_columns(), (0, {"predict_time_ms": []}))
+        self.assertEqual(
+            result.to_columns(empty_row=True), (1, {"predict_time_ms": [4.2]})
+        )
@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+
+try:
+    from pyvino_utils.models.detection.text_detection import TextDetection
+except ModuleNotFoundError:
+    TextDetection = None
+
+
+@unittest.skipIf(TextDetection is None, "OpenVINO is not installed.")
+class test_text_detection(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.DUT = TextDetection
+
+    @staticmethod
+    def logits(positive):
+        """(negative, positive) logits pairs of a boolean map."""
+        return np.stack((np.zeros(positive.shape), np.where(positive, 5.0, -5.0)))
+
+    def test_link_pixels(self):
+        pixels = np.zeros((4, 6), dtype=bool)
+        pixels[1:3, 0:2] = pixels[1:3, 4:6] = True
+        segm_logits = self.logits(pixels)
+        linked = np.concatenate([self.logits(np.ones((4, 6), dtype=bool))] * 8)
+
+        labels = self.DUT.link_pixels(segm_logits, linked)
+        self.assertEqual(labels.shape, (4, 6))
+        self.assertEqual(len(np.unique(labels[pixels])), 2)
+        self.assertFalse(labels[~pixels].any())
+        self.assertEqual(len(np.unique(labels[1:3, 0:2])), 1)
+
+        unlinked = np.concatenate([self.logits(np.zeros((4, 6), dtype=bool))] * 8)
+        labels = self.DUT.link_pixels(segm_logits, unlinked)
+        self.assertEqual(len(np.unique(labels[pixels])), 8)
+
+    def test_get_text_regions(self):
+        labels = np.zeros((4, 8), dtype=np.int32)
+        labels[1:3, 2:6] = 1
+        # Too small to be text.
+        labels[0, 7] = 2
+        rects, boxes, bbox_coord = self.DUT.get_text_regions(labels, (40, 80))
+        self.assertEqual((rects.shape, boxes.shape), ((1, 5), (1, 4, 2)))
+        self.assertEqual(sorted(np.round(rects[0, 2:4]).tolist()), [10, 30])
+        self.assertEqual(bbox_coord.tolist(), [[25, 15, 55, 25]])
+
+    def test_no_text(self):
+        rects, boxes, bbox_coord = self.DUT.get_text_regions(
+            np.zeros((4, 8), dtype=np.int32), (40, 80)
+        )
+        self.assertEqual((len(rects), len(boxes), len(bbox_coord)), (0, 0, 0))
+
+    def test_crop_text_regions(self):
+        image = np.zeros((40, 80, 3), dtype=np.uint8)
+        crops = self.DUT.crop_text_regions(image, [[10, 5, 30, 25], [50, 20, 50, 20]])
+        self.assertEqual([crop.shape[:2] for crop in crops], [(20, 20), (1, 1)])
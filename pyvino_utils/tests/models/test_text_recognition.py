@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+
+try:
+    from pyvino_utils.models.recognition.text_recognition import (
+        LexiconTrie,
+        TextRecognition,
+    )
+except ModuleNotFoundError:
+    TextRecognition = None
+
+
+@unittest.skipIf(TextRecognition is None, "OpenVINO is not installed.")
+class test_text_recognition(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.DUT = TextRecognition
+
+    @staticmethod
+    def path_probs(path, alphabet, confidence=0.9):
+        """(T, C) probabilities peaking on the symbols of `path`."""
+        probs = np.full(
+            (len(path), len(alphabet)), (1 - confidence) / (len(alphabet) - 1)
+        )
+        probs[np.arange(len(path)), [alphabet.index(char) for char in path]] = confidence
+        return probs
+
+    def test_ctc_greedy_decode(self):
+        probs = np.stack(
+            (self.path_probs("aa#ab", "ab#"), self.path_probs("####b", "ab#")), axis=1
+        )
+        decoded = self.DUT.ctc_greedy_decode(probs, "ab#")
+        self.assertEqual([text for text, _ in decoded], ["aab", "b"])
+        self.assertAlmostEqual(decoded[0][1], 0.9 ** 5)
+
+    def test_ctc_beam_search_decode(self):
+        text, confidence = self.DUT.ctc_beam_search_decode(
+            self.path_probs("aa#ab", "ab#"), "ab#", beam_width=5
+        )
+        self.assertEqual(text, "aab")
+        self.assertGreater(confidence, 0.9 ** 5)
+
+    def test_lexicon(self):
+        probs = np.array([[0.4, 0.0, 0.6, 0.0], [0.0, 0.9, 0.0, 0.1]])
+        self.assertEqual(self.DUT.ctc_beam_search_decode(probs, "abc#")[0], "cb")
+        lexicon = LexiconTrie(["ab", "abc"])
+        self.assertEqual(
+            self.DUT.ctc_beam_search_decode(probs, "abc#", lexicon=lexicon)[0], "ab"
+        )
+
+    def test_lexicon_trie(self):
+        lexicon = LexiconTrie(["ab", "abc"])
+        self.assertTrue(lexicon.has_prefix("a"))
+        self.assertFalse(lexicon.has_prefix("b"))
+        self.assertTrue(lexicon.is_word("ab"))
+        self.assertFalse(lexicon.is_word("a"))
+
+    def test_preprocess_text_crops(self):
+        model = self.DUT.__new__(self.DUT)
+        model.input_shape = [1, 1, 4, 16]
+        model._batch_buffers = {}
+        crops = [
+            np.full((8, 8, 3), 10, dtype=np.uint8),
+            np.full((4, 4, 4), 257 * 20, dtype=np.uint16),
+            np.full((2, 8), 30.5, dtype=np.float32),
+        ]
+        batch = model.preprocess_text_crops(crops, 16)
+        self.assertEqual(batch.shape, (3, 1, 4, 16))
+        # Crops keep their aspect ratio and are padded with their last column.
+        np.testing.assert_array_equal(
+            batch[:, 0, 0, [0, 15]], [[10, 10], [20, 20], [30.5, 30.5]]
+        )
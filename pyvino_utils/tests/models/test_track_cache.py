@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+
+try:
+    from pyvino_utils.models.openvino_base.results import AgeGenderResult
+    from pyvino_utils.models.recognition.track_cache import TrackResultCache
+except ModuleNotFoundError:
+    TrackResultCache = None
+
+
+class _Model:
+    """Stands in for `AgeGender`, the age is the box width."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict_crops(self, image, boxes, **kwargs):
+        self.calls.append(len(boxes))
+        return [
+            AgeGenderResult(gender="female", age=float(xmax - xmin), image=image)
+            for xmin, _, xmax, _ in boxes
+        ]
+
+
+@unittest.skipIf(TrackResultCache is None, "OpenVINO is not installed.")
+class test_track_cache(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.model = _Model()
+        self.DUT = TrackResultCache(self.model, refresh_interval=3, ttl=2, max_tracks=3)
+        self.image = np.zeros((100, 100, 3), dtype=np.uint8)
+
+    def predict(self, boxes, track_ids, **kwargs):
+        return self.DUT.predict_crops(self.image, boxes, track_ids, **kwargs)
+
+    def test_hits_and_misses(self):
+        results = self.predict([[0, 0, 10, 10], [0, 0, 20, 20]], [1, 2])
+        self.assertIsInstance(results[0], AgeGenderResult)
+        self.assertEqual([(r["track_id"], r["age"]) for r in results], [(1, 10), (2, 20)])
+        self.predict([[0, 0, 10, 10], [0, 0, 20, 20], [0, 0, 30, 30]], [1, 2, 3])
+        self.assertEqual(self.model.calls, [2, 1])
+        self.assertEqual((self.DUT.model_calls, self.DUT.cache_hits), (3, 2))
+        self.assertAlmostEqual(self.DUT.hit_rate, 0.4)
+
+    def test_stale(self):
+        self.predict([[0, 0, 10, 10]], [1])
+        self.predict([[0, 0, 10, 10]], [1])
+        # A much better crop is worth a re-run.
+        self.predict([[0, 0, 20, 20]], [1])
+        self.predict([[0, 0, 20, 20]], [1])
+        self.predict([[0, 0, 20, 20]], [1])
+        # `refresh_interval` frames after the last run.
+        results = self.predict([[0, 0, 20, 20]], [1])
+        self.assertEqual(self.model.calls, [1, 1, 1])
+        # The median of the 10, 20 and 20 runs.
+        self.assertEqual(results[0]["age"], 20)
+
+    def test_eviction(self):
+        self.predict([[0, 0, 10, 10], [0, 0, 10, 10]], [1, 2])
+        self.predict([[0, 0, 10, 10], [0, 0, 10, 10]], [3, 4])
+        # Least recently seen above `max_tracks`.
+        self.assertEqual([1 in self.DUT, 2 in self.DUT], [False, True])
+        for _ in range(3):
+            self.predict([[0, 0, 10, 10]], [4])
+        # Not seen for more than `ttl` frames.
+        self.assertEqual(
+            [2 in self.DUT, 3 in self.DUT, 4 in self.DUT], [False] * 2 + [True]
+        )
+
+    def test_invalid_track_ids(self):
+        with self.assertRaises(ValueError):
+            self.predict([[0, 0, 10, 10]] * 2, [1, 1])
+        with self.assertRaises(ValueError):
+            self.predict([[0, 0, 10, 10]] * 4, [1, 2, 3, 4])
+        self.assertEqual(self.DUT.frame_count, 0)
+
+    def test_to_columns(self):
+        count, columns = self.predict([[0, 0, 10, 10]], [7])[0].to_columns()
+        self.assertEqual(
+            (count, columns), (1, {"track_id": [7], "gender": ["female"], "age": [10.0]})
+        )
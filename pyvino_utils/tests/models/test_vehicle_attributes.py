@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+
+try:
+    from pyvino_utils.models.openvino_base.faults import InvalidModel
+    from pyvino_utils.models.recognition.vehicle_attributes import VehicleAttrs
+    from pyvino_utils.tests.models.stubs import StubNetwork, stub_model
+except ModuleNotFoundError:
+    VehicleAttrs = None
+
+
+def one_hot(labels, classes, confidence=0.9):
+    """(N, classes, 1, 1) softmax outputs peaking on `labels`."""
+    labels = np.asarray(labels, dtype=int)
+    output = np.full((len(labels), classes), (1 - confidence) / (classes - 1))
+    output[np.arange(len(labels)), labels] = confidence
+    return output.reshape(len(labels), classes, 1, 1).astype(np.float32)
+
+
+def vehicle_network():
+    """The colour of a vehicle is its mean pixel value, its type that modulo 4."""
+
+    def fn(inputs):
+        means = inputs["data"].mean(axis=(1, 2, 3)).astype(int)
+        # The type output comes first, the outputs are told apart by their size.
+        return {"type": one_hot(means % 4, 4, 0.6), "color": one_hot(means % 7, 7)}
+
+    return StubNetwork(
+        {"data": [1, 3, 4, 4]}, {"type": [1, 4, 1, 1], "color": [1, 7, 1, 1]}, fn
+    )
+
+
+@unittest.skipIf(VehicleAttrs is None, "OpenVINO is not installed.")
+class test_vehicle_attributes(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.DUT = stub_model(VehicleAttrs, vehicle_network(), max_batch_size=2)
+
+    def test_decode_attributes(self):
+        colors, color_confs, types, type_confs = self.DUT.decode_attributes(
+            [one_hot([1, 6, 3], 7), one_hot([2, 0, 3], 4, 0.7)], 3
+        )
+        np.testing.assert_array_equal(colors, [1, 6, 3])
+        np.testing.assert_array_equal(types, [2, 0, 3])
+        np.testing.assert_allclose(color_confs, 0.9)
+        np.testing.assert_allclose(type_confs, 0.7)
+        with self.assertRaises(InvalidModel):
+            self.DUT.decode_attributes([one_hot([1], 7), one_hot([1], 5)], 1)
+
+    def test_predict_crops(self):
+        image = np.zeros((8, 40, 3), dtype=np.uint8)
+        for i in range(5):
+            image[:, 8 * i : 8 * i + 8] = i + 1
+        boxes = [[8 * i, 0, 8 * i + 8, 8] for i in range(5)]
+        results = self.DUT.predict_crops(image, boxes)
+        self.assertEqual(
+            [result["color"] for result in results],
+            ["gray", "yellow", "red", "green", "blue"],
+        )
+        self.assertEqual(
+            [result["type"] for result in results], ["bus", "truck", "van", "car", "bus"]
+        )
+        self.assertAlmostEqual(results[0]["type_confidence"], 0.6, places=5)
@@ -1,5 +1,7 @@
 import unittest
 
+import numpy as np
+
 from pyvino_utils.opencv_utils import cv_utils
 
 
@@ -12,3 +14,39 @@ class test_cv_utils(unittest.TestCase):  # noqa: N801
         self.assertEqual(self.DUT.select_color("yellow"), (0, 255, 0))
         with self.assertRaises(AttributeError):
             self.DUT.select_color((255, 255, 0))
+
+    def test_non_max_suppression(self):
+        boxes = np.array(
+            [[0, 0, 10, 10], [1, 1, 11, 11], [20, 20, 30, 30], [0, 0, 5, 10]]
+        )
+        scores = np.array([0.9, 0.8, 0.7, 0.6])
+        self.assertEqual(
+            self.DUT.non_max_suppression(boxes, scores, 0.5).tolist(), [0, 2, 3]
+        )
+        self.assertEqual(
+            self.DUT.non_max_suppression(boxes, scores, 0.5, metric="ios").tolist(),
+            [0, 2],
+        )
+
+    def test_similarity_transforms(self):
+        dst = np.array([[0, 0], [10, 0], [5, 10]], dtype=np.float32)
+        # Rotated by 90 degrees, scaled by 2 and shifted.
+        src = np.stack((-2 * dst[:, 1] + 3, 2 * dst[:, 0] + 4), axis=1)
+        matrices = self.DUT.similarity_transforms(src[None], dst)
+        self.assertEqual(matrices.shape, (1, 2, 3))
+        mapped = src @ matrices[0, :, :2].T + matrices[0, :, 2]
+        np.testing.assert_allclose(mapped, dst, atol=1e-4)
+
+    def test_to_uint8(self):
+        image = np.zeros((2, 2, 3), dtype=np.uint8)
+        self.assertIs(self.DUT.to_uint8(image), image)
+        deep = np.array([[0, 2570, 65535]], dtype=np.uint16)
+        self.assertEqual(self.DUT.to_uint8(deep)[0, :, 0].tolist(), [0, 10, 255])
+        self.assertEqual(self.DUT.to_uint8(deep).shape, (1, 3, 3))
+        self.assertEqual(self.DUT.to_uint8(image, channels=1).shape, (2, 2, 1))
+        floats = self.DUT.to_uint8(np.full((2, 2), 300.5))
+        self.assertEqual(floats.dtype, np.float32)
+        self.assertEqual(floats.shape, (2, 2, 3))
+        self.assertEqual(floats[0, 0, 0], 300.5)
+        with self.assertRaises(ValueError):
+            self.DUT.to_uint8(np.zeros((2, 2, 2), dtype=np.uint8))
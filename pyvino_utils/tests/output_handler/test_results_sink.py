@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from pyvino_utils.models.openvino_base.results import (
+        AgeGenderResult,
+        Detections,
+        PredictResult,
+    )
+    from pyvino_utils.output_handler.results_sink import ResultsSink
+except ModuleNotFoundError:
+    ResultsSink = None
+
+
+def detections(count, predict_time):
+    """`predict` result of `count` boxes, box i is (i, i, i + 10, i + 10)."""
+    boxes = np.arange(count, dtype=np.int32)[:, None] + [0, 0, 10, 10]
+    return PredictResult(
+        predict_end_time=predict_time,
+        process_output=Detections(
+            bbox_coord=boxes.astype(np.int32),
+            confidences=np.full(count, 0.5, dtype=np.float32),
+            labels=np.ones(count, dtype=np.int32),
+        ),
+    )
+
+
+@unittest.skipIf(ResultsSink is None, "OpenVINO or pyarrow is not installed.")
+class test_results_sink(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.DUT = ResultsSink
+
+    def read(self, sink, source):
+        path = sink.path(source)
+        if sink.output_format == "parquet":
+            return pq.read_table(path).to_pylist()
+        if sink.output_format == "arrow":
+            with pa.ipc.open_file(path) as reader:
+                return reader.read_all().to_pylist()
+        with open(path) as lines:
+            return [json.loads(line) for line in lines]
+
+    def write_frames(self, sink):
+        # Frame 1 has no detections, frame 2 starts a new row group.
+        for frame_id, count in enumerate((2, 0, 1)):
+            sink.write(frame_id, detections(count, 10.0 + frame_id), "faces", 0.5)
+
+    def test_round_trip(self):
+        for output_format in ("parquet", "arrow", "jsonl"):
+            with self.subTest(output_format=output_format):
+                directory = os.path.join(self.directory.name, output_format)
+                with self.DUT(directory, output_format, row_group_size=3) as sink:
+                    self.write_frames(sink)
+                rows = self.read(sink, "faces")
+                self.assertEqual([row["frame_id"] for row in rows], [0, 0, 1, 2])
+                self.assertEqual([row["object_id"] for row in rows], [0, 1, None, 0])
+                self.assertEqual(
+                    [row["predict_time_ms"] for row in rows], [10.0, 10.0, 11.0, 12.0]
+                )
+                self.assertEqual(rows[1]["bbox_coord"], [1, 1, 11, 11])
+                self.assertEqual(rows[3]["labels"], 1)
+                self.assertIsNone(rows[2]["bbox_coord"])
+                self.assertIsNone(rows[2].get("labels"))
+
+    def test_flush(self):
+        sink = self.DUT(self.directory.name, "arrow")
+        self.addCleanup(sink.close)
+        sink.write(0, detections(2, 1.0), "faces")
+        self.assertFalse(os.path.exists(sink.path("faces")))
+        sink.flush()
+        self.assertTrue(os.path.exists(sink.path("faces")))
+        sink.write(1, detections(1, 1.0), "faces")
+        sink.close()
+        self.assertEqual(len(self.read(sink, "faces")), 3)
+        # Closing twice is a no-op.
+        sink.close()
+
+    def test_schema_across_frames(self):
+        with self.DUT(self.directory.name, row_group_size=1) as sink:
+            sink.write(0, [AgeGenderResult(gender="male", age=30.5)], "age")
+            # Later batches are cast to the schema of the first one, missing columns
+            # are null.
+            sink.write(1, [AgeGenderResult(gender="female", age=20)], "age")
+            sink.write(2, [AgeGenderResult(age=40)], "age")
+        schema = pq.read_schema(sink.path("age"))
+        self.assertEqual(schema.field("age").type, pa.float64())
+        rows = self.read(sink, "age")
+        self.assertEqual([row["age"] for row in rows], [30.5, 20.0, 40.0])
+        self.assertEqual([row["gender"] for row in rows], ["male", "female", None])
+
+    def test_empty_frames_first(self):
+        # The schema is taken from the first batch with objects, not from the
+        # frames without objects before it.
+        with self.DUT(self.directory.name, row_group_size=1) as sink:
+            sink.write(0, detections(0, 1.0), "faces")
+            sink.write(1, detections(1, 2.0), "faces")
+            sink.write(0, detections(0, 3.0), "empty")
+        rows = self.read(sink, "faces")
+        self.assertEqual([row["object_id"] for row in rows], [None, 0])
+        self.assertEqual(rows[1]["bbox_coord"], [0, 0, 10, 10])
+        self.assertEqual(self.read(sink, "empty")[0]["predict_time_ms"], 3.0)
@@ -0,0 +1,125 @@
+import os
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from pyvino_utils.serving import replicas
+from pyvino_utils.serving.replicas import ReplicaPool, partition_cores
+
+
+class EchoModel:
+    """Stand-in for a model in the replica processes, the result of a frame is its
+    first pixel value, frames starting with 255 fail."""
+
+    def __init__(self, model_name, **kwargs):
+        self.kwargs = kwargs
+
+    def predict(self, frame, **kwargs):
+        if frame[0, 0, 0] == 255:
+            raise ValueError("Corrupt frame.")
+        time.sleep(0.01)
+        return {
+            "value": int(frame[0, 0, 0]),
+            "pid": os.getpid(),
+            "config": self.kwargs["config"],
+            "predict_kwargs": kwargs,
+        }
+
+
+class test_replicas(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        # Two sockets of 4 cores with 2 hardware threads each.
+        self.DUT = {
+            0: [[0, 8], [1, 9], [2, 10], [3, 11]],
+            1: [[4, 12], [5, 13], [6, 14], [7, 15]],
+        }
+
+    def test_one_replica_per_node(self):
+        self.assertEqual(
+            partition_cores(topology=self.DUT),
+            [(0, [0, 1, 2, 3, 8, 9, 10, 11], 4), (1, [4, 5, 6, 7, 12, 13, 14, 15], 4)],
+        )
+
+    def test_interleaved_nodes(self):
+        partitions = partition_cores(cores_per_replica=2, topology=self.DUT)
+        self.assertEqual([node for node, _, _ in partitions], [0, 1, 0, 1])
+        cpus = [cpu for _, replica_cpus, _ in partitions for cpu in replica_cpus]
+        self.assertEqual(sorted(cpus), list(range(16)))
+
+    def test_too_many_replicas(self):
+        with self.assertRaises(ValueError):
+            partition_cores(10, topology=self.DUT)
+
+
+class test_replica_pool(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        # Two single core replicas sharing a CPU, so that the test runs on any host.
+        cpu = min(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else 0
+        patcher = mock.patch.object(
+            replicas, "cpu_topology", return_value={0: [[cpu], [cpu]]}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.DUT = ReplicaPool
+        self.frames = [np.full((4, 4, 3), idx, dtype=np.uint8) for idx in range(12)]
+
+    def pools(self, **kwargs):
+        """A started pool passing frames through queues and one through a
+        `SharedFrameRing`."""
+        for frame_shape in (None, (4, 4, 3)):
+            with self.subTest(frame_shape=frame_shape):
+                pool = self.DUT(
+                    EchoModel,
+                    "model",
+                    replicas=2,
+                    frame_shape=frame_shape,
+                    metrics=None,
+                    **kwargs,
+                )
+                with pool:
+                    yield pool
+
+    def test_map(self):
+        for pool in self.pools(predict_kwargs={"show_bbox": False}):
+            results = list(pool.map(self.frames))
+            self.assertEqual([result["value"] for result in results], list(range(12)))
+            self.assertEqual(results[0]["predict_kwargs"], {"show_bbox": False})
+            self.assertEqual(
+                results[0]["config"], {"CPU_THREADS_NUM": "1", "CPU_BIND_THREAD": "NO"}
+            )
+            stats = pool.stats()
+            self.assertEqual(sum(replica["frames"] for replica in stats), 12)
+            self.assertLessEqual(
+                {result["pid"] for result in results},
+                {replica["pid"] for replica in stats},
+            )
+            values = [result["value"] for result in pool.map(self.frames[:4], False)]
+            self.assertEqual(sorted(values), [0, 1, 2, 3])
+            self.assertEqual(sum(replica["frames"] for replica in pool.stats()), 16)
+
+    def test_failed_frame(self):
+        self.frames[3][:] = 255
+        for pool in self.pools():
+            with self.assertRaisesRegex(RuntimeError, "failed on frame 3: .*Corrupt"):
+                for _ in pool.map(self.frames):
+                    pass
+            # The frames queued before the failure are still collected.
+            while pool._in_flight:
+                try:
+                    pool.collect(timeout=10)
+                except RuntimeError:
+                    pass
+            self.assertEqual(
+                sum(replica["frames"] for replica in pool.stats()), pool._next_index
+            )
+
+    def test_config(self):
+        # The explicit config is merged over the thread count of each replica.
+        for pool in self.pools(config={"CPU_THREADS_NUM": "3", "PERF_COUNT": "YES"}):
+            config = next(pool.map(self.frames[:1]))["config"]
+            self.assertEqual(
+                config,
+                {"CPU_THREADS_NUM": "3", "CPU_BIND_THREAD": "NO", "PERF_COUNT": "YES"},
+            )
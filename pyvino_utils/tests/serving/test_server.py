@@ -0,0 +1,122 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from pyvino_utils.serving.client import InferenceClient
+from pyvino_utils.serving.server import InferenceServer
+
+
+class _Model:
+    """Stands in for a loaded model, the result of an image is its mean and the
+    output of a tensor its sum."""
+
+    max_batch_size = 4
+    tuned_batch_size = None
+    metrics = None
+    model_structure = "model.xml"
+    is_ready = True
+    input_shape = [1, 3, 2, 2]
+    model = SimpleNamespace(outputs={"sum": None})
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.gate.set()
+        self.busy = threading.Event()
+        self.batch_sizes = []
+
+    def predict_batch(self, images, **kwargs):
+        self.busy.set()
+        self.gate.wait()
+        self.batch_sizes.append(len(images))
+        return [
+            {"mean": float(image.mean()), "shape": np.array(image.shape)}
+            for image in images
+        ]
+
+    def _batch_size_for(self, count):
+        return self.max_batch_size
+
+    def _get_batch_buffers(self, batch_size):
+        return None, np.zeros([batch_size, *self.input_shape[1:]], dtype=np.float32)
+
+    def _infer_batch(self, batch, count):
+        return [batch[:count].sum(axis=(1, 2, 3))[:, None]]
+
+
+class test_server(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.address = os.path.join(self.tmp.name, "model.sock")
+        self.model = _Model()
+        self.DUT = InferenceServer(self.model, self.address, max_delay_ms=50.0)
+        self.DUT.start()
+
+    def tearDown(self):
+        self.DUT.shutdown()
+        self.tmp.cleanup()
+
+    def test_predict(self):
+        image = np.full((4, 6, 3), 7, dtype=np.uint8)
+        with InferenceClient(self.address, timeout=5) as client:
+            self.assertTrue(client.ready())
+            results = client.predict(image)
+            self.assertEqual(results["mean"], 7.0)
+            np.testing.assert_array_equal(results["shape"], [4, 6, 3])
+            self.assertEqual(client.predict(image, encode=".png")["mean"], 7.0)
+            self.assertEqual(client.stats()["requests"], 2)
+
+    def test_infer(self):
+        with InferenceClient(self.address, timeout=5) as client:
+            outputs = client.infer(np.ones((3, 2, 2)))
+        self.assertEqual(outputs["batch_index"], 0)
+        np.testing.assert_array_equal(outputs["sum"], [[12.0]])
+
+    def test_batching(self):
+        replies = []
+
+        def run(value):
+            with InferenceClient(self.address, timeout=5) as client:
+                replies.append(client.predict(np.full((2, 2, 3), value, dtype=np.uint8)))
+
+        threads = [threading.Thread(target=run, args=(value,)) for value in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(reply["mean"] for reply in replies), [0, 1, 2, 3])
+        self.assertLess(len(self.model.batch_sizes), 4)
+
+    def test_shutdown_fails_queued_requests(self):
+        self.DUT.max_batch = 1
+        self.model.gate.clear()
+        errors = []
+
+        def run():
+            with InferenceClient(self.address, timeout=5) as client:
+                try:
+                    client.predict(np.zeros((2, 2, 3), dtype=np.uint8))
+                except RuntimeError as err:
+                    errors.append(err)
+
+        # The first request blocks the batcher, the second one waits in the queue.
+        threads = [threading.Thread(target=run) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        self.model.busy.wait(timeout=5)
+        while not self.DUT._queue.qsize():
+            time.sleep(0.01)
+        shutdown = threading.Thread(target=self.DUT.shutdown)
+        shutdown.start()
+        while self.DUT._running.is_set():
+            time.sleep(0.01)
+        self.model.gate.set()
+        for thread in threads + [shutdown]:
+            thread.join(timeout=5)
+            self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+        self.assertIn("shut down", str(errors[0]))
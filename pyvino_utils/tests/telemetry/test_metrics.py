@@ -0,0 +1,35 @@
+import unittest
+
+from pyvino_utils import MetricsRegistry
+
+
+class test_metrics(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.DUT = MetricsRegistry()
+
+    def test_histogram(self):
+        histogram = self.DUT.histogram("latency_seconds", buckets=(0.1, 1.0), model="m")
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value)
+        self.assertIs(self.DUT.histogram("latency_seconds", model="m"), histogram)
+        sample = self.DUT.snapshot()["latency_seconds"]["samples"][0]
+        self.assertEqual(sample["buckets"], {0.1: 1, 1.0: 3, float("inf"): 4})
+        self.assertAlmostEqual(sample["p50"], 0.55)
+
+    def test_to_prometheus(self):
+        self.DUT.counter("frames_total", "Frames.", model='a"b').inc(3)
+        text = self.DUT.to_prometheus()
+        self.assertIn("# TYPE frames_total counter", text)
+        self.assertIn('frames_total{model="a\\"b"} 3.0', text)
+
+    def test_kind_mismatch(self):
+        self.DUT.counter("frames_total")
+        with self.assertRaises(ValueError):
+            self.DUT.gauge("frames_total")
+
+    def test_ready(self):
+        self.assertTrue(self.DUT.ready())
+        ready = self.DUT.gauge("pyvino_model_ready", model="m")
+        self.assertFalse(self.DUT.ready())
+        ready.set(1)
+        self.assertTrue(self.DUT.ready())
@@ -0,0 +1,36 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from pyvino_utils.telemetry.tracing import Tracer, current_frame
+
+
+class test_tracing(unittest.TestCase):  # noqa: N801
+    def setUp(self):
+        self.DUT = Tracer()
+
+    def test_disabled(self):
+        with self.DUT.span("infer"), self.DUT.frame(0, time.perf_counter_ns()):
+            self.assertIsNone(current_frame())
+        self.assertEqual(self.DUT.events(), [])
+
+    def test_frame_spans(self):
+        self.DUT.start()
+        capture_ns = time.perf_counter_ns()
+        with self.DUT.frame(7, capture_ns):
+            self.assertEqual(current_frame(), (7, capture_ns))
+            with self.DUT.span("infer", "model", batch=2):
+                pass
+        self.assertIsNone(current_frame())
+        events = self.DUT.events()
+        spans = {event["name"]: event for event in events if event["ph"] == "X"}
+        self.assertEqual(spans["infer"]["args"], {"batch": 2, "frame_id": 7})
+        self.assertEqual(spans["frame"]["ts"], capture_ns / 1000)
+        self.assertGreaterEqual(spans["frame"]["dur"], spans["infer"]["dur"])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.DUT.dump(os.path.join(tmp, "trace.json"))
+            with open(path) as trace:
+                self.assertEqual(len(json.load(trace)["traceEvents"]), 3)
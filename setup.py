@@ -30,6 +30,9 @@ EXTRAS = {
         "pytest-cov",
         "pytest-runner",
     ],
+    "arrow": ["pyarrow"],
+    "pot": ["openvino-dev~=2021.4"],
+    "tiff": ["tifffile"],
 }
 
 REQUIRES_PYTHON = ">=3.6.0"